@@ -0,0 +1,383 @@
+# benchmarks/cases.py
+
+"""
+Benchmark cases for the simulator, ETL and API hot paths.
+
+Inputs are synthetic and seeded, so runs on the same machine are
+comparable across commits:
+
+- simulator: random /simulate payloads over a synthetic medians table
+- ETL: a generated UCMR5_All.txt-shaped file (cached in the work dir)
+- API: in-process ASGI requests at fixed concurrency; /simulate-location
+  goes through a local Nominatim stub instead of the network
+- PDF: single report, per-site reports and one multi-page document
+"""
+
+import asyncio
+import random
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks.harness import Case, Context, percentile, summarize, time_call
+from src.config.state_codes import NATIONAL_FIPS, STATE_ABBREV_TO_FIPS
+from src.simulation.model_schema import PFAS_CHEMICALS
+
+SEED = 20240601
+
+COOLING_TYPES = ["evaporative", "hybrid", "closed_loop", "air_cooled"]
+STRESS = ["low", "moderate", "high", "extreme"]
+
+UCMR5_HEADER = [
+    "PWSID", "PWSName", "Size", "FacilityID", "CollectionDate", "SampleID",
+    "Contaminant", "MRL", "Units", "MethodID", "AnalyticalResultsSign",
+    "AnalyticalResultValue", "Region", "State",
+]
+# PFAS plus a few non-PFAS analytes the ETL must skip
+UCMR5_CONTAMINANTS = ["PFOA", "PFOS", "PFHxS", "PFNA", "PFBS", "HFPO-DA", "lithium", "PFHxA"]
+
+
+# ----------------------------------------------------------------------
+# Synthetic inputs
+# ----------------------------------------------------------------------
+def write_medians(path: Path) -> Path:
+    """State,Contaminant,ppt for every state plus the national row."""
+    rng = random.Random(SEED)
+    rows = ["State,Contaminant,ppt"]
+    for fips in sorted(set(STATE_ABBREV_TO_FIPS.values()) | {NATIONAL_FIPS}):
+        rows += [f"{fips},{chem},{rng.uniform(0.0, 12.0):.4f}" for chem in PFAS_CHEMICALS]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(rows) + "\n")
+    return path
+
+
+def random_payloads(n: int, seed: int = SEED) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    states = sorted(set(STATE_ABBREV_TO_FIPS.values()))
+    payloads = []
+    for _ in range(n):
+        chems = rng.sample(PFAS_CHEMICALS, rng.randint(1, len(PFAS_CHEMICALS)))
+        payloads.append({
+            "state": rng.choice(states),
+            "chemicals": {"concentrations_ppt": {c: rng.uniform(0.0, 40.0) for c in chems}},
+            "environmental_factors": {
+                "receiving_water_flow_cfs": rng.uniform(1.0, 2500.0),
+                "groundwater_vulnerability_index": rng.random(),
+                "surface_water_distance_km": rng.uniform(0.0, 3.0),
+                "water_stress_category": rng.choice(STRESS),
+            },
+            "data_center": {
+                "max_daily_water_withdrawal_mgd": rng.uniform(0.0, 50.0),
+                "cooling_type": rng.choice(COOLING_TYPES),
+            },
+            "scenario_parameters": {},
+        })
+    return payloads
+
+
+def write_ucmr5(path: Path, rows: int, seed: int = SEED, block_rows: int = 1_000_000) -> Path:
+    """Tab-separated UCMR5_All.txt look-alike with `rows` data lines."""
+    rng = np.random.default_rng(seed)
+    states = np.array(sorted(STATE_ABBREV_TO_FIPS))
+    contaminants = np.array(UCMR5_CONTAMINANTS)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".partial")
+    with open(tmp, "w", encoding="latin1") as f:
+        f.write("\t".join(UCMR5_HEADER) + "\n")
+        for start in range(0, rows, block_rows):
+            n = min(block_rows, rows - start)
+            ids = np.arange(start, start + n).astype(str)
+            state = states[rng.integers(0, states.size, n)]
+            detect = rng.random(n) < 0.4
+            value = np.where(detect, np.round(rng.lognormal(-5.5, 0.8, n), 6).astype(str), "")
+            columns = [
+                np.char.add(state, ids), np.full(n, "Synthetic PWS"), np.full(n, "L"),
+                np.full(n, "1"), np.full(n, "03/01/2023"), np.char.add("S", ids),
+                contaminants[rng.integers(0, contaminants.size, n)], np.full(n, "0.004"),
+                np.full(n, "µg/L"), np.full(n, "533"), np.where(detect, "=", "<"),
+                value, np.full(n, "3"), state,
+            ]
+            lines = columns[0]
+            for column in columns[1:]:
+                lines = np.char.add(np.char.add(lines, "\t"), column)
+            f.write("\n".join(lines.tolist()) + "\n")
+    tmp.replace(path)
+    return path
+
+
+# ----------------------------------------------------------------------
+# Simulator
+# ----------------------------------------------------------------------
+def _simulator(ctx: Context):
+    from src.etl.background_repository import BackgroundRepository
+    from src.simulation.simulator import PFASRiskSimulator
+
+    return PFASRiskSimulator(BackgroundRepository(write_medians(ctx.work_dir / "medians.csv")))
+
+
+def simulate_scalar(ctx: Context) -> Dict[str, Any]:
+    sim = _simulator(ctx)
+    payloads = random_payloads(2_000 if ctx.quick else 20_000)
+    result = time_call(lambda: [sim.simulate(p) for p in payloads], repeat=3 if ctx.quick else 5)
+    result["scenarios"] = len(payloads)
+    result["per_scenario_us"] = result["median_s"] / len(payloads) * 1e6
+    return result
+
+
+def simulate_batch(ctx: Context) -> Dict[str, Any]:
+    sim = _simulator(ctx)
+    payloads = random_payloads(2_000 if ctx.quick else 20_000)
+    result = time_call(lambda: sim.simulate_batch(payloads), repeat=3 if ctx.quick else 5)
+    result["scenarios"] = len(payloads)
+    result["per_scenario_us"] = result["median_s"] / len(payloads) * 1e6
+    return result
+
+
+def sensitivity_sobol(ctx: Context) -> Dict[str, Any]:
+    """Saltelli design over all five factors, N·(d+2) scenarios through the batch kernel."""
+    sim = _simulator(ctx)
+    payload = random_payloads(1)[0]
+    n_base = 1024 if ctx.quick else 8192
+    result = time_call(lambda: sim.simulate_sensitivity(payload, n_base=n_base), repeat=3 if ctx.quick else 5)
+    result["evaluations"] = n_base * 7
+    return result
+
+
+def batch_kernel(ctx: Context) -> Dict[str, Any]:
+    """run_batch alone on prebuilt arrays: the vectorized math without payload parsing."""
+    from src.simulation.batch import ScenarioBatch, run_batch
+
+    sim = _simulator(ctx)
+    payloads = random_payloads(10_000 if ctx.quick else 100_000)
+    batch = ScenarioBatch.from_payloads(payloads, sim.background.get_background)
+    result = time_call(
+        lambda: run_batch(batch, sim.MCL, sim.HAZARD_RFD, sim.COMBINED_MCL), repeat=5 if ctx.quick else 10
+    )
+    result["scenarios"] = len(payloads)
+    result["per_scenario_us"] = result["median_s"] / len(payloads) * 1e6
+    return result
+
+
+# ----------------------------------------------------------------------
+# Payload validation
+# ----------------------------------------------------------------------
+def validate_single(ctx: Context) -> Dict[str, Any]:
+    """SimulationPayload validation one payload at a time (per-request cost)."""
+    from src.api.middleware.payload_validator import SimulationPayload
+
+    payloads = random_payloads(2_000 if ctx.quick else 10_000)
+    result = time_call(lambda: [SimulationPayload.model_validate(p) for p in payloads], repeat=5)
+    result["payloads"] = len(payloads)
+    result["per_payload_us"] = result["median_s"] / len(payloads) * 1e6
+    return result
+
+
+def validate_batch(ctx: Context) -> Dict[str, Any]:
+    """One list validation through the compiled batch adapter, plus to_payload()."""
+    from src.api.middleware.payload_validator import validate_simulation_batch
+
+    payloads = random_payloads(2_000 if ctx.quick else 10_000)
+    result = time_call(lambda: validate_simulation_batch(payloads), repeat=5)
+    result["payloads"] = len(payloads)
+    result["per_payload_us"] = result["median_s"] / len(payloads) * 1e6
+    return result
+
+
+def validate_columns(ctx: Context) -> Dict[str, Any]:
+    """The same batch encoded to scenario columns and range-checked per column."""
+    from src.simulation.scenario_codec import encode_scenarios
+
+    payloads = random_payloads(2_000 if ctx.quick else 10_000)
+    result = time_call(lambda: encode_scenarios(payloads), repeat=5)
+    result["payloads"] = len(payloads)
+    result["per_payload_us"] = result["median_s"] / len(payloads) * 1e6
+    return result
+
+
+# ----------------------------------------------------------------------
+# Startup
+# ----------------------------------------------------------------------
+def background_compile(ctx: Context) -> Dict[str, Any]:
+    from src.etl.background_table import compile_background
+
+    csv_path = write_medians(ctx.work_dir / "medians.csv")
+    out = ctx.work_dir / "medians_compile.bin"
+    return time_call(lambda: compile_background(csv_path, out), repeat=10)
+
+
+def load_background_startup(ctx: Context) -> Dict[str, Any]:
+    """ucmr5_ingest.load_ucmr5_background() plus one read of every region."""
+    from src.etl import ucmr5_ingest
+
+    original = ucmr5_ingest.PROCESSED_FILE
+    ucmr5_ingest.PROCESSED_FILE = write_medians(ctx.work_dir / "medians.csv")
+    try:
+        def load():
+            table = ucmr5_ingest.load_ucmr5_background()
+            return [table[region] for region in table]
+
+        return time_call(load, repeat=20)
+    finally:
+        ucmr5_ingest.PROCESSED_FILE = original
+
+
+# ----------------------------------------------------------------------
+# ETL
+# ----------------------------------------------------------------------
+def etl_case(rows: int, workers: int) -> Case:
+    def run(ctx: Context) -> Dict[str, Any]:
+        from src.etl.etl_main import run_etl
+
+        raw = ctx.work_dir / f"ucmr5_{rows}.txt"
+        if not raw.exists():
+            write_ucmr5(raw, rows)
+        out = ctx.work_dir / f"medians_{rows}_{workers}.csv"
+        reports = []
+        result = time_call(
+            lambda: reports.append(run_etl(raw, out, report_path=None, workers=workers)), repeat=1, warmup=0
+        )
+        result["rows"] = rows
+        result["workers"] = workers
+        result["rows_per_s"] = rows / result["median_s"]
+        result["pfas_samples"] = reports[-1].get("pfas_samples")
+        return result
+
+    return Case(f"etl_{rows}_rows_w{workers}", run, threshold=1.3, group="etl")
+
+
+# ----------------------------------------------------------------------
+# API
+# ----------------------------------------------------------------------
+STUB_NOMINATIM = {"address": {"state": "Virginia", "county": "Loudoun County"}}
+
+
+async def _load(client, requests, concurrency: int) -> List[float]:
+    """Per-request latencies for (method, url, json) requests at fixed concurrency."""
+    gate = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(url: str, body: Dict[str, Any]) -> None:
+        async with gate:
+            start = time.perf_counter()
+            response = await client.post(url, json=body)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    await asyncio.gather(*(one(url, body) for url, body in requests))
+    return latencies
+
+
+def _latency_result(latencies: List[float], wall: float, concurrency: int) -> Dict[str, Any]:
+    result = summarize(latencies)
+    result.update({
+        "metric": "p95_s",
+        "value": percentile(latencies, 95),
+        "p50_s": percentile(latencies, 50),
+        "p99_s": percentile(latencies, 99),
+        "concurrency": concurrency,
+        "requests_per_s": len(latencies) / wall,
+    })
+    return result
+
+
+def api_case(name: str, path: str, concurrency: int = 32) -> Case:
+    def run(ctx: Context) -> Dict[str, Any]:
+        import httpx
+
+        from src.api import geocoding_client, location_service
+        from src.api.main import app
+
+        n = 500 if ctx.quick else 5_000
+        if path == "/simulate":
+            bodies = random_payloads(n)
+        else:
+            rng = random.Random(SEED)
+            bodies = [{"lat": rng.uniform(25.0, 49.0), "lon": rng.uniform(-124.0, -67.0)} for _ in range(n)]
+
+        stub = geocoding_client.GeocodingClient(
+            base_url="http://nominatim.stub/reverse",
+            rate_per_second=1e9,
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, json=STUB_NOMINATIM)),
+        )
+        saved = (geocoding_client._CLIENT, location_service.GEOCODER_PRIMARY)
+        geocoding_client._CLIENT = stub
+        location_service.GEOCODER_PRIMARY = "nominatim"
+        location_service.GEOCODE_CACHE.clear()
+
+        async def main() -> Dict[str, Any]:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                await _load(client, [(path, body) for body in bodies[:50]], concurrency)  # warm up
+                start = time.perf_counter()
+                latencies = await _load(client, [(path, body) for body in bodies], concurrency)
+                return _latency_result(latencies, time.perf_counter() - start, concurrency)
+
+        try:
+            return asyncio.run(main())
+        finally:
+            asyncio.run(stub.aclose())
+            geocoding_client._CLIENT, location_service.GEOCODER_PRIMARY = saved
+            location_service.GEOCODE_CACHE.clear()
+
+    return Case(name, run, threshold=1.5, group="api")
+
+
+# ----------------------------------------------------------------------
+# PDF
+# ----------------------------------------------------------------------
+def _report_results(ctx: Context, n: int) -> List[Dict[str, Any]]:
+    results = _simulator(ctx).simulate_batch(random_payloads(n)).to_dicts()
+    for result in results:
+        result.update({"lat": 38.9, "lon": -77.4})
+    return results
+
+
+def pdf_single(ctx: Context) -> Dict[str, Any]:
+    from src.api.pdf_exporter import render_pdf_bytes
+
+    result = _report_results(ctx, 1)[0]
+    return time_call(lambda: render_pdf_bytes(result), repeat=30, warmup=3)
+
+
+def pdf_per_site(ctx: Context) -> Dict[str, Any]:
+    from src.api.pdf_exporter import render_reports
+
+    results = _report_results(ctx, 100)
+    result = time_call(lambda: render_reports(results), repeat=3 if ctx.quick else 5)
+    result["reports"] = len(results)
+    return result
+
+
+def pdf_multipage(ctx: Context) -> Dict[str, Any]:
+    from src.api.pdf_exporter import render_multipage
+
+    results = _report_results(ctx, 100)
+    result = time_call(lambda: render_multipage(results), repeat=3 if ctx.quick else 5)
+    result["pages"] = len(results)
+    return result
+
+
+def all_cases(ctx: Context) -> List[Case]:
+    cases = [
+        Case("simulate_scalar", simulate_scalar, group="simulator"),
+        Case("simulate_batch", simulate_batch, group="simulator"),
+        Case("batch_kernel", batch_kernel, group="simulator"),
+        Case("sensitivity_sobol", sensitivity_sobol, group="simulator"),
+        Case("validate_single", validate_single, group="validation"),
+        Case("validate_batch", validate_batch, group="validation"),
+        Case("validate_columns", validate_columns, group="validation"),
+        Case("background_compile", background_compile, threshold=1.5, group="startup"),
+        Case("load_ucmr5_background", load_background_startup, threshold=1.5, group="startup"),
+    ]
+    for rows in ctx.etl_rows:
+        cases.append(etl_case(rows, workers=1))
+    cases += [
+        api_case("api_simulate_p95", "/simulate"),
+        api_case("api_simulate_location_p95", "/simulate-location"),
+        Case("pdf_single", pdf_single, group="pdf"),
+        Case("pdf_per_site_100", pdf_per_site, group="pdf"),
+        Case("pdf_multipage_100", pdf_multipage, group="pdf"),
+    ]
+    return cases
@@ -0,0 +1,155 @@
+# benchmarks/harness.py
+
+"""
+Timing, result files and baseline comparison for the benchmark suite.
+
+A run is one JSON document:
+
+    {
+      "meta": {"commit": ..., "timestamp": ..., "python": ..., ...},
+      "results": {
+        "<case>": {"metric": "median_s", "value": 0.0123, "threshold": 1.25,
+                   "min_s": ..., "median_s": ..., "p95_s": ..., ...},
+        ...
+      }
+    }
+
+Every case reports seconds (lower is better) under `metric`; extra fields
+(throughput, latency percentiles) are informational. compare() flags a
+case as a regression when current > baseline * threshold.
+"""
+
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+DEFAULT_THRESHOLD = 1.25
+
+
+@dataclass
+class Case:
+    name: str
+    run: Callable[["Context"], Dict[str, Any]]
+    threshold: float = DEFAULT_THRESHOLD
+    group: str = ""
+
+
+@dataclass
+class Context:
+    quick: bool
+    work_dir: Path
+    etl_rows: Sequence[int]
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    """Nearest-rank percentile (p in 0..100) of a non-empty sequence."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def time_call(fn: Callable[[], Any], repeat: int = 5, warmup: int = 1) -> Dict[str, Any]:
+    """Wall-clock stats of `repeat` calls after `warmup` untimed ones."""
+    for _ in range(warmup):
+        fn()
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, Any]:
+    return {
+        "metric": "median_s",
+        "value": statistics.median(samples),
+        "samples": len(samples),
+        "min_s": min(samples),
+        "median_s": statistics.median(samples),
+        "mean_s": statistics.fmean(samples),
+        "p95_s": percentile(samples, 95),
+        "max_s": max(samples),
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def environment() -> Dict[str, Any]:
+    import numpy as np
+
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_cases(cases: Sequence[Case], ctx: Context, log: Callable[[str], None] = print) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for case in cases:
+        log(f"{case.name} ...")
+        result = case.run(ctx)
+        result["threshold"] = case.threshold
+        results[case.name] = result
+        log(f"  {result['metric']} = {result['value']:.6f}")
+    return {"meta": {**environment(), "quick": ctx.quick}, "results": results}
+
+
+def save(run: Dict[str, Any], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(run, indent=2, sort_keys=True))
+
+
+def load(path: Path) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text())
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """One row per case present in both runs; "regressed" past the threshold."""
+    rows = []
+    for name, cur in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None or base["metric"] != cur["metric"] or not base["value"]:
+            continue
+        ratio = cur["value"] / base["value"]
+        threshold = base.get("threshold", DEFAULT_THRESHOLD)
+        rows.append({
+            "case": name,
+            "metric": cur["metric"],
+            "baseline": base["value"],
+            "current": cur["value"],
+            "ratio": ratio,
+            "threshold": threshold,
+            "regressed": ratio > threshold,
+        })
+    return rows
+
+
+def format_comparison(rows: Sequence[Dict[str, Any]]) -> str:
+    lines = [f"{'case':<36} {'baseline':>12} {'current':>12} {'ratio':>7}  status"]
+    for row in rows:
+        status = f"REGRESSED (> {row['threshold']:.2f}x)" if row["regressed"] else "ok"
+        lines.append(
+            f"{row['case']:<36} {row['baseline']:>12.6f} {row['current']:>12.6f} {row['ratio']:>6.2f}x  {status}"
+        )
+    return "\n".join(lines)
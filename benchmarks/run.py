@@ -0,0 +1,80 @@
+# benchmarks/run.py
+
+"""
+Run the benchmark suite and compare against a baseline.
+
+    python -m benchmarks.run                       # full run, 1M and 10M ETL rows
+    python -m benchmarks.run --quick               # smaller inputs, 100k ETL rows
+    python -m benchmarks.run --only simulator,pdf  # case names or groups
+    python -m benchmarks.run --save-baseline       # also write benchmarks/baseline.json
+    python -m benchmarks.run --compare old.json new.json
+
+Results go to benchmarks/results/<commit>.json. When a baseline exists the
+run is compared against it and the exit status is 1 if any case regressed
+past its threshold. Baselines are machine-specific: record one per machine
+(or CI runner) and compare runs from the same place.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from benchmarks import harness
+from benchmarks.cases import all_cases
+
+BENCH_DIR = Path(__file__).resolve().parent
+BASELINE_FILE = BENCH_DIR / "baseline.json"
+RESULTS_DIR = BENCH_DIR / "results"
+WORK_DIR = BENCH_DIR / ".work"
+
+FULL_ETL_ROWS = [1_000_000, 10_000_000]
+QUICK_ETL_ROWS = [100_000]
+
+
+def report(baseline: dict, current: dict) -> int:
+    rows = harness.compare(baseline, current)
+    print(harness.format_comparison(rows))
+    regressed = [row["case"] for row in rows if row["regressed"]]
+    if regressed:
+        print(f"\n{len(regressed)} regression(s): {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="RiskScope benchmark suite")
+    parser.add_argument("--quick", action="store_true", help="smaller inputs for a fast check")
+    parser.add_argument("--only", type=lambda s: [x for x in s.split(",") if x], default=None,
+                        help="comma-separated case names or groups (simulator, validation, startup, etl, api, pdf)")
+    parser.add_argument("--etl-rows", type=lambda s: [int(x) for x in s.split(",") if x], default=None,
+                        help="synthetic UCMR5 sizes, e.g. 1000000,10000000")
+    parser.add_argument("--work-dir", type=Path, default=WORK_DIR, help="synthetic inputs (reused between runs)")
+    parser.add_argument("--out", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", nargs=2, type=Path, metavar=("BASELINE", "CURRENT"))
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(report(harness.load(args.compare[0]), harness.load(args.compare[1])))
+
+    etl_rows = args.etl_rows or (QUICK_ETL_ROWS if args.quick else FULL_ETL_ROWS)
+    ctx = harness.Context(quick=args.quick, work_dir=args.work_dir, etl_rows=etl_rows)
+    cases = [
+        case for case in all_cases(ctx)
+        if args.only is None or case.name in args.only or case.group in args.only
+    ]
+    run = harness.run_cases(cases, ctx)
+
+    out = args.out or RESULTS_DIR / f"{run['meta']['commit'] or 'unversioned'}.json"
+    harness.save(run, out)
+    print(f"\nwrote {out}")
+    if args.save_baseline:
+        harness.save(run, args.baseline)
+        print(f"wrote baseline {args.baseline}")
+    elif args.baseline.exists():
+        sys.exit(report(harness.load(args.baseline), run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+# src/api/backpressure.py
+
+"""
+Pieces shared by the bounded work queues (compute executor, PDF exports):
+the QueueFull rejection the API turns into 429, and the rolling timing
+summary their stats() report.
+"""
+
+from collections import deque
+from typing import Dict
+
+TIMING_WINDOW = 1000  # recent tasks kept for the timing stats
+
+
+class QueueFull(Exception):
+    """Raised when a queue already holds `max_pending` outstanding tasks."""
+
+
+def timing_summary(values: deque) -> Dict[str, float]:
+    if not values:
+        return {"mean": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(values)
+    return {
+        "mean": sum(ordered) / len(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+        "max": ordered[-1],
+    }
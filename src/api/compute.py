@@ -0,0 +1,234 @@
+# src/api/compute.py
+
+"""
+Dedicated executor for CPU-heavy request work.
+
+Async handlers keep I/O (geocoding, request bodies) on the event loop and
+cheap single-scenario simulation inline. Batch, Monte Carlo and trajectory
+simulation, and the per-block work of /simulate-locations, go through
+ComputeExecutor instead of Starlette's shared threadpool. So a heavy
+request waits for compute workers and never for the threads that serve
+light clicks.
+
+- kind="thread" (default): NumPy releases the GIL in the kernels, results
+  need no pickling
+- kind="process": spawn-based pool; tasks must be module-level functions
+  (each worker builds its own simulator from the memory-mapped table)
+
+At most `max_pending` tasks are queued or running; run() raises QueueFull
+beyond that (429 at the API); run_many() admits a group of tasks as a
+unit. stats() reports queue wait and run time.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from src.api.backpressure import TIMING_WINDOW, QueueFull, timing_summary
+
+EXECUTOR_KINDS = ("thread", "process")
+DEFAULT_MAX_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_MAX_PENDING = 64
+
+
+def _timed(fn: Callable[..., Any], args: Tuple[Any, ...]) -> Tuple[float, Any]:
+    """Worker side: (wall time the task started, its result)."""
+    return time.time(), fn(*args)
+
+
+class ComputeExecutor:
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+    ) -> None:
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"kind must be one of {EXECUTOR_KINDS}, got {kind!r}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+
+        self._executor: Executor | None = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._queue_seconds: deque = deque(maxlen=TIMING_WINDOW)
+        self._run_seconds: deque = deque(maxlen=TIMING_WINDOW)
+        self.counters = {"submitted": 0, "rejected": 0, "completed": 0, "failed": 0, "cancelled": 0}
+
+    def executor(self) -> Executor:
+        # created on first use, like the PDF pool
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="riskscope-compute"
+                )
+        return self._executor
+
+    def check_capacity(self, tasks: int = 1) -> None:
+        """Raise QueueFull now if `tasks` tasks submitted now would be rejected."""
+        with self._lock:
+            self._check_capacity(tasks)
+
+    async def run(self, fn: Callable[..., Any], *args: Any, admit: bool = True) -> Any:
+        """
+        Run fn(*args) on the executor. admit=False skips the max_pending
+        check (for work already admitted, e.g. later blocks of a stream).
+        """
+        self._admit(1, admit)
+        started, result = await asyncio.wrap_future(self._submit(fn, args))
+        return result
+
+    async def run_many(self, fn: Callable[..., Any], arg_lists: Sequence[Tuple[Any, ...]]) -> List[Any]:
+        """
+        fn(*args) for every args in arg_lists, concurrently, results in
+        order. The tasks are admitted as one unit: QueueFull unless all of
+        them fit under max_pending.
+        """
+        self._admit(len(arg_lists), True)
+        futures = []
+        try:
+            for args in arg_lists:
+                futures.append(self._submit(fn, args))
+        except BaseException:
+            self._release(len(arg_lists) - len(futures) - 1)  # _submit released its own
+            raise
+        done = await asyncio.gather(*(asyncio.wrap_future(future) for future in futures))
+        return [result for _, result in done]
+
+    def _check_capacity(self, tasks: int) -> None:
+        if self._pending + tasks > self.max_pending:
+            self.counters["rejected"] += 1
+            raise QueueFull(f"{self._pending} compute tasks pending (limit {self.max_pending})")
+
+    def _admit(self, tasks: int, admit: bool) -> None:
+        with self._lock:
+            if admit:
+                self._check_capacity(tasks)
+            self._pending += tasks
+            self.counters["submitted"] += tasks
+
+    def _release(self, tasks: int) -> None:
+        with self._lock:
+            self._pending -= tasks
+            self.counters["failed"] += tasks
+
+    def _submit(self, fn: Callable[..., Any], args: Tuple[Any, ...]) -> Future:
+        """Hand one admitted task to the executor; its slot is freed when it ends."""
+        submitted = time.time()
+        try:
+            future = self.executor().submit(_timed, fn, args)
+        except BaseException:
+            self._release(1)
+            raise
+        # a cancelled await leaves the task queued or running until then
+        future.add_done_callback(lambda done: self._finished(done, submitted))
+        return future
+
+    def _finished(self, future: Future, submitted: float) -> None:
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled():
+                self.counters["cancelled"] += 1
+            elif future.exception() is not None:
+                self.counters["failed"] += 1
+            else:
+                started = future.result()[0]
+                self.counters["completed"] += 1
+                self._queue_seconds.append(max(0.0, started - submitted))
+                self._run_seconds.append(time.time() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.counters,
+                "kind": self.kind,
+                "pending": self._pending,
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "queue_seconds": timing_summary(self._queue_seconds),
+                "run_seconds": timing_summary(self._run_seconds),
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_EXECUTOR: ComputeExecutor | None = None
+
+
+def get_compute_executor() -> ComputeExecutor:
+    """The single process-wide executor (created on first call)."""
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = ComputeExecutor(
+            kind=os.environ.get("RISKSCOPE_COMPUTE_EXECUTOR", "thread"),
+            max_workers=int(os.environ.get("RISKSCOPE_COMPUTE_WORKERS", DEFAULT_MAX_WORKERS)),
+            max_pending=int(os.environ.get("RISKSCOPE_COMPUTE_MAX_PENDING", DEFAULT_MAX_PENDING)),
+        )
+    return _EXECUTOR
+
+
+# ----------------------------------------------------------------------
+# Tasks (module-level so a process pool can pickle them by reference)
+# ----------------------------------------------------------------------
+_SIMULATOR = None
+
+
+def worker_simulator():
+    """One simulator per worker process (shared by threads in thread mode)."""
+    global _SIMULATOR
+    if _SIMULATOR is None:
+        from src.simulation.simulator import PFASRiskSimulator
+
+        _SIMULATOR = PFASRiskSimulator()
+    return _SIMULATOR
+
+
+def batch_task(payloads):
+    return worker_simulator().simulate_batch(payloads)
+
+
+def batch_dicts_task(payloads):
+    return worker_simulator().simulate_batch(payloads).to_dicts()
+
+
+def uncertainty_task(payload, options):
+    simulator = worker_simulator()
+    result = simulator.simulate(payload)
+    result["uncertainty"] = simulator.simulate_uncertainty(
+        payload,
+        n_draws=options.get("n_draws", 100_000),
+        seed=options.get("seed", 0),
+        percentiles=options.get("percentiles", (5.0, 50.0, 95.0)),
+        distributions=options.get("distributions"),
+        return_draws=bool(options.get("return_draws", False)),
+    )
+    return result
+
+
+def trajectory_task(payload, step):
+    return worker_simulator().simulate_trajectory(payload, step=step)
+
+
+def sensitivity_plan_task(payload, options):
+    from src.simulation.sensitivity import DEFAULT_N_BASE, plan_sensitivity
+
+    return plan_sensitivity(
+        worker_simulator(),
+        payload,
+        method=options.get("method", "sobol"),
+        factors=options.get("factors"),
+        n_base=options.get("n_base", DEFAULT_N_BASE),
+    )
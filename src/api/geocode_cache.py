@@ -0,0 +1,231 @@
+# src/api/geocode_cache.py
+
+"""
+Geohash-keyed reverse-geocode cache.
+
+Clicks are bucketed by geohash (precision 7 ≈ 150 m cells by default), so
+repeated clicks on the same area hit one entry. Entries expire after
+`ttl_seconds` and the in-memory tier evicts least-recently-used entries
+beyond `max_entries`.
+
+An optional SQLite tier (one table, keyed by geohash) survives restarts and
+is shared by workers on the same host: memory misses are looked up there and
+promoted. Hit/miss/eviction counters are exposed through stats().
+
+Async callers use aget()/aput(): the in-memory tier is answered on the event
+loop and only SQLite reads and writes go to the thread pool.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+DEFAULT_PRECISION = 7
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_TTL_SECONDS = 24 * 3600.0
+
+Place = Dict[str, Any]
+
+
+def geohash_encode(lat: float, lon: float, precision: int = DEFAULT_PRECISION) -> str:
+    """Standard base-32 geohash of (lat, lon)."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars = []
+    bits = value = 0
+    even = True  # even bits refine longitude
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                value = value * 2 + 1
+                lon_lo = mid
+            else:
+                value *= 2
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                value = value * 2 + 1
+                lat_lo = mid
+            else:
+                value *= 2
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits = value = 0
+    return "".join(chars)
+
+
+class GeocodeCache:
+    def __init__(
+        self,
+        precision: int = DEFAULT_PRECISION,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        sqlite_path: Path | str | None = None,
+    ) -> None:
+        self.precision = precision
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.sqlite_path = Path(sqlite_path) if sqlite_path else None
+
+        self._entries: "OrderedDict[str, Tuple[float, Place, str]]" = OrderedDict()
+        self._lock = threading.Lock()  # memory tier and counters
+        self._db_lock = threading.Lock()  # the SQLite connection
+        self._db: sqlite3.Connection | None = None
+        self.counters = {
+            "hits": 0,
+            "misses": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+        if self.sqlite_path is not None:
+            self._open_db()
+
+    # ------------------------------------------------------------------
+    # SQLite tier
+    # ------------------------------------------------------------------
+    def _open_db(self) -> None:
+        self.sqlite_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.sqlite_path, check_same_thread=False, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS geocode ("
+            " geohash TEXT PRIMARY KEY, place TEXT NOT NULL,"
+            " source TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def _db_get(self, key: str, now: float) -> Tuple[float, Place, str] | None:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT place, source, expires_at FROM geocode WHERE geohash = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[2] <= now:
+                self._db.execute("DELETE FROM geocode WHERE geohash = ?", (key,))
+                self._db.commit()
+                return None
+        return row[2], json.loads(row[0]), row[1]
+
+    def _db_put(self, key: str, entry: Tuple[float, Place, str]) -> None:
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO geocode (geohash, place, source, expires_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(entry[1]), entry[2], entry[0]),
+            )
+            self._db.commit()
+
+    def _disk_get(self, key: str, now: float) -> Tuple[float, Place, str] | None:
+        """SQLite lookup; a hit is promoted into the memory tier."""
+        entry = self._db_get(key, now)
+        if entry is not None:
+            with self._lock:
+                self._insert(key, entry)
+                self.counters["disk_hits"] += 1
+        return entry
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def key(self, lat: float, lon: float) -> str:
+        return geohash_encode(lat, lon, self.precision)
+
+    def get(self, lat: float, lon: float) -> Tuple[Place, str] | None:
+        """(place, original source) for the point's cell, or None on a miss."""
+        key, now = self.key(lat, lon), time.time()
+        entry = self._memory_get(key, now)
+        if entry is None and self._db is not None:
+            entry = self._disk_get(key, now)
+        return self._answer(entry)
+
+    async def aget(self, lat: float, lon: float) -> Tuple[Place, str] | None:
+        """get() for the event loop: a memory miss reads SQLite in the thread pool."""
+        key, now = self.key(lat, lon), time.time()
+        entry = self._memory_get(key, now)
+        if entry is None and self._db is not None:
+            entry = await run_in_threadpool(self._disk_get, key, now)
+        return self._answer(entry)
+
+    def put(self, lat: float, lon: float, place: Place, source: str) -> None:
+        key, entry = self._entry(lat, lon, place, source)
+        if self._db is not None:
+            self._db_put(key, entry)
+
+    async def aput(self, lat: float, lon: float, place: Place, source: str) -> None:
+        """put() for the event loop: the SQLite write runs in the thread pool."""
+        key, entry = self._entry(lat, lon, place, source)
+        if self._db is not None:
+            await run_in_threadpool(self._db_put, key, entry)
+
+    def _memory_get(self, key: str, now: float) -> Tuple[float, Place, str] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self.counters["expirations"] += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.counters["memory_hits"] += 1
+            return entry
+
+    def _answer(self, entry: Tuple[float, Place, str] | None) -> Tuple[Place, str] | None:
+        with self._lock:
+            self.counters["hits" if entry is not None else "misses"] += 1
+        return (entry[1], entry[2]) if entry is not None else None
+
+    def _entry(self, lat: float, lon: float, place: Place, source: str) -> Tuple[str, Tuple[float, Place, str]]:
+        """Insert into the memory tier; returns (key, entry) for the SQLite tier."""
+        key = self.key(lat, lon)
+        entry = (time.time() + self.ttl_seconds, place, source)
+        with self._lock:
+            self._insert(key, entry)
+        return key, entry
+
+    def _insert(self, key: str, entry: Tuple[float, Place, str]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM geocode")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {
+                **self.counters,
+                "hit_rate": self.counters["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "precision": self.precision,
+                "ttl_seconds": self.ttl_seconds,
+                "sqlite_path": str(self.sqlite_path) if self.sqlite_path else None,
+            }
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,270 @@
+# src/api/geocoding_client.py
+
+"""
+Async Nominatim (or local stand-in) reverse-geocoding client.
+
+- one persistent httpx.AsyncClient (connection pool, keep-alive, timeouts)
+- per-host rate limiting: requests to a host are spaced at least
+  1 / rate_per_second apart (Nominatim's policy is 1 req/s)
+- single-flight: concurrent lookups of the same rounded coordinate share
+  one upstream call
+- circuit breaker: after `failure_threshold` consecutive failures the
+  upstream is skipped for `reset_timeout` seconds (then one probe is let
+  through); while open, lookups are answered from the cache of previous
+  answers or return None so the caller can use the offline index
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from src.config.state_codes import STATE_ABBREV_TO_FIPS, STATE_NAME_TO_ABBREV
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/reverse"
+USER_AGENT = "RiskScope"
+
+DEFAULT_TIMEOUT_SECONDS = 5.0
+DEFAULT_RATE_PER_SECOND = 1.0
+DEFAULT_MAX_CONNECTIONS = 4
+DEFAULT_PRECISION = 3  # decimal places (~100 m) for coalescing and caching
+DEFAULT_CACHE_SIZE = 4096
+
+Place = Dict[str, Any]
+Key = Tuple[float, float]
+
+
+class HostRateLimiter:
+    """Spaces requests to each host at least `interval` seconds apart."""
+
+    def __init__(self, rate_per_second: float) -> None:
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def rebind(self) -> None:
+        """Drop locks created on a previous event loop (spacing is kept)."""
+        self._locks = {}
+
+    async def acquire(self, host: str) -> None:
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            wait = self._next.get(host, 0.0) - now
+            if wait > 0:
+                await asyncio.sleep(wait)
+                now += wait
+            self._next[host] = now + self.interval
+
+
+class CircuitBreaker:
+    """closed → open after N consecutive failures → half-open after a cooldown."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True  # exactly one probe request
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def release_probe(self) -> None:
+        """The probe ended without an answer (cancelled): let the next one through."""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class AnswerCache:
+    """Small LRU of previous upstream answers keyed by rounded coordinate."""
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Key, Place | None]" = OrderedDict()
+
+    def get(self, key: Key) -> Tuple[bool, Place | None]:
+        if key not in self._entries:
+            return False, None
+        self._entries.move_to_end(key)
+        return True, self._entries[key]
+
+    def put(self, key: Key, place: Place | None) -> None:
+        self._entries[key] = place
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def parse_nominatim(data: Dict[str, Any]) -> Place | None:
+    """Nominatim JSON → place dict (state level), or None if not a US state."""
+    full_state = (data.get("address") or {}).get("state")
+    abbrev = STATE_NAME_TO_ABBREV.get(full_state or "")
+    if abbrev is None:
+        return None
+    return {
+        "state_fips": STATE_ABBREV_TO_FIPS[abbrev],
+        "state_abbrev": abbrev,
+        "state_name": full_state,
+        "county_fips": None,
+        "county_name": (data.get("address") or {}).get("county"),
+    }
+
+
+class GeocodingClient:
+    def __init__(
+        self,
+        base_url: str = NOMINATIM_URL,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        rate_per_second: float = DEFAULT_RATE_PER_SECOND,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        precision: int = DEFAULT_PRECISION,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        cache: AnswerCache | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.base_url = base_url
+        self.host = urlsplit(base_url).netloc
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.precision = precision
+        self.limiter = HostRateLimiter(rate_per_second)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.cache = cache if cache is not None else AnswerCache()
+        self.transport = transport
+        self.stats = {"upstream": 0, "coalesced": 0, "cache": 0, "failures": 0, "short_circuited": 0}
+
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._inflight: Dict[Key, asyncio.Future] = {}
+
+    # ------------------------------------------------------------------
+    # Connection pool
+    # ------------------------------------------------------------------
+    def _http(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            # a pool is bound to the loop that created it
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                headers={"User-Agent": USER_AGENT},
+                transport=self.transport,
+            )
+            self._loop = loop
+            self._inflight = {}
+            self.limiter.rebind()
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+    def key(self, lat: float, lon: float) -> Key:
+        return (round(lat, self.precision), round(lon, self.precision))
+
+    async def reverse(self, lat: float, lon: float) -> Tuple[Place | None, str]:
+        """
+        (place, source) where source is "nominatim", "cache" or "none".
+        Never raises for upstream problems.
+        """
+        key = self.key(lat, lon)
+        hit, place = self.cache.get(key)
+        if hit:
+            self.stats["cache"] += 1
+            return place, "cache"
+
+        self._http()  # binds the pool (and in-flight table) to this loop
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(future)
+
+        if not self.breaker.allow():
+            self.stats["short_circuited"] += 1
+            return None, "none"
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        result: Tuple[Place | None, str] = (None, "none")
+        try:
+            result = await self._fetch(key)
+        except BaseException:
+            # e.g. CancelledError on client disconnect, also while waiting
+            # for the rate limiter: a half-open probe must not stay taken
+            self.breaker.release_probe()
+            raise
+        finally:
+            # followers get an answer even if this (leader) task is cancelled
+            self._inflight.pop(key, None)
+            future.set_result(result)
+        return result
+
+    async def _fetch(self, key: Key) -> Tuple[Place | None, str]:
+        await self.limiter.acquire(self.host)
+        self.stats["upstream"] += 1
+        try:
+            resp = await self._http().get(
+                self.base_url, params={"lat": key[0], "lon": key[1], "format": "json"}
+            )
+            resp.raise_for_status()
+            place = parse_nominatim(resp.json())
+        except (httpx.HTTPError, ValueError):
+            self.stats["failures"] += 1
+            self.breaker.record_failure()
+            return None, "none"
+
+        self.breaker.record_success()
+        self.cache.put(key, place)
+        return place, "nominatim"
+
+
+_CLIENT: GeocodingClient | None = None
+
+
+def get_geocoding_client() -> GeocodingClient:
+    """The single process-wide client (created on first call)."""
+    global _CLIENT
+    if _CLIENT is None:
+        # RISKSCOPE_NOMINATIM_URL points at a self-hosted instance or a stub
+        _CLIENT = GeocodingClient(
+            base_url=os.environ.get("RISKSCOPE_NOMINATIM_URL", NOMINATIM_URL),
+            rate_per_second=float(os.environ.get("RISKSCOPE_NOMINATIM_RATE", DEFAULT_RATE_PER_SECOND)),
+        )
+    return _CLIENT
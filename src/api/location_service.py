@@ -1,14 +1,49 @@
 # src/api/location_service.py
 
-from fastapi import APIRouter, HTTPException
+import json
+import os
+from typing import Any, AsyncIterator, Dict, List
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import requests
 
-from src.etl.ucmr5_ingest import load_ucmr5_background
+from src.api.backpressure import QueueFull
+from src.api.compute import get_compute_executor
+from src.api.geocode_cache import DEFAULT_MAX_ENTRIES, DEFAULT_PRECISION, DEFAULT_TTL_SECONDS, GeocodeCache
+from src.api.geocoding_client import get_geocoding_client
+from src.config.state_codes import NATIONAL_FIPS
+from src.etl.background_repository import get_background_repository
+from src.etl.boundary_index import get_reverse_geocoder
+from src.simulation.scenario_codec import column_errors, encode_scenarios
+from src.simulation.simulator import PFASRiskSimulator
 
 router = APIRouter()
 
-BACKGROUND = load_ucmr5_background()
+# Shared with PFASRiskSimulator: one table, one fallback chain
+BACKGROUND = get_background_repository()
+SIMULATOR = PFASRiskSimulator(BACKGROUND)
+
+# /simulate-locations: points per request, and points per streamed block
+MAX_BATCH_POINTS = 100_000
+BATCH_BLOCK_POINTS = 500
+
+# Primary source: "offline" (packed boundary index, Nominatim as fallback)
+# or "nominatim" (upstream first; offline index when it fails or the
+# circuit is open). RISKSCOPE_NOMINATIM_FALLBACK=0 disables the upstream.
+GEOCODER_PRIMARY = os.environ.get("RISKSCOPE_GEOCODER", "offline")
+NOMINATIM_FALLBACK = os.environ.get("RISKSCOPE_NOMINATIM_FALLBACK", "1") == "1"
+
+# Geohash cache in front of the lookup (RISKSCOPE_GEOCACHE_SQLITE enables
+# the on-disk tier that survives restarts)
+GEOCODE_CACHE = GeocodeCache(
+    precision=int(os.environ.get("RISKSCOPE_GEOCACHE_PRECISION", DEFAULT_PRECISION)),
+    max_entries=int(os.environ.get("RISKSCOPE_GEOCACHE_SIZE", DEFAULT_MAX_ENTRIES)),
+    ttl_seconds=float(os.environ.get("RISKSCOPE_GEOCACHE_TTL", DEFAULT_TTL_SECONDS)),
+    sqlite_path=os.environ.get("RISKSCOPE_GEOCACHE_SQLITE") or None,
+)
 
 
 class LocationRequest(BaseModel):
@@ -16,68 +51,71 @@ class LocationRequest(BaseModel):
     lon: float
 
 
-@router.post("/simulate-location")
-def simulate_location(payload: LocationRequest):
-    lat = payload.lat
-    lon = payload.lon
+def offline_lookup(lat: float, lon: float) -> dict | None:
+    geocoder = get_reverse_geocoder()
+    return geocoder.lookup(lat, lon) if geocoder is not None else None
 
-    # -------------------------
-    # Reverse Geocode → State name
-    # -------------------------
-    try:
-        url = f"https://nominatim.openstreetmap.org/reverse?lat={lat}&lon={lon}&format=json"
-        resp = requests.get(url, headers={"User-Agent": "RiskScope"})
-        data = resp.json()
-        full_state = data.get("address", {}).get("state", "UNKNOWN")
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Reverse geocode error: {str(e)}")
 
-    # -------------------------
-    # State name → USPS abbreviation
-    # -------------------------
-    state_name_to_abbrev = {
-        "Virginia": "VA",
-        "Maryland": "MD",
-        "Pennsylvania": "PA",
-        "West Virginia": "WV",
-        "Delaware": "DE",
+async def reverse_geocode(lat: float, lon: float) -> tuple[dict | None, str]:
+    """(place, source) with source "offline", "nominatim", "cache" or "none"."""
+    cached = await GEOCODE_CACHE.aget(lat, lon)
+    if cached is not None:
+        return cached[0], "cache"
+
+    place, source = await lookup_uncached(lat, lon)
+    if place is not None:
+        # failures are not cached: the next click retries
+        await GEOCODE_CACHE.aput(lat, lon, place, source)
+    return place, source
+
+
+async def lookup_uncached(lat: float, lon: float) -> tuple[dict | None, str]:
+    if GEOCODER_PRIMARY == "nominatim" and NOMINATIM_FALLBACK:
+        place, source = await get_geocoding_client().reverse(lat, lon)
+        if place is not None:
+            return place, source
+        place = offline_lookup(lat, lon)
+        return (place, "offline") if place is not None else (None, "none")
+
+    place = offline_lookup(lat, lon)
+    if place is not None:
+        return place, "offline"
+    if NOMINATIM_FALLBACK:
+        return await get_geocoding_client().reverse(lat, lon)
+    return None, "none"
+
+
+@router.get("/geocoder-stats")
+def geocoder_stats():
+    """Cache hit/miss counters and upstream client counters for monitoring."""
+    client = get_geocoding_client()
+    return {
+        "cache": GEOCODE_CACHE.stats(),
+        "upstream": {**client.stats, "circuit": client.breaker.state},
     }
-    abbrev = state_name_to_abbrev.get(full_state, "US")
+
+
+@router.post("/simulate-location")
+async def simulate_location(payload: LocationRequest):
+    lat = payload.lat
+    lon = payload.lon
 
     # -------------------------
-    # Abbrev → FIPS (matches UCMR5)
+    # Reverse geocode → state / county FIPS (national row if unresolved)
     # -------------------------
-    abbrev_to_fips = {
-        "AL": "01","AK": "02","AZ": "04","AR": "05",
-        "CA": "06","CO": "08","CT": "09","DE": "10",
-        "FL": "12","GA": "13","HI": "15","ID": "16",
-        "IL": "17","IN": "18","IA": "19","KS": "20",
-        "KY": "21","LA": "22","ME": "23","MD": "24",
-        "MA": "25","MI": "26","MN": "27","MS": "28",
-        "MO": "29","MT": "30","NE": "31","NV": "32",
-        "NH": "33","NJ": "34","NM": "35","NY": "36",
-        "NC": "37","ND": "38","OH": "39","OK": "40",
-        "OR": "41","PA": "42","RI": "44","SC": "45",
-        "SD": "46","TN": "47","TX": "48","UT": "49",
-        "VT": "50","VA": "51","WA": "53","WV": "54",
-        "WI": "55","WY": "56","US": "US"
-    }
-    fips = abbrev_to_fips.get(abbrev, "US")
+    place, geocoder = await reverse_geocode(lat, lon)
+    place = place or {}
+    fips = place.get("state_fips", NATIONAL_FIPS)
+    abbrev = place.get("state_abbrev") or "US"
 
     # -------------------------
-    # Per-state PFAS background (ppt)
+    # Per-state PFAS background (ppt), national fallback
     # -------------------------
-    chem_map = BACKGROUND.get(fips) or BACKGROUND.get("US", {})
+    chem_map = BACKGROUND.get_background(fips)
 
     bg_pfoa = float(chem_map.get("PFOA", 0.0))
     bg_pfos = float(chem_map.get("PFOS", 0.0))
 
-    # If both zero, fall back to national medians if present
-    if bg_pfoa == 0.0 and bg_pfos == 0.0:
-        us_map = BACKGROUND.get("US", {})
-        bg_pfoa = float(us_map.get("PFOA", bg_pfoa))
-        bg_pfos = float(us_map.get("PFOS", bg_pfos))
-
     combined_bg = (bg_pfoa + bg_pfos) / 2.0 if (bg_pfoa or bg_pfos) else 0.0
 
     return {
@@ -85,6 +123,9 @@ def simulate_location(payload: LocationRequest):
         "lon": lon,
         "state": fips,  # FIPS for simulator
         "state_abbrev": abbrev,
+        "county_fips": place.get("county_fips"),
+        "county_name": place.get("county_name"),
+        "geocoder": geocoder,
         "background_pfoa_ppt": bg_pfoa,
         "background_pfos_ppt": bg_pfos,
         "background_pfas_median_ppt": combined_bg,
@@ -92,3 +133,122 @@ def simulate_location(payload: LocationRequest):
         "receiving_flow_mgd": 50.0,
         "discharge_flow_mgd": 3.0,
     }
+
+
+# ----------------------------------------------------------------------
+# Batch: many points, resolved offline and simulated in blocks
+# ----------------------------------------------------------------------
+def parse_points(body: bytes, content_type: str) -> List[Dict[str, Any]]:
+    """JSON array, or NDJSON (one point per line) when the content type says so."""
+    try:
+        if "ndjson" in content_type:
+            points = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            points = json.loads(body or b"[]")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+
+    if not isinstance(points, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of points")
+    if len(points) > MAX_BATCH_POINTS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_POINTS} points per request")
+    for i, point in enumerate(points):
+        try:
+            float(point["lat"]), float(point["lon"])
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail=f"Point {i}: numeric 'lat' and 'lon' are required")
+
+    errors = point_errors(points)
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+    return points
+
+
+def point_payload(point: Dict[str, Any], state: str | None) -> Dict[str, Any]:
+    return {
+        "state": state or NATIONAL_FIPS,
+        "chemicals": point.get("chemicals") or {"concentrations_ppt": {}},
+        "environmental_factors": point.get("environmental_factors") or {},
+        "data_center": point.get("data_center") or {},
+    }
+
+
+def point_errors(points: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Every invalid value in the batch, pydantic-style ("loc" starts with
+    "body", point index). Sections are checked against the model schema in
+    one columnar pass; fields a point leaves out are not errors, since the
+    simulator fills in their defaults.
+    """
+    errors = []
+    coords = np.array([[float(p["lat"]), float(p["lon"])] for p in points]).reshape(-1, 2)
+    for axis, name, limit in ((0, "lat", 90.0), (1, "lon", 180.0)):
+        values = coords[:, axis]
+        with np.errstate(invalid="ignore"):
+            bad = ~np.isfinite(values) | (np.abs(values) > limit)
+        msg = f"Input should be a finite number between -{limit:g} and {limit:g}"
+        errors.extend({"loc": (i, name), "type": "value_error", "msg": msg} for i in np.flatnonzero(bad).tolist())
+
+    columns = encode_scenarios([point_payload(p, None) for p in points], validate=False)
+    errors.extend(e for e in column_errors(columns) if e["type"] != "missing")
+    errors.sort(key=lambda e: e["loc"][0])
+    return [{**e, "loc": ["body", *e["loc"]]} for e in errors]
+
+
+def resolve_and_simulate(points: List[Dict[str, Any]], offset: int) -> bytes:
+    """One block: vectorized point-in-polygon, batch simulation, NDJSON lines."""
+    lats = np.array([float(p["lat"]) for p in points])
+    lons = np.array([float(p["lon"]) for p in points])
+
+    geocoder = get_reverse_geocoder()
+    if geocoder is not None:
+        states, counties = geocoder.lookup_many(lats, lons)
+    else:
+        states, counties = [None] * len(points), [None] * len(points)
+
+    payloads = [point_payload(point, state) for point, state in zip(points, states)]
+    results = SIMULATOR.simulate_batch(payloads).to_dicts()
+
+    lines = []
+    for i, (point, state, county, result) in enumerate(zip(points, states, counties, results)):
+        result = {
+            "index": offset + i,
+            "lat": point["lat"],
+            "lon": point["lon"],
+            "county_fips": county,
+            "geocoder": "offline" if state else "none",
+            **result,
+        }
+        lines.append(json.dumps(result))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+async def stream_locations(points: List[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    executor = get_compute_executor()
+    for start in range(0, len(points), BATCH_BLOCK_POINTS):
+        block = points[start:start + BATCH_BLOCK_POINTS]
+        # CPU-bound: blocks run on the compute executor; the request was
+        # admitted up front, so later blocks are not rejected mid-stream
+        yield await executor.run(resolve_and_simulate, block, start, admit=False)
+
+
+@router.post("/simulate-locations")
+async def simulate_locations(request: Request):
+    """
+    Batch /simulate-location + /simulate. Body: JSON array, or NDJSON with
+    Content-Type application/x-ndjson; each point is {"lat", "lon"} plus
+    optional "chemicals", "environmental_factors", "data_center" sections.
+
+    Points are resolved with the offline boundary index only (no upstream
+    calls; unresolved points use the national background) and results are
+    streamed back as NDJSON, one line per point, in input order. The whole
+    batch is validated first: any invalid point answers 422 listing each
+    offending point's index.
+    """
+    # parsing and validating 1e5 points is CPU work: keep it off the loop
+    points = await run_in_threadpool(parse_points, await request.body(), request.headers.get("content-type", ""))
+    try:
+        get_compute_executor().check_capacity()
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    return StreamingResponse(stream_locations(points), media_type="application/x-ndjson")
@@ -1,11 +1,27 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.responses import HTMLResponse
 from pathlib import Path
 
+from src.api.compute import get_compute_executor
+from src.api.geocoding_client import get_geocoding_client
+from src.api.pdf_jobs import get_pdf_job_queue
 from src.api.routes import router as simulation_router
 from src.api.location_service import router as location_router
 
-app = FastAPI(title="PFAS DC RiskScope")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # close the pooled upstream geocoding connections
+    await get_geocoding_client().aclose()
+    # stop the PDF render workers and the compute executor
+    get_pdf_job_queue().shutdown()
+    get_compute_executor().shutdown()
+
+
+app = FastAPI(title="PFAS DC RiskScope", lifespan=lifespan)
 
 
 # Mount backend routers
@@ -1,39 +1,178 @@
 """
 payload_validator.py
 
-Minimal validation for simulation payload structure.
-This prevents invalid/broken requests from reaching the simulation engine.
+Request models for simulation payloads, generated from
+model_schema.PFAS_RISK_MODEL_SCHEMA and compiled once at import:
+
+- "type" → float / int / str / bool / dict[str, float]
+- "range" [lo, hi] → ge / le bounds (None = unbounded)
+- "allowed_values" → Literal choices; "allowed_keys" → Literal dict keys
+- "required" without "default" → the field must be sent; a section is
+  required when it has such a field (regulatory and scenario_parameters,
+  whose required fields all have defaults, may be omitted)
+
+NaN and infinity are rejected and unknown keys inside a section are kept.
+The same goes for unknown top-level keys. The endpoint options monte_carlo
+and sensitivity have their own models, bounded like run_monte_carlo() and
+plan_sensitivity(), so bad options answer 422 rather than failing in a
+worker.
+FastAPI validates handler parameters typed with these models and answers
+422 before the simulator runs. Code holding a plain dict can call
+validate_simulation_payload().
 """
 
-from typing import Dict, Any
+from typing import Annotated, Any, Dict, List, Literal, Optional, Union
 
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, TypeAdapter, create_model, model_validator
 
-REQUIRED_TOP_LEVEL_KEYS = [
-    "chemicals",
-    "environmental_factors",
-    "data_center",
-    "scenario_parameters",
-]
+from src.simulation.batch import COOLING_TYPES
+from src.simulation.model_schema import PFAS_RISK_MODEL_SCHEMA
+from src.simulation.monte_carlo import DISTRIBUTIONS, MAX_N_DRAWS, UNCERTAIN_INPUTS
+from src.simulation.sensitivity import DEFAULT_RANGE, FACTORS, MAX_N_BASE, METHODS
 
+# schema sections that describe outputs, not request fields
+OUTPUT_SECTIONS = ("output_fields",)
 
-def validate_simulation_payload(payload: Dict[str, Any]) -> (bool, str):
+SCALAR_TYPES = {"float": float, "int": int, "str": str, "bool": bool}
+
+MODEL_CONFIG = ConfigDict(extra="allow", allow_inf_nan=False)
+
+
+def _bounds(meta: Dict[str, Any]) -> Dict[str, Any]:
+    lo, hi = meta.get("range", (None, None))
+    return {k: v for k, v in (("ge", lo), ("le", hi)) if v is not None}
+
+
+def field_annotation(meta: Dict[str, Any]) -> Any:
+    kind = meta["type"]
+    if kind == "dict[str, float]":
+        key = Literal[tuple(meta["allowed_keys"])] if "allowed_keys" in meta else str
+        value = float
+        if "range" in meta:
+            value = Annotated[float, Field(**_bounds(meta))]
+        return Dict[key, value]
+    if "allowed_values" in meta:
+        return Literal[tuple(meta["allowed_values"])]
+    return SCALAR_TYPES[kind]
+
+
+def field_definition(meta: Dict[str, Any]) -> tuple:
+    annotation = field_annotation(meta)
+    bounds = {} if meta["type"].startswith("dict") else _bounds(meta)
+    description = meta.get("description")
+    if "default" in meta:
+        return annotation, Field(meta["default"], description=description, **bounds)
+    if meta.get("required"):
+        return annotation, Field(..., description=description, **bounds)
+    return Optional[annotation], Field(None, description=description, **bounds)
+
+
+def section_required(section: Dict[str, Any]) -> bool:
+    return any(meta.get("required") and "default" not in meta for meta in section["fields"].values())
+
+
+# ----------------------------------------------------------------------
+# Endpoint options
+# ----------------------------------------------------------------------
+class DistributionOptions(BaseModel):
+    model_config = MODEL_CONFIG
+
+    distribution: Optional[Literal[DISTRIBUTIONS]] = None
+    spread: Optional[float] = Field(None, ge=0.0)
+
+
+class MonteCarloOptions(BaseModel):
+    """payload["monte_carlo"] for /simulate-uncertainty."""
+
+    model_config = MODEL_CONFIG
+
+    n_draws: Optional[int] = Field(None, ge=1, le=MAX_N_DRAWS)
+    seed: Optional[int] = Field(None, ge=0)
+    percentiles: Optional[List[Annotated[float, Field(ge=0.0, le=100.0)]]] = Field(None, min_length=1)
+    distributions: Optional[Dict[Literal[UNCERTAIN_INPUTS], DistributionOptions]] = None
+    return_draws: Optional[bool] = None
+
+
+def _power_of_two(n: int) -> int:
+    if n & (n - 1):
+        raise ValueError("n_base must be a power of two")
+    return n
+
+
+class FactorOptions(BaseModel):
+    model_config = MODEL_CONFIG
+
+    low: Optional[float] = Field(None, ge=0.0)
+    high: Optional[float] = Field(None, ge=0.0)
+    values: Optional[List[Literal[tuple(COOLING_TYPES)]]] = Field(None, min_length=1)  # cooling_type only
+
+    @model_validator(mode="after")
+    def _ordered(self) -> "FactorOptions":
+        low = DEFAULT_RANGE[0] if self.low is None else self.low
+        high = DEFAULT_RANGE[1] if self.high is None else self.high
+        if low > high:
+            raise ValueError(f"needs low <= high, got low={low}, high={high}")
+        return self
+
+
+class SensitivityOptions(BaseModel):
+    """payload["sensitivity"] for /simulate-sensitivity."""
+
+    model_config = MODEL_CONFIG
+
+    method: Optional[Literal[METHODS]] = None
+    factors: Optional[
+        Union[
+            Annotated[List[Literal[FACTORS]], Field(min_length=1)],
+            Annotated[Dict[Literal[FACTORS], FactorOptions], Field(min_length=1)],
+        ]
+    ] = None
+    n_base: Optional[Annotated[int, Field(ge=2, le=MAX_N_BASE), AfterValidator(_power_of_two)]] = None
+
+
+def build_payload_model(schema: Dict[str, Dict[str, Any]] = PFAS_RISK_MODEL_SCHEMA) -> type[BaseModel]:
+    sections: Dict[str, Any] = {}
+    for name, section in schema.items():
+        if name in OUTPUT_SECTIONS:
+            continue
+        model_name = "".join(part.title() for part in name.split("_")) + "Section"
+        fields = {field: field_definition(meta) for field, meta in section["fields"].items()}
+        model = create_model(model_name, __config__=MODEL_CONFIG, **fields)
+        sections[name] = (model, ...) if section_required(section) else (Optional[model], None)
+
+    return create_model(
+        "SimulationPayload",
+        __config__=MODEL_CONFIG,
+        state=(Optional[str], None),
+        lat=(Optional[float], Field(None, ge=-90.0, le=90.0)),
+        lon=(Optional[float], Field(None, ge=-180.0, le=180.0)),
+        monte_carlo=(Optional[MonteCarloOptions], None),
+        sensitivity=(Optional[SensitivityOptions], None),
+        **sections,
+    )
+
+
+SimulationPayload = build_payload_model()
+SIMULATION_BATCH = TypeAdapter(List[SimulationPayload])
+
+
+def to_payload(model: BaseModel) -> Dict[str, Any]:
     """
-    Returns (is_valid, error_message)
+    Plain dict for the simulator: the fields that were sent, numbers
+    coerced to their schema types, defaults not filled in (the simulator
+    owns those).
     """
-    # Check required sections exist
-    for key in REQUIRED_TOP_LEVEL_KEYS:
-        if key not in payload:
-            return False, f"Missing required field: '{key}'"
+    return model.model_dump(exclude_unset=True)
+
+
+def validate_simulation_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a dict payload; raises pydantic.ValidationError if it is malformed."""
+    return to_payload(SimulationPayload.model_validate(payload))
 
-    # Check chemical concentrations
-    if "concentrations_ppt" not in payload["chemicals"]:
-        return False, "Missing 'chemicals.concentrations_ppt'"
 
-    # Check environmental factors exist
-    if "groundwater_vulnerability_index" not in payload["environmental_factors"]:
-        return False, "Missing groundwater vulnerability index"
+def validate_simulation_batch(payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [to_payload(model) for model in SIMULATION_BATCH.validate_python(payloads)]
 
-    return True, "OK"
 
 def validate_location_payload(payload: dict) -> None:
     """
@@ -0,0 +1,99 @@
+# src/api/pdf_bulk.py
+
+"""
+Bulk PDF export: one report per site for a whole portfolio.
+
+- format="zip": sites are split into chunks rendered in parallel on the PDF
+  process pool (render_reports, one standalone PDF per site). ZIP entries
+  are written as chunks finish and the archive is streamed out as it grows;
+  at most `max_in_flight` chunks are outstanding, so memory stays bounded.
+- format="pdf": a single multi-page document. ReportLab builds one document
+  on one canvas, so it is rendered by one pool worker (render_multipage,
+  static template stored once as a PDF form) and streamed in blocks.
+
+Both share one "Generated" timestamp across every report of the export.
+"""
+
+import re
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Sequence
+
+from src.api.pdf_exporter import render_multipage, render_reports
+
+BULK_FORMATS = ("zip", "pdf")
+DEFAULT_CHUNK_SIZE = 16
+STREAM_BLOCK_BYTES = 64 * 1024
+
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9_-]")
+
+
+class _Sink:
+    """Write-only buffer zipfile streams into (no seek, so entries use data descriptors)."""
+
+    def __init__(self) -> None:
+        self.parts: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+
+def entry_name(index: int, result: Dict[str, Any]) -> str:
+    # state comes from the request: keep only [A-Za-z0-9_-] so it cannot
+    # add path separators or ".." to the archive entry
+    state = _UNSAFE_NAME.sub("", str(result.get("state") or ""))[:16] or "NA"
+    return f"site_{index + 1:04d}_{state}.pdf"
+
+
+def stream_zip(
+    results: Sequence[Dict[str, Any]],
+    executor: Executor,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_in_flight: int = 4,
+) -> Iterator[bytes]:
+    """ZIP archive bytes, one PDF per result, in order of chunk completion."""
+    generated = datetime.utcnow().isoformat()
+    starts = iter(range(0, len(results), chunk_size))
+    in_flight: Dict[Future, int] = {}
+
+    def fill() -> None:
+        while len(in_flight) < max_in_flight:
+            start = next(starts, None)
+            if start is None:
+                return
+            chunk = list(results[start:start + chunk_size])
+            in_flight[executor.submit(render_reports, chunk, generated)] = start
+
+    sink = _Sink()
+    try:
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+            fill()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    start = in_flight.pop(future)
+                    for i, content in enumerate(future.result(), start):
+                        archive.writestr(entry_name(i, results[i]), content)
+                fill()
+                yield sink.drain()
+        yield sink.drain()  # central directory
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+def stream_multipage(results: Sequence[Dict[str, Any]], executor: Executor) -> Iterator[bytes]:
+    """One multi-page PDF, rendered on a pool worker and streamed in blocks."""
+    content = executor.submit(render_multipage, list(results)).result()
+    for start in range(0, len(content), STREAM_BLOCK_BYTES):
+        yield content[start:start + STREAM_BLOCK_BYTES]
@@ -1,108 +1,243 @@
 # src/api/pdf_exporter.py
 
+import hashlib
+import io
+import json
+import threading
+import uuid
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime
 
 from reportlab.lib.pagesizes import LETTER
 from reportlab.pdfgen import canvas
 
+from src.simulation.result_cache import canonicalize
 
-def generate_pdf_report(result: dict) -> str:
+
+OUTPUT_DIR = Path("assets/report_outputs")
+
+
+def report_filename(tag: str | None = None) -> str:
+    """Timestamped name made unique by a tag (a job id, or a fresh uuid)."""
+    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    return f"pfas_risk_report_{timestamp}_{(tag or uuid.uuid4().hex)[:12]}.pdf"
+
+
+def generate_pdf_report(result: dict, pdf_path: str | Path | None = None) -> str:
     """
     Generate a 1-page PDF summarizing the PFAS DC RiskScope simulation.
 
     `result` is the dict returned by PFASRiskSimulator.simulate(), with
-    lat/lon and state optionally attached in routes.py.
+    lat/lon and state optionally attached in routes.py. Written to
+    `pdf_path`, or a unique file under assets/report_outputs.
     """
 
-    output_dir = Path("assets/report_outputs")
-    output_dir.mkdir(parents=True, exist_ok=True)
+    if pdf_path is None:
+        pdf_path = OUTPUT_DIR / report_filename()
+    pdf_path = Path(pdf_path)
+    pdf_path.parent.mkdir(parents=True, exist_ok=True)
 
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    pdf_path = output_dir / f"pfas_risk_report_{timestamp}.pdf"
+    draw_report(str(pdf_path), result)
+    return str(pdf_path)
 
-    c = canvas.Canvas(str(pdf_path), pagesize=LETTER)
-    width, height = LETTER
-    y = height - 50
 
-    def line(text: str, font_size: int = 11, bold: bool = False, dy: int = 16):
-        nonlocal y
-        if bold:
-            c.setFont("Helvetica-Bold", font_size)
+def render_pdf_bytes(result: dict) -> bytes:
+    """Same report as generate_pdf_report(), rendered in memory."""
+    buffer = io.BytesIO()
+    draw_report(buffer, result)
+    return buffer.getvalue()
+
+
+# --------------------------------------------------
+# Report template
+# --------------------------------------------------
+# (text, font_size, bold, dy) per line; None text is a vertical gap of dy.
+# Lines with {fields} are filled per report, the rest are static.
+REPORT_LINES = [
+    ("PFAS DC RiskScope – Simulation Report", 16, True, 22),
+    ("Generated: {generated} UTC", 9, False, 16),
+    (None, 0, False, 10),
+    ("Location & State", 11, True, 18),
+    ("  State (FIPS): {state}", 10, False, 16),
+    ("  Latitude: {lat}", 10, False, 16),
+    ("  Longitude: {lon}", 10, False, 16),
+    (None, 0, False, 8),
+    ("Background PFAS (ppt)", 11, True, 18),
+    ("  PFOA: {bg_pfoa}", 10, False, 16),
+    ("  PFOS: {bg_pfos}", 10, False, 16),
+    (None, 0, False, 8),
+    ("Downstream PFAS (ppt)", 11, True, 18),
+    ("  PFOA: {dn_pfoa}", 10, False, 16),
+    ("  PFOS: {dn_pfos}", 10, False, 16),
+    (None, 0, False, 8),
+    ("Risk & Regulatory Summary", 11, True, 18),
+    ("  Hazard Index: {hi}", 10, False, 16),
+    ("  HI Exceeds 1.0? {hi_flag}", 10, False, 16),
+    ("  Risk Score (0–100): {risk_score}", 10, False, 16),
+    ("  Category: {category}", 10, False, 16),
+    ("  MCL Violation: {mcl_flag}", 10, False, 16),
+    ("  Combined MCL Violation: {combined_flag}", 10, False, 16),
+    (None, 0, False, 8),
+    ("Interpretation Notes", 11, True, 18),
+    ("  • Screening-level model, not a formal regulatory determination.", 9, False, 12),
+    ("  • Background PFAS from UCMR5 state medians with national fallback.", 9, False, 12),
+    ("  • Scenario factors approximate data-center discharge and mixing.", 9, False, 12),
+]
+
+STATIC_FORM = "report_static"
+
+
+class ReportTemplate:
+    """
+    REPORT_LINES laid out once: every line gets its (y, font, size), and
+    lines are split into static text and per-report field lines. Bulk
+    rendering draws the static part into a PDF form once per document and
+    references it from every page.
+    """
+
+    def __init__(self, lines=REPORT_LINES, x: float = 50, top: float = LETTER[1] - 50) -> None:
+        self.x = x
+        self.static = []
+        self.fields = []
+        y = top
+        for text, font_size, bold, dy in lines:
+            if text is not None:
+                font = "Helvetica-Bold" if bold else "Helvetica"
+                (self.fields if "{" in text else self.static).append((y, font, font_size, text))
+            y -= dy
+
+    def _draw(self, c, lines, values=None) -> None:
+        for y, font, font_size, text in lines:
+            c.setFont(font, font_size)
+            c.drawString(self.x, y, text if values is None else text.format(**values))
+
+    def draw_static(self, c) -> None:
+        self._draw(c, self.static)
+
+    def draw_fields(self, c, values: dict) -> None:
+        self._draw(c, self.fields, values)
+
+    def draw_page(self, c, values: dict, static_form: str | None = None) -> None:
+        """One report page; `static_form` names a form already holding draw_static()."""
+        if static_form is None:
+            self.draw_static(c)
         else:
-            c.setFont("Helvetica", font_size)
-        c.drawString(50, y, text)
-        y -= dy
-
-    # --------------------------------------------------
-    # Title
-    # --------------------------------------------------
-    line("PFAS DC RiskScope – Simulation Report", font_size=16, bold=True, dy=22)
-    line(f"Generated: {datetime.utcnow().isoformat()} UTC", font_size=9)
-    y -= 10
-
-    # --------------------------------------------------
-    # Location & State
-    # --------------------------------------------------
-    state = result.get("state", "N/A")
-    lat = result.get("lat", "N/A")
-    lon = result.get("lon", "N/A")
-
-    line("Location & State", bold=True, dy=18)
-    line(f"  State (FIPS): {state}", font_size=10)
-    line(f"  Latitude: {lat}", font_size=10)
-    line(f"  Longitude: {lon}", font_size=10)
-    y -= 8
-
-    # --------------------------------------------------
-    # Background & downstream PFAS (ppt)
-    # --------------------------------------------------
+            c.doForm(static_form)
+        self.draw_fields(c, values)
+        c.showPage()
+
+    def begin_document(self, c) -> str:
+        """Define the static form on `c`; pass the name to draw_page()."""
+        c.beginForm(STATIC_FORM)
+        self.draw_static(c)
+        c.endForm()
+        return STATIC_FORM
+
+
+TEMPLATE = ReportTemplate()
+
+
+def report_values(result: dict, generated: str | None = None) -> dict:
+    """Field values for one report from a simulate() result."""
     upstream = result.get("upstream_background_pfas_ppt", {}) or {}
     downstream = result.get("modeled_downstream_concentrations_ppt", {}) or {}
-
-    bg_pfoa = upstream.get("PFOA", 0.0)
-    bg_pfos = upstream.get("PFOS", 0.0)
-    dn_pfoa = downstream.get("PFOA", None)
-    dn_pfos = downstream.get("PFOS", None)
-
-    line("Background PFAS (ppt)", bold=True, dy=18)
-    line(f"  PFOA: {bg_pfoa}", font_size=10)
-    line(f"  PFOS: {bg_pfos}", font_size=10)
-    y -= 8
-
-    line("Downstream PFAS (ppt)", bold=True, dy=18)
-    line(f"  PFOA: {dn_pfoa}", font_size=10)
-    line(f"  PFOS: {dn_pfos}", font_size=10)
-    y -= 8
-
-    # --------------------------------------------------
-    # Risk & regulatory summary
-    # --------------------------------------------------
-    hi = result.get("hazard_index_value", None)
-    hi_flag = result.get("hazard_index_exceeds_1", False)
-    risk_score = result.get("overall_risk_score_0_100", None)
-    category = result.get("risk_category", "N/A")
-    mcl_flag = result.get("mcl_violation_flag", None)
-    combined_flag = result.get("combined_mcl_violation", False)
-
-    line("Risk & Regulatory Summary", bold=True, dy=18)
-    line(f"  Hazard Index: {hi}", font_size=10)
-    line(f"  HI Exceeds 1.0? {hi_flag}", font_size=10)
-    line(f"  Risk Score (0–100): {risk_score}", font_size=10)
-    line(f"  Category: {category}", font_size=10)
-    line(f"  MCL Violation: {mcl_flag}", font_size=10)
-    line(f"  Combined MCL Violation: {combined_flag}", font_size=10)
-    y -= 8
-
-    # --------------------------------------------------
-    # Notes
-    # --------------------------------------------------
-    line("Interpretation Notes", bold=True, dy=18)
-    line("  • Screening-level model, not a formal regulatory determination.", font_size=9, dy=12)
-    line("  • Background PFAS from UCMR5 state medians with national fallback.", font_size=9, dy=12)
-    line("  • Scenario factors approximate data-center discharge and mixing.", font_size=9, dy=12)
-
-    c.showPage()
+    return {
+        "generated": generated or datetime.utcnow().isoformat(),
+        "state": result.get("state", "N/A"),
+        "lat": result.get("lat", "N/A"),
+        "lon": result.get("lon", "N/A"),
+        "bg_pfoa": upstream.get("PFOA", 0.0),
+        "bg_pfos": upstream.get("PFOS", 0.0),
+        "dn_pfoa": downstream.get("PFOA", None),
+        "dn_pfos": downstream.get("PFOS", None),
+        "hi": result.get("hazard_index_value", None),
+        "hi_flag": result.get("hazard_index_exceeds_1", False),
+        "risk_score": result.get("overall_risk_score_0_100", None),
+        "category": result.get("risk_category", "N/A"),
+        "mcl_flag": result.get("mcl_violation_flag", None),
+        "combined_flag": result.get("combined_mcl_violation", False),
+    }
+
+
+def draw_report(target, result: dict) -> None:
+    """Render the report to `target` (a file name or a binary file object)."""
+    c = canvas.Canvas(target, pagesize=LETTER)
+    TEMPLATE.draw_page(c, report_values(result))
     c.save()
 
-    return str(pdf_path)
+
+def render_reports(results: list, generated: str | None = None) -> list:
+    """One standalone PDF (bytes) per result, sharing a timestamp."""
+    generated = generated or datetime.utcnow().isoformat()
+    rendered = []
+    for result in results:
+        buffer = io.BytesIO()
+        c = canvas.Canvas(buffer, pagesize=LETTER)
+        TEMPLATE.draw_page(c, report_values(result, generated))
+        c.save()
+        rendered.append(buffer.getvalue())
+    return rendered
+
+
+def render_multipage(results: list, generated: str | None = None) -> bytes:
+    """All results as pages of one PDF; the static part is stored once."""
+    generated = generated or datetime.utcnow().isoformat()
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=LETTER)
+    form = TEMPLATE.begin_document(c)
+    for result in results:
+        TEMPLATE.draw_page(c, report_values(result, generated), static_form=form)
+    c.save()
+    return buffer.getvalue()
+
+
+# ----------------------------------------------------------------------
+# Content-addressed cache of rendered reports
+# ----------------------------------------------------------------------
+DEFAULT_PDF_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def report_key(result: dict) -> str:
+    """SHA-256 of the canonical result: equal results render equal reports."""
+    encoded = json.dumps(canonicalize(result), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class PdfCache:
+    """LRU of rendered PDF bytes keyed by report_key(), bounded by total size."""
+
+    def __init__(self, max_bytes: int = DEFAULT_PDF_CACHE_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            content = self._entries.get(key)
+            if content is None:
+                self.counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return content
+
+    def put(self, key: str, content: bytes) -> None:
+        if len(content) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= len(old)
+            self._entries[key] = content
+            self.bytes += len(content)
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.counters["evictions"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.counters, "entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes}
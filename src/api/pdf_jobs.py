@@ -0,0 +1,327 @@
+# src/api/pdf_jobs.py
+
+"""
+Background PDF export jobs.
+
+ReportLab rendering is CPU-bound, so reports are rendered in a bounded
+process pool instead of the request handler:
+
+- submit() registers a job (uuid id, unique output file) and hands it to
+  the pool; when `max_pending` jobs are already queued or rendering it
+  raises QueueFull, which the API turns into 429
+- clients poll the job, or long-poll with wait(), then download the file
+- each job records when it was submitted, started and finished, and stats()
+  aggregates queue wait and render time over recent jobs
+
+With storage="memory" (the default) workers render into a BytesIO and
+return the bytes, so nothing touches disk; those bytes are also kept in a
+content-addressed PdfCache keyed by the result hash, and a resubmitted
+result completes immediately from it. storage="disk" writes files under
+`output_dir` as before.
+
+Finished jobs (and their files) are dropped after `retention_seconds`, or
+oldest first once more than `max_retained` are held.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+from src.api.backpressure import TIMING_WINDOW, QueueFull, timing_summary
+from src.api.pdf_exporter import (
+    OUTPUT_DIR,
+    PdfCache,
+    generate_pdf_report,
+    render_pdf_bytes,
+    report_filename,
+    report_key,
+)
+
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_MAX_PENDING = 32
+DEFAULT_RETENTION_SECONDS = 3600.0
+DEFAULT_MAX_RETAINED = 1000
+STORAGE_MODES = ("memory", "disk")
+
+# (result, pdf path or None for in-memory) -> (started, finished, bytes or None)
+Render = Callable[[Dict[str, Any], str | None], Tuple[float, float, bytes | None]]
+
+
+def render_job(result: Dict[str, Any], pdf_path: str | None) -> Tuple[float, float, bytes | None]:
+    """
+    Pool entry point: render one report to `pdf_path`, or in memory when it
+    is None. Returns (started, finished) wall times and the bytes, if any.
+    """
+    started = time.time()
+    if pdf_path is None:
+        content = render_pdf_bytes(result)
+    else:
+        generate_pdf_report(result, pdf_path)
+        content = None
+    return started, time.time(), content
+
+
+@dataclass
+class ExportJob:
+    id: str
+    filename: str
+    submitted_at: float
+    path: Path | None = None  # storage="disk"
+    content: bytes | None = None  # storage="memory"
+    key: str | None = None  # report_key() when the queue caches bytes
+    cached: bool = False
+    status: str = "queued"  # queued | running | done | failed
+    started_at: float | None = None
+    finished_at: float | None = None
+    error: str | None = None
+    future: Future | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        status = self.status
+        if status == "queued" and self.future is not None and self.future.running():
+            status = "running"
+        timings: Dict[str, Any] = {
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.started_at is not None:
+            timings["queue_seconds"] = self.started_at - self.submitted_at
+        if self.finished_at is not None and self.started_at is not None:
+            timings["render_seconds"] = self.finished_at - self.started_at
+        if self.finished_at is not None:
+            timings["total_seconds"] = self.finished_at - self.submitted_at
+        return {
+            "job_id": self.id,
+            "status": status,
+            "filename": self.filename,
+            "cached": self.cached,
+            "error": self.error,
+            "timings": timings,
+        }
+
+
+class PdfJobQueue:
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        output_dir: Path | str = OUTPUT_DIR,
+        retention_seconds: float = DEFAULT_RETENTION_SECONDS,
+        max_retained: int = DEFAULT_MAX_RETAINED,
+        storage: str = "memory",
+        cache: PdfCache | None = None,
+        executor: Executor | None = None,
+        render: Render = render_job,
+    ) -> None:
+        if storage not in STORAGE_MODES:
+            raise ValueError(f"storage must be one of {STORAGE_MODES}, got {storage!r}")
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.output_dir = Path(output_dir).resolve()
+        self.retention_seconds = retention_seconds
+        self.max_retained = max_retained
+        self.storage = storage
+        self.cache = cache if cache is not None else (PdfCache() if storage == "memory" else None)
+        self.render = render
+
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._jobs: "OrderedDict[str, ExportJob]" = OrderedDict()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._queue_seconds: deque = deque(maxlen=TIMING_WINDOW)
+        self._render_seconds: deque = deque(maxlen=TIMING_WINDOW)
+        self.counters = {
+            "submitted": 0, "rejected": 0, "completed": 0, "failed": 0, "expired": 0, "cache_hits": 0,
+        }
+
+    def pool(self) -> Executor:
+        """The render pool, also used directly by bulk exports."""
+        # created on first use so importing the app does not start workers;
+        # spawn keeps the children free of the server's threads and sockets
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def submit(self, result: Dict[str, Any]) -> ExportJob:
+        """Queue a report for `result`; raises QueueFull under backpressure."""
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        job = ExportJob(id=job_id, filename=report_filename(job_id), submitted_at=now)
+        if self.storage == "disk":
+            job.path = self.output_dir / job.filename
+        if self.cache is not None:
+            job.key = report_key(result)
+            content = self.cache.get(job.key)
+            if content is not None:
+                return self._from_cache(job, content)
+
+        with self._lock:
+            self._prune(now)
+            self._reserve()
+            self.counters["submitted"] += 1
+            self._jobs[job_id] = job
+
+        try:
+            job.future = self._submit(result, job)
+        except BaseException as e:
+            self._finish(job, None, e)
+            raise
+        job.future.add_done_callback(lambda future: self._done(job, future))
+        return job
+
+    def _submit(self, result: Dict[str, Any], job: ExportJob) -> Future:
+        try:
+            return self.pool().submit(self.render, result, self._target(job))
+        except BrokenProcessPool:
+            # a worker died (e.g. OOM); replace the pool once and retry
+            if not self._owns_executor:
+                raise
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            return self.pool().submit(self.render, result, self._target(job))
+
+    @staticmethod
+    def _target(job: ExportJob) -> str | None:
+        return None if job.path is None else str(job.path)
+
+    def _from_cache(self, job: ExportJob, content: bytes) -> ExportJob:
+        """A job that completed at submit time from cached bytes."""
+        job.content = content
+        job.cached = True
+        job.status = "done"
+        job.started_at = job.finished_at = job.submitted_at
+        with self._lock:
+            self._prune(job.submitted_at)
+            self._jobs[job.id] = job
+            self.counters["submitted"] += 1
+            self.counters["cache_hits"] += 1
+        return job
+
+    def reserve(self) -> None:
+        """Take a pending slot for work run outside submit() (bulk exports)."""
+        with self._lock:
+            self._reserve()
+
+    def release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _reserve(self) -> None:
+        if self._pending >= self.max_pending:
+            self.counters["rejected"] += 1
+            raise QueueFull(f"{self._pending} PDF exports pending (limit {self.max_pending})")
+        self._pending += 1
+
+    def get(self, job_id: str) -> ExportJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    async def wait(self, job: ExportJob, timeout: float) -> ExportJob:
+        """Long-poll: return once the job finishes or `timeout` seconds pass."""
+        if job.finished or job.future is None or timeout <= 0:
+            return job
+        # asyncio.wait never cancels the job's future on timeout
+        await asyncio.wait([asyncio.wrap_future(job.future)], timeout=timeout)
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.counters,
+                "pending": self._pending,
+                "jobs": len(self._jobs),
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "storage": self.storage,
+                "queue_seconds": timing_summary(self._queue_seconds),
+                "render_seconds": timing_summary(self._render_seconds),
+                "cache": self.cache.stats() if self.cache is not None else None,
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None and self._owns_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _done(self, job: ExportJob, future: Future) -> None:
+        if future.cancelled():
+            self._finish(job, None, RuntimeError("cancelled"))
+            return
+        error = future.exception()
+        self._finish(job, None if error else future.result(), error)
+
+    def _finish(
+        self, job: ExportJob, outcome: Tuple[float, float, bytes | None] | None, error: BaseException | None
+    ) -> None:
+        if error is None and outcome[2] is not None and self.cache is not None:
+            self.cache.put(job.key, outcome[2])
+        with self._lock:
+            if job.finished:
+                return
+            self._pending -= 1
+            if error is None:
+                job.started_at, job.finished_at, job.content = outcome
+                job.status = "done"
+                self.counters["completed"] += 1
+                self._queue_seconds.append(job.started_at - job.submitted_at)
+                self._render_seconds.append(job.finished_at - job.started_at)
+            else:
+                job.finished_at = time.time()
+                job.error = str(error) or type(error).__name__
+                job.status = "failed"
+                self.counters["failed"] += 1
+
+    def _prune(self, now: float) -> None:
+        """
+        Drop finished jobs older than retention_seconds, then the oldest
+        finished jobs while more than max_retained are held.
+        """
+        finished = [job for job in self._jobs.values() if job.finished]
+        excess = len(self._jobs) - self.max_retained
+        for job in finished:
+            if job.finished_at > now - self.retention_seconds and excess <= 0:
+                continue
+            del self._jobs[job.id]
+            if job.path is not None:
+                job.path.unlink(missing_ok=True)
+            excess -= 1
+            self.counters["expired"] += 1
+
+
+_QUEUE: PdfJobQueue | None = None
+
+
+def get_pdf_job_queue() -> PdfJobQueue:
+    """The single process-wide queue (created on first call)."""
+    global _QUEUE
+    if _QUEUE is None:
+        _QUEUE = PdfJobQueue(
+            max_workers=int(os.environ.get("RISKSCOPE_PDF_WORKERS", DEFAULT_MAX_WORKERS)),
+            max_pending=int(os.environ.get("RISKSCOPE_PDF_MAX_PENDING", DEFAULT_MAX_PENDING)),
+            retention_seconds=float(os.environ.get("RISKSCOPE_PDF_RETENTION", DEFAULT_RETENTION_SECONDS)),
+            storage=os.environ.get("RISKSCOPE_PDF_STORAGE", "memory"),
+        )
+    return _QUEUE
@@ -0,0 +1,225 @@
+# src/api/result_encoding.py
+
+"""
+Content negotiation for simulation results.
+
+The Accept header picks the encoding:
+
+- application/json (default)             one JSON document, as before
+- application/x-ndjson                   one JSON object per line, streamed
+- application/vnd.apache.arrow.stream    Arrow IPC stream, columnar
+
+Arrow columns are built straight from the NumPy result arrays (contiguous
+float64/bool arrays are wrapped without copying; categories are dictionary
+arrays over the int8 codes). Scalars that describe the whole result (e.g.
+Monte Carlo percentile bands) travel in the schema metadata under "summary".
+"""
+
+import io
+import json
+from typing import Any, Callable, Dict, Iterator, List
+
+import numpy as np
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from src.simulation.batch import PATHWAYS, RISK_CATEGORIES, BatchResult
+from src.simulation.model_schema import PFAS_CHEMICALS
+from src.simulation.trajectory import Trajectory
+
+JSON = "application/json"
+NDJSON = "application/x-ndjson"
+ARROW = "application/vnd.apache.arrow.stream"
+
+NDJSON_BLOCK_ROWS = 1_000
+ARROW_BATCH_ROWS = 64 * 1024
+
+
+def negotiate(request: Request) -> str:
+    """First supported media type in the Accept header; JSON otherwise."""
+    for part in request.headers.get("accept", "").split(","):
+        media = part.split(";")[0].strip().lower()
+        if media in (NDJSON, ARROW):
+            return media
+        if media in (JSON, "application/*", "*/*"):
+            return JSON
+    return JSON
+
+
+def _column_name(chem: str) -> str:
+    return chem.replace("-", "_")
+
+
+# ----------------------------------------------------------------------
+# NDJSON
+# ----------------------------------------------------------------------
+def ndjson_response(rows: Iterator[Dict[str, Any]]) -> StreamingResponse:
+    def lines() -> Iterator[bytes]:
+        block: List[str] = []
+        for row in rows:
+            block.append(json.dumps(row))
+            if len(block) >= NDJSON_BLOCK_ROWS:
+                yield ("\n".join(block) + "\n").encode("utf-8")
+                block = []
+        if block:
+            yield ("\n".join(block) + "\n").encode("utf-8")
+
+    return StreamingResponse(lines(), media_type=NDJSON)
+
+
+# ----------------------------------------------------------------------
+# Arrow IPC
+# ----------------------------------------------------------------------
+def _dictionary(codes: np.ndarray, categories: np.ndarray):
+    import pyarrow as pa
+
+    # -1 (no category) becomes null
+    return pa.DictionaryArray.from_arrays(
+        pa.array(codes, mask=codes < 0), pa.array(categories.tolist(), type=pa.string())
+    )
+
+
+def arrow_response(columns: Dict[str, Any], summary: Dict[str, Any] | None = None) -> StreamingResponse:
+    """Stream {name: array} as Arrow IPC record batches."""
+    import pyarrow as pa
+
+    table = pa.table(
+        {name: values if isinstance(values, pa.Array) else pa.array(values) for name, values in columns.items()}
+    )
+    if summary is not None:
+        table = table.replace_schema_metadata({"summary": json.dumps(summary)})
+
+    def chunks() -> Iterator[bytes]:
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            for batch in table.to_batches(max_chunksize=ARROW_BATCH_ROWS):
+                writer.write_batch(batch)
+                yield sink.getvalue()
+                sink.seek(0)
+                sink.truncate()
+        yield sink.getvalue()  # end-of-stream marker
+
+    return StreamingResponse(chunks(), media_type=ARROW)
+
+
+# ----------------------------------------------------------------------
+# Per result type
+# ----------------------------------------------------------------------
+def encode_batch(
+    result: BatchResult, media: str, extra: Dict[str, List[Any]] | None = None
+) -> Any:
+    """BatchResult → list of dicts / NDJSON rows / Arrow table (one row per scenario)."""
+    extra = extra or {}
+    if media == NDJSON:
+        def rows() -> Iterator[Dict[str, Any]]:
+            for start in range(0, len(result), NDJSON_BLOCK_ROWS):
+                stop = min(start + NDJSON_BLOCK_ROWS, len(result))
+                for i, row in enumerate(result.slice(start, stop).to_dicts(), start):
+                    row.update({k: v[i] for k, v in extra.items()})
+                    yield row
+        return ndjson_response(rows())
+
+    if media == ARROW:
+        columns: Dict[str, Any] = {"state": [None if s is None else str(s) for s in result.states]}
+        for k, v in extra.items():
+            columns[k] = v
+        for i, chem in enumerate(PFAS_CHEMICALS):
+            columns[f"upstream_{_column_name(chem)}_ppt"] = result.upstream_ppt[i]
+        for i, chem in enumerate(PFAS_CHEMICALS):
+            columns[f"downstream_{_column_name(chem)}_ppt"] = result.downstream_ppt[i]
+        columns.update({
+            "hazard_index_value": result.hazard_index,
+            "hazard_index_exceeds_1": result.hazard_index_exceeds_1,
+            "mcl_violation_flag": result.mcl_violation,
+            "combined_mcl_violation": result.combined_mcl_violation,
+            "overall_risk_score_0_100": result.risk_score,
+            "risk_category": _dictionary(result.category_code, RISK_CATEGORIES),
+            "dominant_pathway": _dictionary(result.pathway_code, PATHWAYS),
+        })
+        return arrow_response(columns)
+
+    rows = result.to_dicts()
+    for i, row in enumerate(rows):
+        row.update({k: v[i] for k, v in extra.items()})
+    return rows
+
+
+def encode_trajectory(traj: Trajectory, media: str, site_extra: Callable[[int], Dict[str, Any]]) -> Any:
+    """
+    JSON: the first site's columnar dict. NDJSON: one line per site.
+    Arrow: long format, one row per (site, time step) within each horizon.
+    """
+    if media == NDJSON:
+        return ndjson_response({**traj.site(i), **site_extra(i)} for i in range(len(traj)))
+
+    if media == ARROW:
+        n_sites, _, n_steps = traj.downstream_ppt.shape
+        keep = (traj.times_years[None, :] <= traj.horizon_years[:, None]).ravel()
+        columns: Dict[str, Any] = {
+            "site": np.repeat(np.arange(n_sites), n_steps)[keep],
+            "time_years": np.tile(traj.times_years, n_sites)[keep],
+        }
+        for i, chem in enumerate(PFAS_CHEMICALS):
+            columns[f"downstream_{_column_name(chem)}_ppt"] = traj.downstream_ppt[:, i, :].ravel()[keep]
+        for i, chem in enumerate(PFAS_CHEMICALS):
+            columns[f"accumulated_{_column_name(chem)}_ppt_years"] = traj.accumulated_ppt_years[:, i, :].ravel()[keep]
+        columns.update({
+            "hazard_index_value": traj.hazard_index.ravel()[keep],
+            "overall_risk_score_0_100": traj.risk_score.ravel()[keep],
+            "risk_category": _dictionary(traj.category_code.ravel()[keep], RISK_CATEGORIES),
+            "mcl_violation_flag": traj.mcl_violation.ravel()[keep],
+        })
+        summary = [
+            {"site": i, "state": traj.states[i], "time_horizon_years": int(traj.horizon_years[i]), **site_extra(i)}
+            for i in range(n_sites)
+        ]
+        return arrow_response(columns, {"sites": summary})
+
+    return {**traj.site(0), **site_extra(0)}
+
+
+def encode_monte_carlo(result: Dict[str, Any], media: str) -> Any:
+    """
+    Summary bands plus, if requested, per-draw arrays under "draws".
+    NDJSON: summary line, then one line per draw. Arrow: one row per draw,
+    summary in the schema metadata.
+    """
+    uncertainty = result.get("uncertainty", {})
+    draws = uncertainty.get("draws")
+    summary = {**result, "uncertainty": {k: v for k, v in uncertainty.items() if k != "draws"}}
+
+    if draws is None or media == JSON:
+        if draws is not None:
+            summary["uncertainty"]["draws"] = {
+                "modeled_downstream_concentrations_ppt": dict(
+                    zip(PFAS_CHEMICALS, draws["downstream_ppt"].tolist())
+                ),
+                "hazard_index_value": draws["hazard_index"].tolist(),
+                "overall_risk_score_0_100": draws["risk_score"].tolist(),
+            }
+        if media == NDJSON:
+            return ndjson_response(iter([summary]))
+        return summary
+
+    if media == NDJSON:
+        def rows() -> Iterator[Dict[str, Any]]:
+            yield {"summary": summary}
+            down, hi, risk = draws["downstream_ppt"], draws["hazard_index"], draws["risk_score"]
+            for start in range(0, hi.size, NDJSON_BLOCK_ROWS):
+                stop = min(start + NDJSON_BLOCK_ROWS, hi.size)
+                block = zip(down[:, start:stop].T.tolist(), hi[start:stop].tolist(), risk[start:stop].tolist())
+                for i, (d, h, r) in enumerate(block, start):
+                    yield {
+                        "draw": i,
+                        "modeled_downstream_concentrations_ppt": dict(zip(PFAS_CHEMICALS, d)),
+                        "hazard_index_value": h,
+                        "overall_risk_score_0_100": r,
+                    }
+        return ndjson_response(rows())
+
+    columns: Dict[str, Any] = {"draw": np.arange(draws["hazard_index"].size)}
+    for i, chem in enumerate(PFAS_CHEMICALS):
+        columns[f"downstream_{_column_name(chem)}_ppt"] = draws["downstream_ppt"][i]
+    columns["hazard_index_value"] = draws["hazard_index"]
+    columns["overall_risk_score_0_100"] = draws["risk_score"]
+    return arrow_response(columns, summary)
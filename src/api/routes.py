@@ -1,13 +1,28 @@
 # src/api/routes.py
 
-from pathlib import Path
+from typing import Callable, Literal
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+import numpy as np
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 
 from src.simulation.simulator import PFASRiskSimulator
-from src.api.middleware.payload_validator import validate_simulation_payload
-from src.api.pdf_exporter import generate_pdf_report
+from src.api.backpressure import QueueFull
+from src.api.compute import (
+    batch_dicts_task,
+    batch_task,
+    get_compute_executor,
+    sensitivity_plan_task,
+    trajectory_task,
+    uncertainty_task,
+)
+from src.api.middleware.payload_validator import SimulationPayload, to_payload
+from src.api.pdf_bulk import BULK_FORMATS, stream_multipage, stream_zip
+from src.api.pdf_exporter import report_filename
+from src.api.pdf_jobs import ExportJob, get_pdf_job_queue
+from src.api.result_encoding import encode_batch, encode_monte_carlo, encode_trajectory, negotiate
+from src.simulation.sensitivity import DEFAULT_CHUNK_SIZE, evaluate_rows, summarize
 
 router = APIRouter()
 simulator = PFASRiskSimulator()
@@ -18,14 +33,40 @@ def health():
     return {"status": "ok"}
 
 
+def busy(e: QueueFull) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+
+
+async def compute(fn, *args):
+    """Run a CPU-heavy task on the compute executor (429 when it is full)."""
+    try:
+        return await get_compute_executor().run(fn, *args)
+    except QueueFull as e:
+        raise busy(e)
+
+
+async def encoded(encode, *args) -> Response:
+    """
+    Run a result encoder off the event loop. JSON bodies are rendered there
+    too, since building and dumping large lists of dicts is CPU work.
+    """
+    def render() -> Response:
+        body = encode(*args)
+        return body if isinstance(body, Response) else JSONResponse(body)
+
+    return await run_in_threadpool(render)
+
+
 @router.post("/simulate")
-def simulate(payload: dict):
+async def simulate(payload: SimulationPayload, response: Response):
     """
-    Main simulation endpoint.
+    Main simulation endpoint. Results are memoized; X-Cache says HIT or MISS.
+    One scenario is microseconds of work, so it runs on the event loop.
     """
     try:
-        validate_simulation_payload(payload)
-        result = simulator.simulate(payload)
+        payload = to_payload(payload)
+        result, hit = simulator.simulate_cached(payload)
+        response.headers["X-Cache"] = "HIT" if hit else "MISS"
 
         # carry through lat/lon if sent
         result["lat"] = payload.get("lat")
@@ -36,28 +77,275 @@ def simulate(payload: dict):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/export-pdf")
-def export_pdf(payload: dict):
+@router.post("/simulate-batch")
+async def simulate_batch(payloads: list[SimulationPayload], request: Request):
     """
-    Runs simulation and returns a PDF file summarizing results.
+    Vectorized simulation of many scenarios; returns one /simulate-shaped
+    result per payload, in order. Accept: application/x-ndjson streams one
+    line per scenario; application/vnd.apache.arrow.stream returns columns.
+    """
+    try:
+        payloads = [to_payload(payload) for payload in payloads]
+        result = await compute(batch_task, payloads)
+
+        # carry through lat/lon if sent
+        extra = {
+            "lat": [payload.get("lat") for payload in payloads],
+            "lon": [payload.get("lon") for payload in payloads],
+        }
+        return await encoded(encode_batch, result, negotiate(request), extra)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/simulate-uncertainty")
+async def simulate_uncertainty(payload: SimulationPayload, request: Request):
+    """
+    Deterministic simulation plus Monte Carlo percentile bands.
+    Options go in payload["monte_carlo"]: n_draws, seed, percentiles,
+    distributions ({"background"|"discharge"|"river_flow": {...}}) and
+    return_draws (per-draw results; best fetched as NDJSON or Arrow).
+    """
+    try:
+        payload = to_payload(payload)
+        try:
+            result = await compute(uncertainty_task, payload, payload.get("monte_carlo") or {})
+        except ValueError as e:
+            # run_monte_carlo's own option checks: a client error, not a 500
+            raise HTTPException(status_code=422, detail=str(e))
+
+        result["lat"] = payload.get("lat")
+        result["lon"] = payload.get("lon")
+
+        return await encoded(encode_monte_carlo, result, negotiate(request))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/simulate-sensitivity")
+async def simulate_sensitivity(payload: SimulationPayload):
+    """
+    Which input drives the result: a one-at-a-time tornado (method "oat")
+    or Sobol first/total indices (method "sobol", the default) of the risk
+    score and Hazard Index. Options go in payload["sensitivity"]: method,
+    factors ({"river_flow": {"low": 0.5, "high": 2.0}, "cooling_type":
+    {"values": [...]}, ...}) and n_base (Sobol base points, a power of two).
+    Design rows are evaluated in chunks spread over the compute executor.
     """
     try:
-        validate_simulation_payload(payload)
-        result = simulator.simulate(payload)
+        payload = to_payload(payload)
+        try:
+            plan = await compute(sensitivity_plan_task, payload, payload.get("sensitivity") or {})
+        except ValueError as e:
+            # plan_sensitivity's own option checks: a client error, not a 500
+            raise HTTPException(status_code=422, detail=str(e))
+
+        # the chunks are admitted together (429 unless all fit); a large
+        # design uses bigger chunks rather than more than max_pending
+        executor = get_compute_executor()
+        chunk_size = max(DEFAULT_CHUNK_SIZE, -(-len(plan.values) // executor.max_pending))
+        try:
+            outputs = await executor.run_many(
+                evaluate_rows, [(plan.base, plan.names, rows, plan.limits) for rows in plan.chunks(chunk_size)]
+            )
+        except QueueFull as e:
+            raise busy(e)
+        result = summarize(plan, np.concatenate(outputs, axis=1))
 
-        # attach location + state info for PDF
         result["lat"] = payload.get("lat")
         result["lon"] = payload.get("lon")
-        if "state" not in result:
-            result["state"] = payload.get("state")
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/simulate-trajectory")
+async def simulate_trajectory(payload: SimulationPayload, request: Request, step: Literal["year", "month"] = "year"):
+    """
+    Time series over scenario_parameters.time_horizon_years, one list per
+    series (step = "year" or "month"); Arrow returns one row per step.
+    """
+    try:
+        payload = to_payload(payload)
+        trajectory = await compute(trajectory_task, payload, step)
+
+        location = {"lat": payload.get("lat"), "lon": payload.get("lon")}
+        return await encoded(encode_trajectory, trajectory, negotiate(request), lambda i: location)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/compute-stats")
+def compute_stats():
+    """Queue and run time of the compute executor and the PDF pool."""
+    return {"compute": get_compute_executor().stats(), "pdf": get_pdf_job_queue().stats()}
 
-        pdf_path_str = generate_pdf_report(result)
-        pdf_path = Path(pdf_path_str)
 
-        return FileResponse(
-            pdf_path,
-            media_type="application/pdf",
-            filename=pdf_path.name,
+EXPORT_WAIT_SECONDS = 120.0  # /export-pdf waits this long for its job
+MAX_POLL_WAIT_SECONDS = 30.0
+MAX_BULK_REPORTS = 1000
+
+
+def report_input(payload: dict) -> tuple[dict, bool]:
+    """Simulation result with the location + state info the PDF shows."""
+    result, hit = simulator.simulate_cached(payload)
+
+    # attach location + state info for PDF
+    result["lat"] = payload.get("lat")
+    result["lon"] = payload.get("lon")
+    if "state" not in result:
+        result["state"] = payload.get("state")
+    return result, hit
+
+
+def submit_export(result: dict) -> ExportJob:
+    try:
+        return get_pdf_job_queue().submit(result)
+    except QueueFull as e:
+        raise busy(e)
+
+
+def job_status(job: ExportJob) -> dict:
+    return {
+        **job.to_dict(),
+        "status_url": f"/export-pdf/jobs/{job.id}",
+        "download_url": f"/export-pdf/jobs/{job.id}/download",
+    }
+
+
+def job_file(job: ExportJob, headers: dict | None = None) -> Response:
+    """The finished report: in-memory bytes sent as-is, or the file on disk."""
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"job is {job.to_dict()['status']}")
+    if job.content is not None:
+        disposition = {"Content-Disposition": f'attachment; filename="{job.filename}"'}
+        return Response(job.content, media_type="application/pdf", headers={**disposition, **(headers or {})})
+    return FileResponse(job.path, media_type="application/pdf", filename=job.filename, headers=headers)
+
+
+@router.post("/export-pdf")
+async def export_pdf(payload: SimulationPayload):
+    """
+    Runs simulation and returns a PDF file summarizing results.
+    Rendering goes through the export job queue (429 when it is full).
+    """
+    try:
+        result, hit = report_input(to_payload(payload))
+        queue = get_pdf_job_queue()
+        job = await queue.wait(submit_export(result), EXPORT_WAIT_SECONDS)
+        if not job.finished:
+            raise HTTPException(status_code=504, detail=f"PDF export {job.id} still running")
+        return job_file(job, headers={"X-Cache": "HIT" if hit else "MISS"})
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/export-pdf/jobs", status_code=202)
+async def submit_export_job(payload: SimulationPayload):
+    """
+    Queue a PDF export; poll status_url (optionally ?wait=seconds to
+    long-poll) until status is "done", then fetch download_url.
+    """
+    try:
+        result, _ = report_input(to_payload(payload))
+        return job_status(submit_export(result))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+class ReleasingStreamingResponse(StreamingResponse):
+    """
+    Calls `release` once the response is over, however it ends: streamed
+    out, failed, or the client gone before the body started (a generator's
+    finally never runs if it is never iterated).
+    """
+
+    def __init__(self, content, release: Callable[[], None], **kwargs) -> None:
+        super().__init__(content, **kwargs)
+        self.release = release
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.release()
+
+
+@router.post("/export-pdf/bulk")
+async def export_pdf_bulk(payloads: list[SimulationPayload], format: str = "zip"):
+    """
+    One report per payload, streamed as a ZIP of PDFs (format=zip, rendered
+    in parallel) or as one multi-page PDF (format=pdf). Counts as one
+    pending export for backpressure.
+    """
+    try:
+        if format not in BULK_FORMATS:
+            raise HTTPException(status_code=400, detail=f"format must be one of {BULK_FORMATS}")
+        if not 0 < len(payloads) <= MAX_BULK_REPORTS:
+            raise HTTPException(status_code=400, detail=f"send 1 to {MAX_BULK_REPORTS} payloads")
+        payloads = [to_payload(payload) for payload in payloads]
+        results = await compute(batch_dicts_task, payloads)
+        for result, payload in zip(results, payloads):
+            result["lat"] = payload.get("lat")
+            result["lon"] = payload.get("lon")
+
+        queue = get_pdf_job_queue()
+
+        def body():
+            if format == "zip":
+                yield from stream_zip(results, queue.pool(), max_in_flight=2 * queue.max_workers)
+            else:
+                yield from stream_multipage(results, queue.pool())
+
+        filename = report_filename().replace(".pdf", f".{format}")
+        try:
+            queue.reserve()
+        except QueueFull as e:
+            raise busy(e)
+        return ReleasingStreamingResponse(
+            body(),
+            release=queue.release,
+            media_type="application/zip" if format == "zip" else "application/pdf",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/export-pdf/stats")
+def export_stats():
+    return get_pdf_job_queue().stats()
+
+
+@router.get("/export-pdf/jobs/{job_id}")
+async def export_job(job_id: str, wait: float = 0.0):
+    queue = get_pdf_job_queue()
+    job = queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"unknown job {job_id}")
+    job = await queue.wait(job, min(max(wait, 0.0), MAX_POLL_WAIT_SECONDS))
+    return job_status(job)
+
+
+@router.get("/export-pdf/jobs/{job_id}/download")
+def download_export(job_id: str):
+    job = get_pdf_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"unknown job {job_id}")
+    return job_file(job)
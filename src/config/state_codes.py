@@ -0,0 +1,69 @@
+"""
+state_codes.py
+
+USPS abbreviations, state names and FIPS codes for every state, DC and
+the territories that report to UCMR5.
+
+UCMR5 reports states as USPS abbreviations, while the processed medians
+and the simulator key everything by two-digit FIPS ("51" for Virginia).
+"00" is the national row.
+"""
+
+from typing import Dict
+
+NATIONAL_FIPS = "00"
+
+STATE_ABBREV_TO_FIPS: Dict[str, str] = {
+    "AL": "01", "AK": "02", "AZ": "04", "AR": "05",
+    "CA": "06", "CO": "08", "CT": "09", "DE": "10",
+    "DC": "11", "FL": "12", "GA": "13", "HI": "15",
+    "ID": "16", "IL": "17", "IN": "18", "IA": "19",
+    "KS": "20", "KY": "21", "LA": "22", "ME": "23",
+    "MD": "24", "MA": "25", "MI": "26", "MN": "27",
+    "MS": "28", "MO": "29", "MT": "30", "NE": "31",
+    "NV": "32", "NH": "33", "NJ": "34", "NM": "35",
+    "NY": "36", "NC": "37", "ND": "38", "OH": "39",
+    "OK": "40", "OR": "41", "PA": "42", "RI": "44",
+    "SC": "45", "SD": "46", "TN": "47", "TX": "48",
+    "UT": "49", "VT": "50", "VA": "51", "WA": "53",
+    "WV": "54", "WI": "55", "WY": "56",
+    # Territories
+    "AS": "60", "GU": "66", "MP": "69", "PR": "72", "VI": "78",
+}
+
+STATE_NAME_TO_ABBREV: Dict[str, str] = {
+    "Alabama": "AL", "Alaska": "AK", "Arizona": "AZ", "Arkansas": "AR",
+    "California": "CA", "Colorado": "CO", "Connecticut": "CT",
+    "Delaware": "DE", "District of Columbia": "DC", "Florida": "FL",
+    "Georgia": "GA", "Hawaii": "HI", "Idaho": "ID", "Illinois": "IL",
+    "Indiana": "IN", "Iowa": "IA", "Kansas": "KS", "Kentucky": "KY",
+    "Louisiana": "LA", "Maine": "ME", "Maryland": "MD",
+    "Massachusetts": "MA", "Michigan": "MI", "Minnesota": "MN",
+    "Mississippi": "MS", "Missouri": "MO", "Montana": "MT",
+    "Nebraska": "NE", "Nevada": "NV", "New Hampshire": "NH",
+    "New Jersey": "NJ", "New Mexico": "NM", "New York": "NY",
+    "North Carolina": "NC", "North Dakota": "ND", "Ohio": "OH",
+    "Oklahoma": "OK", "Oregon": "OR", "Pennsylvania": "PA",
+    "Rhode Island": "RI", "South Carolina": "SC", "South Dakota": "SD",
+    "Tennessee": "TN", "Texas": "TX", "Utah": "UT", "Vermont": "VT",
+    "Virginia": "VA", "Washington": "WA", "West Virginia": "WV",
+    "Wisconsin": "WI", "Wyoming": "WY",
+    "American Samoa": "AS", "Guam": "GU",
+    "Northern Mariana Islands": "MP", "Puerto Rico": "PR",
+    "United States Virgin Islands": "VI",
+}
+
+FIPS_TO_STATE_ABBREV: Dict[str, str] = {
+    fips: abbrev for abbrev, fips in STATE_ABBREV_TO_FIPS.items()
+}
+
+
+def to_state_fips(value: str) -> str | None:
+    """
+    Normalize a USPS abbreviation or numeric FIPS code to two-digit FIPS.
+    Returns None for anything unrecognized (tribal regions, blanks).
+    """
+    code = (value or "").strip().upper()
+    if code.isdigit():
+        return code.zfill(2)
+    return STATE_ABBREV_TO_FIPS.get(code)
@@ -0,0 +1,228 @@
+# src/etl/background_repository.py
+
+"""
+Process-wide PFAS background repository.
+
+One object serves background medians to both the simulator (/simulate,
+/export-pdf) and the location service (/simulate-location), so both apply
+the same fallback chain:
+
+    requested region ("51", "VA", "US", None, county FIPS)
+      → its row in the medians table
+      → national row "00" if the region is missing or all zeros
+
+Each snapshot also precomputes a BackgroundLookup: the fallback chain
+resolved once for every region key and common alias (USPS codes, national
+aliases), with the resulting background vectors stored as one contiguous
+float64 array in PFAS_CHEMICALS order. simulate() reads its upstream
+background from there instead of re-resolving per call.
+
+The table is loaded lazily on first use. Every `check_interval` seconds a
+reader stats the processed CSV; if its (mtime, inode, size) changed, one
+thread rebuilds a new immutable snapshot while all other readers keep using
+the current one. The new snapshot is swapped in with a single reference
+assignment, so readers never block and never see a half-loaded table.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from src.config.state_codes import NATIONAL_FIPS, STATE_ABBREV_TO_FIPS, to_state_fips
+from src.etl.background_table import BackgroundTable, open_background_table
+from src.etl.ucmr5_ingest import PROCESSED_FILE
+from src.simulation.model_schema import PFAS_CHEMICALS
+
+DEFAULT_CHECK_INTERVAL_SECONDS = 2.0
+
+# keys older callers used for the national row
+NATIONAL_ALIASES = {"", "US", "USA", NATIONAL_FIPS}
+
+
+def normalize_region(region: str | None) -> str:
+    """Map FIPS / USPS / national aliases onto table keys ("51", "51059", "00")."""
+    key = (region or "").strip().upper()
+    if key in NATIONAL_ALIASES:
+        return NATIONAL_FIPS
+    if key.isdigit():
+        return key.zfill(2) if len(key) <= 2 else key.zfill(5)
+    return to_state_fips(key) or key
+
+
+class BackgroundSnapshot:
+    """An immutable, fully loaded view of one version of the medians file."""
+
+    def __init__(self, table: BackgroundTable | Dict, version: Tuple[int, int, int]) -> None:
+        self.table = table
+        self.version = version
+        self.loaded_at = time.time()
+        self.lookup = BackgroundLookup(self, PFAS_CHEMICALS)
+
+    def resolve(self, region: str | None) -> Tuple[str, Dict[str, float]]:
+        """
+        Returns (region key actually used, {chemical: ppt}).
+        Falls back to the national row when the region is missing or all zeros.
+        """
+        key = normalize_region(region)
+        chem_map = self.table.get(key) or {}
+        if not chem_map or all(v == 0.0 for v in chem_map.values()):
+            national = self.table.get(NATIONAL_FIPS)
+            if national:
+                return NATIONAL_FIPS, national
+        return key, chem_map
+
+
+def lookup_aliases(table: BackgroundTable | Dict) -> List[str | None]:
+    """Region spellings worth resolving up front: table keys, USPS codes, national aliases."""
+    aliases: List[str | None] = [None, *sorted(NATIONAL_ALIASES), "us", "usa"]
+    for region in table:
+        aliases.append(region)
+        if len(region) == 2 and region.startswith("0"):
+            aliases.append(region[1:])  # "6" for "06"
+    for abbrev in STATE_ABBREV_TO_FIPS:
+        aliases += [abbrev, abbrev.lower()]
+    return aliases
+
+
+class BackgroundLookup:
+    """
+    A snapshot's fallback chain, resolved once for every alias.
+
+    codes maps a region spelling to a small int code; vectors[code] is the
+    resolved background in `chemicals` order (missing chemicals 0.0), and
+    rows[code] holds the same values as Python floats.
+    """
+
+    def __init__(self, snapshot: BackgroundSnapshot, chemicals: Sequence[str]) -> None:
+        self.chemicals = tuple(chemicals)
+        self.keys: List[str] = []  # region key actually used, per code
+        self.codes: Dict[str | None, int] = {}
+        self.rows: List[List[float]] = []
+        self._snapshot = snapshot
+
+        by_key: Dict[str, int] = {}
+        for alias in lookup_aliases(snapshot.table):
+            key, chem_map = snapshot.resolve(alias)
+            code = by_key.get(key)
+            if code is None:
+                code = by_key[key] = len(self.keys)
+                self.keys.append(key)
+                self.rows.append(self._vector(chem_map))
+            self.codes[alias] = code
+        self.vectors = np.array(self.rows, dtype=np.float64).reshape(len(self.rows), len(self.chemicals))
+
+    def _vector(self, chem_map: Dict[str, float]) -> List[float]:
+        return [float(chem_map.get(chem, 0.0)) for chem in self.chemicals]
+
+    def row(self, region: str | None) -> List[float]:
+        """Resolved background for any region spelling (shared list; do not mutate)."""
+        code = self.codes.get(region)
+        if code is not None:
+            return self.rows[code]
+        # unusual spelling (e.g. a county FIPS without its own row): resolve now
+        return self._vector(self._snapshot.resolve(region)[1])
+
+
+class BackgroundRepository:
+    def __init__(
+        self,
+        csv_path: Path = PROCESSED_FILE,
+        check_interval: float = DEFAULT_CHECK_INTERVAL_SECONDS,
+    ) -> None:
+        self.csv_path = Path(csv_path)
+        self.check_interval = check_interval
+        self._snapshot: BackgroundSnapshot | None = None
+        self._next_check = 0.0
+        self._reload_lock = threading.Lock()
+        self._listeners: List[Callable[["BackgroundSnapshot"], None]] = []
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def _stat_version(self) -> Tuple[int, int, int] | None:
+        try:
+            st = os.stat(self.csv_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+    def _load(self, version: Tuple[int, int, int] | None) -> BackgroundSnapshot:
+        if version is None:
+            print("WARNING: Missing PFAS processed file.")
+            return BackgroundSnapshot({}, (0, 0, 0))
+        return BackgroundSnapshot(open_background_table(self.csv_path), version)
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Rebuild the snapshot if the file changed (or force=True).
+        Returns True if a new snapshot was swapped in. If another thread is
+        already reloading, returns immediately without waiting.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            version = self._stat_version()
+            current = self._snapshot
+            if not force and current is not None and current.version == (version or (0, 0, 0)):
+                return False
+            self._snapshot = self._load(version)  # atomic reference swap
+        finally:
+            self._next_check = time.monotonic() + self.check_interval
+            self._reload_lock.release()
+
+        for listener in list(self._listeners):
+            listener(self._snapshot)
+        return True
+
+    def add_listener(self, callback: Callable[["BackgroundSnapshot"], None]) -> None:
+        """Call `callback(new_snapshot)` after every reload swaps in new data."""
+        self._listeners.append(callback)
+
+    def snapshot(self) -> BackgroundSnapshot:
+        """Current snapshot; loads lazily and polls for file changes."""
+        snap = self._snapshot
+        if snap is None:
+            with self._reload_lock:
+                if self._snapshot is None:
+                    self._snapshot = self._load(self._stat_version())
+                    self._next_check = time.monotonic() + self.check_interval
+            return self._snapshot
+
+        if time.monotonic() >= self._next_check:
+            self.reload()
+        return self._snapshot
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    @property
+    def version(self) -> Tuple[int, int, int]:
+        return self.snapshot().version
+
+    def resolve(self, region: str | None) -> Tuple[str, Dict[str, float]]:
+        return self.snapshot().resolve(region)
+
+    def get_background(self, region: str | None) -> Dict[str, float]:
+        return self.snapshot().resolve(region)[1]
+
+    def lookup(self) -> BackgroundLookup:
+        """Precomputed lookup of the current snapshot."""
+        return self.snapshot().lookup
+
+
+_REPOSITORY: BackgroundRepository | None = None
+_REPOSITORY_LOCK = threading.Lock()
+
+
+def get_background_repository() -> BackgroundRepository:
+    """The single process-wide repository (created on first call)."""
+    global _REPOSITORY
+    if _REPOSITORY is None:
+        with _REPOSITORY_LOCK:
+            if _REPOSITORY is None:
+                _REPOSITORY = BackgroundRepository()
+    return _REPOSITORY
@@ -0,0 +1,189 @@
+# src/etl/background_table.py
+
+"""
+Compiled, memory-mapped PFAS background table.
+
+The medians CSV (State,Contaminant,ppt) is compiled once into a fixed
+binary layout:
+
+    offset 0   magic  b"PFASBG01"
+    offset 8   uint32 little-endian: length of the JSON index in bytes
+    offset 12  JSON index {"regions": [...], "chemicals": [...], "source": ...}
+    padding to a 64-byte boundary
+    float32 little-endian matrix, regions × chemicals, NaN = not measured
+
+Regions are arbitrary keys: two-digit state FIPS ("51"), "00" for the
+national row, and five-digit county FIPS when county medians exist.
+
+The matrix is opened with np.memmap in read-only mode, so every uvicorn
+worker maps the same page-cache pages instead of parsing the CSV into its
+own nested dicts. Adding chemicals or counties grows the file, not the
+per-worker heap.
+"""
+
+import csv
+import json
+import os
+import struct
+import tempfile
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+MAGIC = b"PFASBG01"
+ALIGNMENT = 64
+DTYPE = np.dtype("<f4")
+
+
+def widen(values: np.ndarray) -> np.ndarray:
+    """
+    float32 → float64 through the shortest decimal repr, so 4.2 stored as
+    float32 comes back as the float64 4.2 the CSV held, not 4.199999809.
+    """
+    return np.asarray(values, dtype=DTYPE).astype(str).astype(np.float64)
+
+
+def compiled_path_for(csv_path: Path) -> Path:
+    """data/processed/ucmr5_state_medians.csv → ...ucmr5_state_medians.bin"""
+    return Path(csv_path).with_suffix(".bin")
+
+
+# ----------------------------------------------------------------------
+# Compile
+# ----------------------------------------------------------------------
+def compile_background(csv_path: Path, out_path: Path | None = None) -> Path:
+    """
+    Compile a State,Contaminant,ppt CSV into the binary layout above.
+    The file is written to a temp name and renamed into place, so readers
+    (and concurrent compilers in other workers) never see a partial file.
+    """
+    csv_path = Path(csv_path)
+    out_path = Path(out_path) if out_path is not None else compiled_path_for(csv_path)
+
+    regions: Dict[str, int] = {}
+    chemicals: Dict[str, int] = {}
+    cells: List[tuple] = []
+
+    with open(csv_path, "r") as f:
+        for row in csv.DictReader(f):
+            region = row["State"].zfill(2)
+            chem = row["Contaminant"]
+            r = regions.setdefault(region, len(regions))
+            c = chemicals.setdefault(chem, len(chemicals))
+            cells.append((r, c, float(row["ppt"])))
+
+    matrix = np.full((len(regions), len(chemicals)), np.nan, dtype=DTYPE)
+    for r, c, ppt in cells:
+        matrix[r, c] = ppt
+
+    index = json.dumps(
+        {
+            "regions": list(regions),
+            "chemicals": list(chemicals),
+            "source": str(csv_path),
+        }
+    ).encode("utf-8")
+    header = MAGIC + struct.pack("<I", len(index)) + index
+    header += b"\0" * (-len(header) % ALIGNMENT)
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=out_path.name, suffix=".tmp", dir=out_path.parent)
+    with os.fdopen(fd, "wb") as f:
+        f.write(header)
+        f.write(matrix.tobytes())
+    os.replace(tmp, out_path)
+    return out_path
+
+
+# ----------------------------------------------------------------------
+# Read
+# ----------------------------------------------------------------------
+class BackgroundTable(Mapping):
+    """
+    Read-only view of a compiled background file.
+
+    Behaves like the old {region: {chem: ppt}} dict (table.get("51"),
+    "51" in table), but values are sliced out of the shared memory map on
+    demand. NaN cells (chemical not measured in that region) are omitted
+    from the per-region dicts.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            magic = f.read(len(MAGIC))
+            if magic != MAGIC:
+                raise ValueError(f"Not a compiled PFAS background file: {self.path}")
+            (index_len,) = struct.unpack("<I", f.read(4))
+            index = json.loads(f.read(index_len).decode("utf-8"))
+
+        offset = len(MAGIC) + 4 + index_len
+        offset += -offset % ALIGNMENT
+
+        self.regions: List[str] = index["regions"]
+        self.chemicals: List[str] = index["chemicals"]
+        self.region_index: Dict[str, int] = {r: i for i, r in enumerate(self.regions)}
+        self.chemical_index: Dict[str, int] = {c: i for i, c in enumerate(self.chemicals)}
+
+        shape = (len(self.regions), len(self.chemicals))
+        if shape[0] and shape[1]:
+            self.matrix = np.memmap(self.path, dtype=DTYPE, mode="r", offset=offset, shape=shape)
+        else:
+            self.matrix = np.empty(shape, dtype=DTYPE)
+
+    def row(self, region: str) -> np.ndarray | None:
+        """Raw float32 row for a region (NaN = not measured), or None."""
+        i = self.region_index.get(region)
+        return None if i is None else self.matrix[i]
+
+    def value(self, region: str, chemical: str) -> float | None:
+        i = self.region_index.get(region)
+        j = self.chemical_index.get(chemical)
+        if i is None or j is None:
+            return None
+        v = float(widen(self.matrix[i, j]))
+        return None if np.isnan(v) else v
+
+    # -- Mapping interface ------------------------------------------------
+    def __getitem__(self, region: str) -> Dict[str, float]:
+        row = self.row(region)
+        if row is None:
+            raise KeyError(region)
+        return {
+            chem: v for chem, v in zip(self.chemicals, widen(row).tolist()) if v == v
+        }
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.regions)
+
+    def __len__(self) -> int:
+        return len(self.regions)
+
+
+def open_background_table(csv_path: Path, compiled_path: Path | None = None) -> BackgroundTable:
+    """
+    Open the compiled table for csv_path, (re)compiling it first if it is
+    missing or older than the CSV. If the data directory is read-only the
+    compiled file goes to the system temp directory instead.
+    """
+    csv_path = Path(csv_path)
+    compiled = Path(compiled_path) if compiled_path is not None else compiled_path_for(csv_path)
+
+    if not compiled.exists() or compiled.stat().st_mtime < csv_path.stat().st_mtime:
+        try:
+            compile_background(csv_path, compiled)
+        except OSError:
+            compiled = Path(tempfile.gettempdir()) / compiled.name
+            if not compiled.exists() or compiled.stat().st_mtime < csv_path.stat().st_mtime:
+                compile_background(csv_path, compiled)
+
+    return BackgroundTable(compiled)
+
+
+if __name__ == "__main__":
+    # Precompile at build time: python -m src.etl.background_table
+    from src.etl.ucmr5_ingest import PROCESSED_FILE
+
+    print(compile_background(PROCESSED_FILE))
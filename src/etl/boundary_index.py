@@ -0,0 +1,444 @@
+# src/etl/boundary_index.py
+
+"""
+Offline reverse geocoder: US state and county polygons packed into one
+binary file with a uniform grid index.
+
+Build (once, at image build time) from the Census cartographic boundary
+files, or any GeoJSON with the same properties:
+
+    python -m src.etl.boundary_index \
+        --states data/raw/cb_2023_us_state_500k.zip \
+        --counties data/raw/cb_2023_us_county_500k.zip
+
+Layout (data/processed/us_boundaries.bin):
+
+    offset 0   magic b"PFASGEO1"
+    offset 8   uint32 little-endian: length of the JSON index in bytes
+    offset 12  JSON index: per layer, feature codes/names, grid geometry and
+               {array name: [offset, dtype, shape]} for the arrays below
+    padding to a 64-byte boundary (start of the data section)
+    arrays, each 64-byte aligned; offsets are relative to the data section
+
+Per layer ("state", "county"):
+
+    bbox         (n_features, 4) f8   min lon, min lat, max lon, max lat
+    vertex_start (n_features + 1) i8  feature → range in vertices
+    vertices     (m, 2) f4            lon/lat of every ring, rings closed
+    edge_valid   (m,) bool            vertex i → i+1 is a real edge
+    cell_start   (n_cells + 1) i4     grid cell → range in cell_items
+    cell_items   (k,) i4              features whose bbox touches the cell
+
+A lookup maps the point to its grid cell, filters the cell's candidates by
+bounding box and runs an even-odd ray-casting test over the candidate's
+edges. Holes and multi-part features need no special casing under the
+even-odd rule. Everything is read through np.memmap, shared by workers.
+"""
+
+import argparse
+import json
+import os
+import struct
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from src.config.state_codes import FIPS_TO_STATE_ABBREV
+
+MAGIC = b"PFASGEO1"
+ALIGNMENT = 64
+
+BOUNDARY_FILE = Path("data/processed/us_boundaries.bin")
+STATE_SOURCE = Path("data/raw/cb_2023_us_state_500k.zip")
+COUNTY_SOURCE = Path("data/raw/cb_2023_us_county_500k.zip")
+
+# Census cartographic boundary property names
+LAYER_PROPERTIES = {
+    "state": ("STATEFP", "NAME"),
+    "county": ("GEOID", "NAME"),
+}
+
+DEFAULT_CELL_DEGREES = {"state": 1.0, "county": 0.25}
+
+# max edge × point comparisons per vectorized point-in-polygon block
+PIP_BLOCK = 4_000_000
+
+Ring = np.ndarray  # (k, 2) lon/lat
+
+
+# ----------------------------------------------------------------------
+# Source features
+# ----------------------------------------------------------------------
+def _rings(geometry: Dict[str, Any]) -> Iterator[Ring]:
+    """All rings (outer and holes) of a GeoJSON Polygon / MultiPolygon."""
+    kind = geometry["type"]
+    if kind not in ("Polygon", "MultiPolygon"):
+        return
+    polygons = [geometry["coordinates"]] if kind == "Polygon" else geometry["coordinates"]
+    for polygon in polygons:
+        for ring in polygon:
+            # stored as float32 (~1 m); bboxes are computed from the same values
+            ring = np.asarray(ring, dtype=np.float64)[:, :2].astype("<f4").astype(np.float64)
+            if len(ring) < 3:
+                continue
+            if not np.array_equal(ring[0], ring[-1]):
+                ring = np.vstack([ring, ring[:1]])
+            yield ring
+
+
+def read_features(path: Path, code_field: str, name_field: str) -> List[Tuple[str, str, List[Ring]]]:
+    """
+    (code, name, rings) per feature. GeoJSON is read directly; anything else
+    (shapefile, zipped shapefile, GeoPackage) goes through geopandas.
+    """
+    path = Path(path)
+    if path.suffix.lower() in (".json", ".geojson"):
+        with open(path, "r") as f:
+            records = [
+                (feat["properties"], feat["geometry"])
+                for feat in json.load(f)["features"]
+                if feat.get("geometry")
+            ]
+    else:
+        import geopandas as gpd
+
+        frame = gpd.read_file(path).to_crs(epsg=4326)
+        records = [
+            (row, geom.__geo_interface__)
+            for row, geom in zip(frame.drop(columns="geometry").to_dict("records"), frame.geometry)
+            if geom is not None
+        ]
+
+    return [
+        (str(props[code_field]), str(props.get(name_field, "")), list(_rings(geometry)))
+        for props, geometry in records
+    ]
+
+
+# ----------------------------------------------------------------------
+# Pack
+# ----------------------------------------------------------------------
+def _grid(bbox: np.ndarray, cell: float) -> Tuple[Dict[str, Any], np.ndarray, np.ndarray]:
+    """CSR cell → feature candidates from feature bounding boxes."""
+    if len(bbox) == 0:
+        return {"x0": 0.0, "y0": 0.0, "cell": cell, "nx": 0, "ny": 0}, np.zeros(1, np.int32), np.zeros(0, np.int32)
+
+    x0, y0 = np.floor(bbox[:, 0].min()), np.floor(bbox[:, 1].min())
+    nx = int(np.ceil((bbox[:, 2].max() - x0) / cell)) + 1
+    ny = int(np.ceil((bbox[:, 3].max() - y0) / cell)) + 1
+
+    cells: List[List[int]] = [[] for _ in range(nx * ny)]
+    ix0 = ((bbox[:, 0] - x0) // cell).astype(int)
+    iy0 = ((bbox[:, 1] - y0) // cell).astype(int)
+    ix1 = ((bbox[:, 2] - x0) // cell).astype(int)
+    iy1 = ((bbox[:, 3] - y0) // cell).astype(int)
+    for f in range(len(bbox)):
+        for iy in range(iy0[f], iy1[f] + 1):
+            row = iy * nx
+            for ix in range(ix0[f], ix1[f] + 1):
+                cells[row + ix].append(f)
+
+    cell_start = np.zeros(nx * ny + 1, dtype=np.int32)
+    cell_start[1:] = np.cumsum([len(c) for c in cells])
+    cell_items = np.fromiter((f for c in cells for f in c), dtype=np.int32, count=int(cell_start[-1]))
+    return {"x0": float(x0), "y0": float(y0), "cell": cell, "nx": nx, "ny": ny}, cell_start, cell_items
+
+
+def pack_layer(features: List[Tuple[str, str, List[Ring]]], cell: float) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    features = [f for f in features if f[2]]
+    codes = [code for code, _, _ in features]
+    names = [name for _, name, _ in features]
+
+    vertex_start = np.zeros(len(features) + 1, dtype=np.int64)
+    bbox = np.empty((len(features), 4), dtype=np.float64)
+    vertices, valid = [], []
+    for i, (_, _, rings) in enumerate(features):
+        stacked = np.vstack(rings)
+        bbox[i] = (*stacked.min(axis=0), *stacked.max(axis=0))
+        for ring in rings:
+            vertices.append(ring)
+            edge = np.ones(len(ring), dtype=bool)
+            edge[-1] = False  # last vertex closes this ring; next one starts another
+            valid.append(edge)
+        vertex_start[i + 1] = vertex_start[i] + len(stacked)
+
+    grid, cell_start, cell_items = _grid(bbox, cell)
+    arrays = {
+        "bbox": bbox,
+        "vertex_start": vertex_start,
+        "vertices": np.vstack(vertices).astype("<f4") if vertices else np.zeros((0, 2), "<f4"),
+        "edge_valid": np.concatenate(valid) if valid else np.zeros(0, bool),
+        "cell_start": cell_start,
+        "cell_items": cell_items,
+    }
+    return {"codes": codes, "names": names, "grid": grid}, arrays
+
+
+def compile_boundaries(
+    layers: Dict[str, List[Tuple[str, str, List[Ring]]]],
+    out_path: Path = BOUNDARY_FILE,
+) -> Path:
+    """Pack {layer: features} into the binary layout above (atomic rename)."""
+    out_path = Path(out_path)
+    index: Dict[str, Any] = {"layers": {}}
+    blobs: List[Tuple[str, str, np.ndarray]] = []
+    for layer, features in layers.items():
+        meta, arrays = pack_layer(features, DEFAULT_CELL_DEGREES.get(layer, 0.5))
+        index["layers"][layer] = meta
+        blobs.extend((layer, name, np.ascontiguousarray(a)) for name, a in arrays.items())
+
+    # offsets are relative to the data section, which starts after the header
+    pos = 0
+    for layer, name, a in blobs:
+        index["layers"][layer].setdefault("arrays", {})[name] = [pos, a.dtype.str, list(a.shape)]
+        pos += a.nbytes + (-a.nbytes % ALIGNMENT)
+
+    body = json.dumps(index).encode("utf-8")
+    header = MAGIC + struct.pack("<I", len(body)) + body
+    header += b"\0" * (-len(header) % ALIGNMENT)
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=out_path.name, suffix=".tmp", dir=out_path.parent)
+    with os.fdopen(fd, "wb") as f:
+        f.write(header)
+        for _, _, a in blobs:
+            f.write(a.tobytes())
+            f.write(b"\0" * (-a.nbytes % ALIGNMENT))
+    os.replace(tmp, out_path)
+    return out_path
+
+
+# ----------------------------------------------------------------------
+# Read / lookup
+# ----------------------------------------------------------------------
+class BoundaryLayer:
+    """One packed layer (states or counties) with point-in-polygon lookup."""
+
+    def __init__(self, path: Path, data_start: int, meta: Dict[str, Any]) -> None:
+        self.codes: List[str] = meta["codes"]
+        self.names: List[str] = meta["names"]
+        self.code_index: Dict[str, int] = {c: i for i, c in enumerate(self.codes)}
+
+        grid = meta["grid"]
+        self.x0, self.y0, self.cell = grid["x0"], grid["y0"], grid["cell"]
+        self.nx, self.ny = grid["nx"], grid["ny"]
+
+        for name, (offset, dtype, shape) in meta["arrays"].items():
+            if np.prod(shape) == 0:
+                array = np.zeros(shape, dtype=dtype)
+            else:
+                array = np.memmap(path, dtype=dtype, mode="r", offset=data_start + offset, shape=tuple(shape))
+            setattr(self, name, array)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def candidates(self, lon: float, lat: float) -> np.ndarray:
+        """Features whose bounding box contains the point."""
+        ix = int((lon - self.x0) // self.cell) if self.cell else -1
+        iy = int((lat - self.y0) // self.cell) if self.cell else -1
+        if not (0 <= ix < self.nx and 0 <= iy < self.ny):
+            return np.zeros(0, dtype=np.int32)
+        c = iy * self.nx + ix
+        items = self.cell_items[self.cell_start[c]:self.cell_start[c + 1]]
+        box = self.bbox[items]
+        hit = (box[:, 0] <= lon) & (lon <= box[:, 2]) & (box[:, 1] <= lat) & (lat <= box[:, 3])
+        return items[hit]
+
+    def contains(self, feature: int, lon: float, lat: float) -> bool:
+        """Even-odd ray casting over every ring of the feature."""
+        s, e = self.vertex_start[feature], self.vertex_start[feature + 1]
+        v = self.vertices[s:e].astype(np.float64)
+        x0, y0 = v[:-1, 0], v[:-1, 1]
+        x1, y1 = v[1:, 0], v[1:, 1]
+        crosses = np.flatnonzero(((y0 > lat) != (y1 > lat)) & self.edge_valid[s:e - 1])
+        if crosses.size == 0:
+            return False
+        x0, y0, x1, y1 = x0[crosses], y0[crosses], x1[crosses], y1[crosses]
+        x_at = x0 + (lat - y0) * (x1 - x0) / (y1 - y0)
+        return bool(np.count_nonzero(lon < x_at) & 1)
+
+    def locate(self, lon: float, lat: float) -> int:
+        """Index of the feature containing the point, or -1."""
+        for feature in self.candidates(lon, lat):
+            if self.contains(int(feature), lon, lat):
+                return int(feature)
+        return -1
+
+    def locate_many(self, lons: np.ndarray, lats: np.ndarray) -> np.ndarray:
+        """
+        Vectorized locate: (n,) feature index per point, -1 if none.
+
+        Points are expanded into (point, candidate feature) pairs through the
+        grid, pairs are filtered by bbox, and each candidate feature is then
+        ray-cast against all of its points at once (edges × points), in
+        blocks of at most PIP_BLOCK comparisons.
+        """
+        lons = np.asarray(lons, dtype=np.float64)
+        lats = np.asarray(lats, dtype=np.float64)
+        result = np.full(lons.shape[0], -1, dtype=np.int64)
+        if not self.cell or lons.size == 0:
+            return result
+
+        with np.errstate(invalid="ignore"):
+            ix = np.floor((lons - self.x0) / self.cell)
+            iy = np.floor((lats - self.y0) / self.cell)
+        ok = (ix >= 0) & (ix < self.nx) & (iy >= 0) & (iy < self.ny)
+        points = np.flatnonzero(ok)
+        cells = (iy[ok] * self.nx + ix[ok]).astype(np.int64)
+
+        # CSR expansion: one pair per (point, candidate in its cell)
+        starts = self.cell_start[cells].astype(np.int64)
+        counts = self.cell_start[cells + 1].astype(np.int64) - starts
+        pair_point = np.repeat(points, counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        pair_feature = np.asarray(self.cell_items)[np.repeat(starts, counts) + offsets]
+
+        box = self.bbox[pair_feature]
+        px, py = lons[pair_point], lats[pair_point]
+        keep = (box[:, 0] <= px) & (px <= box[:, 2]) & (box[:, 1] <= py) & (py <= box[:, 3])
+        pair_point, pair_feature = pair_point[keep], pair_feature[keep]
+
+        order = np.argsort(pair_feature, kind="stable")
+        pair_point, pair_feature = pair_point[order], pair_feature[order]
+        bounds = np.flatnonzero(np.diff(pair_feature)) + 1
+        for group in np.split(np.arange(pair_feature.size), bounds):
+            if group.size == 0:
+                continue
+            feature = int(pair_feature[group[0]])
+            todo = pair_point[group]
+            todo = todo[result[todo] < 0]
+            if todo.size:
+                inside = self._contains_many(feature, lons[todo], lats[todo])
+                result[todo[inside]] = feature
+        return result
+
+    def _contains_many(self, feature: int, px: np.ndarray, py: np.ndarray) -> np.ndarray:
+        s, e = self.vertex_start[feature], self.vertex_start[feature + 1]
+        v = self.vertices[s:e].astype(np.float64)
+        valid = self.edge_valid[s:e - 1]
+        x0, y0 = v[:-1, 0][valid], v[:-1, 1][valid]
+        x1, y1 = v[1:, 0][valid], v[1:, 1][valid]
+
+        inside = np.zeros(px.size, dtype=bool)
+        block = max(1, PIP_BLOCK // max(1, x0.size))
+        for i in range(0, px.size, block):
+            bx, by = px[i:i + block, None], py[i:i + block, None]
+            crosses = (y0 > by) != (y1 > by)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                x_at = x0 + (by - y0) * (x1 - x0) / (y1 - y0)
+            inside[i:i + block] = (np.count_nonzero(crosses & (bx < x_at), axis=1) & 1).astype(bool)
+        return inside
+
+
+class ReverseGeocoder:
+    """Offline (lat, lon) → state / county FIPS over a packed boundary file."""
+
+    def __init__(self, path: Path = BOUNDARY_FILE) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a packed boundary file: {self.path}")
+            (index_len,) = struct.unpack("<I", f.read(4))
+            index = json.loads(f.read(index_len).decode("utf-8"))
+
+        data_start = len(MAGIC) + 4 + index_len
+        data_start += -data_start % ALIGNMENT
+        self.layers: Dict[str, BoundaryLayer] = {
+            name: BoundaryLayer(self.path, data_start, meta) for name, meta in index["layers"].items()
+        }
+
+    def lookup(self, lat: float, lon: float) -> Dict[str, str | None] | None:
+        """
+        {"state_fips", "state_abbrev", "state_name", "county_fips",
+        "county_name"} for the point, or None outside every polygon.
+        """
+        state_fips = county_fips = county_name = None
+
+        counties = self.layers.get("county")
+        if counties is not None:
+            i = counties.locate(lon, lat)
+            if i >= 0:
+                county_fips, county_name = counties.codes[i], counties.names[i]
+                state_fips = county_fips[:2]
+
+        states = self.layers.get("state")
+        state_name = None
+        if states is not None:
+            i = states.code_index.get(state_fips, -1) if state_fips else states.locate(lon, lat)
+            if i >= 0:
+                state_fips, state_name = states.codes[i], states.names[i]
+
+        if state_fips is None:
+            return None
+        return {
+            "state_fips": state_fips,
+            "state_abbrev": FIPS_TO_STATE_ABBREV.get(state_fips),
+            "state_name": state_name,
+            "county_fips": county_fips,
+            "county_name": county_name,
+        }
+
+    def lookup_many(self, lats: np.ndarray, lons: np.ndarray) -> Tuple[List[str | None], List[str | None]]:
+        """Vectorized lookup: (state_fips, county_fips) lists, None where unresolved."""
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        n = lats.shape[0]
+        state: List[str | None] = [None] * n
+        county: List[str | None] = [None] * n
+
+        counties = self.layers.get("county")
+        if counties is not None:
+            for i, f in enumerate(counties.locate_many(lons, lats).tolist()):
+                if f >= 0:
+                    county[i] = counties.codes[f]
+                    state[i] = county[i][:2]
+
+        states = self.layers.get("state")
+        missing = np.array([i for i in range(n) if state[i] is None], dtype=np.int64)
+        if states is not None and missing.size:
+            for i, f in zip(missing.tolist(), states.locate_many(lons[missing], lats[missing]).tolist()):
+                if f >= 0:
+                    state[i] = states.codes[f]
+        return state, county
+
+
+_GEOCODER: ReverseGeocoder | None = None
+_GEOCODER_LOCK = threading.Lock()
+
+
+def get_reverse_geocoder(path: Path = BOUNDARY_FILE) -> ReverseGeocoder | None:
+    """Process-wide geocoder, or None if the boundary file was not built."""
+    global _GEOCODER
+    if _GEOCODER is None:
+        with _GEOCODER_LOCK:
+            if _GEOCODER is None:
+                if not Path(path).exists():
+                    return None
+                _GEOCODER = ReverseGeocoder(path)
+    return _GEOCODER
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pack US state/county polygons for offline geocoding")
+    parser.add_argument("--states", type=Path, default=STATE_SOURCE)
+    parser.add_argument("--counties", type=Path, default=COUNTY_SOURCE)
+    parser.add_argument("--out", type=Path, default=BOUNDARY_FILE)
+    args = parser.parse_args()
+
+    layers = {}
+    for layer, source in (("state", args.states), ("county", args.counties)):
+        if source.exists():
+            layers[layer] = read_features(source, *LAYER_PROPERTIES[layer])
+        else:
+            print(f"WARNING: {layer} boundaries not found at {source}; layer skipped.")
+    if not layers:
+        raise SystemExit("No boundary sources found.")
+    print(compile_boundaries(layers, args.out))
+
+
+if __name__ == "__main__":
+    main()
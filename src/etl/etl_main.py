@@ -0,0 +1,393 @@
+# src/etl/etl_main.py
+
+"""
+UCMR5 ETL entry point.
+
+Streams data/raw/UCMR5_All.txt in bounded-memory chunks, keeps only PFAS
+samples, and writes:
+
+- data/processed/ucmr5_state_medians.csv   (State,Contaminant,ppt)
+- data/processed/ucmr5_state_medians.bin   (compiled, memory-mappable copy)
+- data/processed/ucmr5_etl_report.json     (per-run stats)
+
+Per-state medians are computed per (state FIPS, canonical contaminant);
+the national "00" rows are the medians over every state. Samples flow
+into a streaming quantile aggregator (exact with spill-to-disk, or a KLL
+sketch for fast approximate reruns), so extra percentiles can be written
+as additional columns.
+
+Usage:
+    python -m src.etl.etl_main [--raw PATH] [--out PATH] [--engine auto|pyarrow|python]
+                               [--mode exact|sketch] [--percentiles 0.9,0.95]
+                               [--workers N] [--incremental]
+"""
+
+import argparse
+import csv
+import json
+import resource
+import time
+from pathlib import Path
+from typing import Any, Dict, Sequence, Tuple
+
+from src.config.state_codes import NATIONAL_FIPS
+from src.etl.background_table import compile_background
+from src.etl.etl_manifest import (
+    MANIFEST_VERSION,
+    STATE_DIR,
+    AggregateStore,
+    load_manifest,
+    plan_run,
+    prefix_fingerprint,
+    save_manifest,
+    schema_fingerprint,
+)
+from src.etl.median_aggregator import (
+    DEFAULT_MAX_BUFFERED_VALUES,
+    ExactQuantiles,
+    SketchQuantiles,
+    make_aggregator,
+)
+from src.etl.parallel_ingest import collect_parallel, default_workers
+from src.etl.ucmr5_ingest import PROCESSED_FILE
+from src.etl.ucmr5_reader import (
+    DEFAULT_BLOCK_BYTES,
+    UCMR5_RAW_FILE,
+    ReaderStats,
+    iter_raw_chunks,
+    normalize_chunk,
+    read_header,
+)
+
+REPORT_FILE = Path("data/processed/ucmr5_etl_report.json")
+
+Key = Tuple[str, str]  # (state FIPS, contaminant)
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def _collect_samples(
+    raw_path: Path,
+    engine: str,
+    block_bytes: int,
+    include_nondetects: bool,
+    aggregator: ExactQuantiles | SketchQuantiles,
+    stats: ReaderStats,
+    byte_range: Tuple[int, int] | None = None,
+) -> int:
+    """
+    Stream the raw file (or one byte range of it) and feed PFAS values per
+    key into the aggregator. Only PFAS samples reach the aggregator, never
+    raw rows.
+    """
+    kept = 0
+
+    for chunk in iter_raw_chunks(
+        raw_path,
+        engine=engine,
+        block_bytes=block_bytes,
+        stats=stats,
+        byte_range=byte_range,
+    ):
+        pfas = normalize_chunk(chunk, include_nondetects=include_nondetects)
+        kept += len(pfas)
+        for (state, chem), values in pfas.groupby(["state", "contaminant"])["ppt"]:
+            values = values.to_numpy()
+            aggregator.add((state, chem), values)
+            aggregator.add((NATIONAL_FIPS, chem), values)
+
+    return kept
+
+
+def summarize(
+    aggregator: ExactQuantiles | SketchQuantiles | AggregateStore,
+    percentiles: Sequence[float] = (),
+    keys: Sequence[Key] | None = None,
+) -> Dict[Key, Dict[str, float]]:
+    """
+    Per key: {"ppt": median, "n": count, "p90": ..., ...}
+    Only `keys` are summarized when given (default: every key).
+    """
+    rows: Dict[Key, Dict[str, float]] = {}
+    for key in aggregator.keys() if keys is None else keys:
+        row = {"ppt": aggregator.median(key), "n": aggregator.count(key)}
+        if percentiles:
+            values = aggregator.quantile(key, list(percentiles))
+            for p, v in zip(percentiles, values):
+                row[_percentile_column(p)] = float(v)
+        rows[key] = row
+    return rows
+
+
+def _percentile_column(p: float) -> str:
+    return f"p{round(p * 100, 2):g}"
+
+
+def write_medians(
+    medians: Dict[Key, Dict[str, float]],
+    out_path: Path,
+    percentiles: Sequence[float] = (),
+) -> None:
+    """
+    Write medians in the State,Contaminant,ppt layout ucmr5_ingest reads;
+    requested percentiles are appended as extra columns (p90, p95, ...).
+    """
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_suffix(out_path.suffix + ".tmp")
+    extra = [_percentile_column(p) for p in percentiles]
+
+    with open(tmp_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["State", "Contaminant", "ppt", *extra])
+        for (state, chem) in sorted(medians):
+            row = medians[(state, chem)]
+            writer.writerow(
+                [state, chem, *(round(row[col], 4) for col in ["ppt", *extra])]
+            )
+
+    # atomic replace so the API never reads a half-written file
+    tmp_path.replace(out_path)
+
+
+def collect(
+    raw_path: Path,
+    engine: str = "auto",
+    block_bytes: int = DEFAULT_BLOCK_BYTES,
+    include_nondetects: bool = False,
+    mode: str = "exact",
+    spill_dir: Path | None = None,
+    max_buffered_values: int = DEFAULT_MAX_BUFFERED_VALUES,
+    workers: int = 1,
+    start: int | None = None,
+) -> Tuple[ExactQuantiles | SketchQuantiles, ReaderStats, int, str | None]:
+    """
+    Aggregate PFAS samples from the raw file, optionally only from byte
+    offset `start` onwards. Returns (aggregator, stats, kept, fallback_error).
+    """
+    if workers > 1:
+        aggregator, stats, kept = collect_parallel(
+            raw_path,
+            workers,
+            engine=engine,
+            block_bytes=block_bytes,
+            include_nondetects=include_nondetects,
+            mode=mode,
+            spill_dir=spill_dir,
+            max_buffered_values=max_buffered_values,
+            start=start,
+        )
+        return aggregator, stats, kept, None
+
+    if mode == "exact":
+        agg_kwargs = {"spill_dir": spill_dir, "max_buffered_values": max_buffered_values}
+    else:
+        agg_kwargs = {}
+
+    size = raw_path.stat().st_size
+    if start is not None and start >= size:
+        # nothing appended since the last incremental run
+        return make_aggregator(mode, **agg_kwargs), ReaderStats(), 0, None
+    byte_range = (start, size) if start is not None else None
+    engines = ["pyarrow", "python"] if engine == "auto" else [engine]
+    fallback_error = None
+
+    for name in engines:
+        stats = ReaderStats()
+        aggregator = make_aggregator(mode, **agg_kwargs)
+        try:
+            kept = _collect_samples(
+                raw_path, name, block_bytes, include_nondetects, aggregator, stats, byte_range
+            )
+            return aggregator, stats, kept, fallback_error
+        except Exception as e:
+            aggregator.close()
+            if name == engines[-1]:
+                raise
+            fallback_error = f"{type(e).__name__}: {e}"
+            print(f"WARNING: {name} reader failed ({fallback_error}), falling back...")
+
+
+def run_etl(
+    raw_path: Path = UCMR5_RAW_FILE,
+    out_path: Path = PROCESSED_FILE,
+    report_path: Path | None = REPORT_FILE,
+    engine: str = "auto",
+    block_bytes: int = DEFAULT_BLOCK_BYTES,
+    include_nondetects: bool = False,
+    mode: str = "exact",
+    percentiles: Sequence[float] = (),
+    spill_dir: Path | None = None,
+    max_buffered_values: int = DEFAULT_MAX_BUFFERED_VALUES,
+    workers: int = 1,
+    incremental: bool = False,
+    state_dir: Path = STATE_DIR,
+) -> Dict[str, Any]:
+    """
+    Run the UCMR5 → state medians ETL and return the run report.
+
+    engine="auto" tries the pyarrow streaming reader first and falls back
+    to the python engine if pyarrow cannot parse the file.
+
+    mode="exact" keeps every sample (spilling to spill_dir past
+    max_buffered_values); mode="sketch" uses per-key KLL sketches.
+
+    workers > 1 splits the file into byte-range shards parsed by a
+    process pool (see parallel_ingest); results are identical.
+
+    incremental=True keeps a manifest and per-key aggregates in state_dir
+    (see etl_manifest). When the raw file only gained appended rows since
+    the last run, only those bytes are parsed and only the affected keys
+    are re-summarized; any other change triggers a full rebuild.
+    """
+    raw_path = Path(raw_path)
+    if not raw_path.exists():
+        raise FileNotFoundError(f"UCMR5 raw file not found at: {raw_path}")
+
+    started = time.perf_counter()
+    raw_size = raw_path.stat().st_size
+    start = None
+    reason = None
+
+    if incremental:
+        header, header_end = read_header(raw_path)
+        options = {"mode": mode, "include_nondetects": include_nondetects}
+        schema_fp = schema_fingerprint(header, options)
+        manifest = load_manifest(state_dir)
+        start, reason = plan_run(raw_path, manifest, schema_fp)
+        if start is None:
+            store = AggregateStore.reset(state_dir, mode)
+        else:
+            store = AggregateStore.from_manifest(state_dir, manifest)
+            if list(percentiles) != manifest.get("percentiles"):
+                reason += ", percentiles changed"
+
+    aggregator, stats, kept, fallback_error = collect(
+        raw_path,
+        engine=engine,
+        block_bytes=block_bytes,
+        include_nondetects=include_nondetects,
+        mode=mode,
+        spill_dir=spill_dir,
+        max_buffered_values=max_buffered_values,
+        workers=workers,
+        start=(header_end if start is None else start) if incremental else None,
+    )
+
+    try:
+        spilled = getattr(aggregator, "spilled", False)
+        if incremental:
+            affected = store.apply(aggregator)
+            if "percentiles changed" in reason:
+                affected = store.keys()
+            for key, row in summarize(store, percentiles, keys=affected).items():
+                store.set_summary(key, row)
+            medians = store.summaries()
+        else:
+            affected = None
+            medians = summarize(aggregator, percentiles)
+    finally:
+        aggregator.close()
+    write_medians(medians, Path(out_path), percentiles)
+    compiled_path = compile_background(Path(out_path))
+
+    if incremental:
+        save_manifest(
+            {
+                "version": MANIFEST_VERSION,
+                "schema_fingerprint": schema_fp,
+                "mode": mode,
+                "percentiles": list(percentiles),
+                "raw_file": str(raw_path),
+                "processed_bytes": raw_size,
+                "prefix_fingerprint": prefix_fingerprint(raw_path, raw_size),
+                "sketch_file": store.sketch_file,
+                "keys": store.entries(),
+            },
+            state_dir,
+        )
+        store.cleanup()
+
+    report = {
+        "raw_file": str(raw_path),
+        "raw_bytes": raw_size,
+        "output_file": str(out_path),
+        "compiled_file": str(compiled_path),
+        **stats.as_dict(),
+        "fallback_error": fallback_error,
+        "pfas_samples": kept,
+        "include_nondetects": include_nondetects,
+        "workers": workers,
+        "aggregator_mode": mode,
+        "spilled_to_disk": spilled,
+        "percentiles": list(percentiles),
+        "incremental": incremental,
+        "incremental_reason": reason,
+        "bytes_parsed": raw_size - (start if start is not None else 0),
+        "keys_updated": len(affected) if affected is not None else len(medians),
+        "states": len({s for s, _ in medians if s != NATIONAL_FIPS}),
+        "contaminants": len({c for _, c in medians}),
+        "median_rows": len(medians),
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+    if report_path is not None:
+        report_path = Path(report_path)
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(json.dumps(report, indent=2))
+
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="UCMR5 → state PFAS medians ETL")
+    parser.add_argument("--raw", type=Path, default=UCMR5_RAW_FILE)
+    parser.add_argument("--out", type=Path, default=PROCESSED_FILE)
+    parser.add_argument("--report", type=Path, default=REPORT_FILE)
+    parser.add_argument("--engine", choices=["auto", "pyarrow", "python"], default="auto")
+    parser.add_argument("--block-mb", type=int, default=DEFAULT_BLOCK_BYTES // (1024 * 1024))
+    parser.add_argument("--include-nondetects", action="store_true")
+    parser.add_argument("--mode", choices=["exact", "sketch"], default="exact")
+    parser.add_argument(
+        "--percentiles",
+        type=lambda s: [float(p) for p in s.split(",") if p],
+        default=[],
+        help="extra quantiles to write, e.g. 0.9,0.95",
+    )
+    parser.add_argument("--spill-dir", type=Path, default=None)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="worker processes for byte-range sharded parsing (0 = all cores)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only parse rows appended since the last run (manifest in --state-dir)",
+    )
+    parser.add_argument("--state-dir", type=Path, default=STATE_DIR)
+    args = parser.parse_args()
+
+    report = run_etl(
+        raw_path=args.raw,
+        out_path=args.out,
+        report_path=args.report,
+        engine=args.engine,
+        block_bytes=args.block_mb * 1024 * 1024,
+        include_nondetects=args.include_nondetects,
+        mode=args.mode,
+        percentiles=args.percentiles,
+        spill_dir=args.spill_dir,
+        workers=args.workers or default_workers(),
+        incremental=args.incremental,
+        state_dir=args.state_dir,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
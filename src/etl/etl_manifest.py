@@ -0,0 +1,276 @@
+# src/etl/etl_manifest.py
+
+"""
+Manifest and persisted aggregate state for incremental UCMR5 re-ingest.
+
+EPA publishes UCMR5 as cumulative releases: each drop is the previous file
+with new samples appended. The manifest remembers how far the last run got
+(byte offset), a fingerprint of the bytes it consumed, a fingerprint of
+everything that affects parsing (header, contaminant mapping, unit table,
+ETL options) and, per (state, contaminant) key, the aggregate state and the
+summary row written to the medians CSV.
+
+Layout (data/processed/ucmr5_etl_state/):
+
+    manifest.json        offsets, fingerprints, per-key counts and summaries
+    values/00001.f64     exact mode: append-only float64 samples per key
+    sketch-<id>.pkl      sketch mode: pickled SketchQuantiles (one per commit)
+
+Value files are append-only and the manifest stores the committed count per
+key, so a crash between appending and writing the manifest is harmless: the
+next run only reads the first `count` values of each file.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Sequence, Tuple
+
+import numpy as np
+
+from src.etl.median_aggregator import ExactQuantiles, SketchQuantiles
+from src.etl.ucmr5_reader import CANONICAL_NAMES, UCMR5_COLUMNS, UNIT_TO_PPT
+
+STATE_DIR = Path("data/processed/ucmr5_etl_state")
+MANIFEST_VERSION = 1
+
+FINGERPRINT_BLOCK = 64 * 1024
+FINGERPRINT_SAMPLES = 16
+
+Key = Tuple[str, str]
+
+
+# ----------------------------------------------------------------------
+# Fingerprints
+# ----------------------------------------------------------------------
+def prefix_fingerprint(path: Path, end: int) -> str:
+    """
+    Fingerprint of bytes [0, end) of a file: the length plus evenly spaced
+    64 KB samples and the final block. Cheap enough to run on multi-GB files
+    while still catching a re-issued (not just appended) release.
+    """
+    h = hashlib.sha256(str(end).encode())
+    if end <= 0:
+        return h.hexdigest()
+
+    span = max(0, end - FINGERPRINT_BLOCK)
+    offsets = sorted({span * i // FINGERPRINT_SAMPLES for i in range(FINGERPRINT_SAMPLES)} | {span})
+    with open(path, "rb") as f:
+        for offset in offsets:
+            f.seek(offset)
+            h.update(f.read(min(FINGERPRINT_BLOCK, end - offset)))
+    return h.hexdigest()
+
+
+def schema_fingerprint(header: Sequence[str], options: Dict[str, Any]) -> str:
+    """
+    Anything that changes how rows are parsed or aggregated. If this differs
+    from the manifest, previous aggregates cannot be reused.
+    """
+    payload = {
+        "version": MANIFEST_VERSION,
+        "header": list(header),
+        "columns": UCMR5_COLUMNS,
+        "canonical_names": CANONICAL_NAMES,
+        "unit_to_ppt": UNIT_TO_PPT,
+        "options": options,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def _last_byte_is_newline(path: Path, end: int) -> bool:
+    if end <= 0:
+        return True
+    with open(path, "rb") as f:
+        f.seek(end - 1)
+        return f.read(1) == b"\n"
+
+
+# ----------------------------------------------------------------------
+# Manifest
+# ----------------------------------------------------------------------
+def load_manifest(state_dir: Path = STATE_DIR) -> Dict[str, Any] | None:
+    path = Path(state_dir) / "manifest.json"
+    if not path.exists():
+        return None
+    try:
+        manifest = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == MANIFEST_VERSION else None
+
+
+def save_manifest(manifest: Dict[str, Any], state_dir: Path = STATE_DIR) -> None:
+    path = Path(state_dir) / "manifest.json"
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(manifest, indent=1))
+    tmp.replace(path)
+
+
+def plan_run(
+    raw_path: Path,
+    manifest: Dict[str, Any] | None,
+    schema_fp: str,
+) -> Tuple[int | None, str]:
+    """
+    Decide where parsing starts.
+
+    Returns (start_offset, reason). start_offset is None for a full rebuild;
+    otherwise only bytes [start_offset, EOF) need to be parsed.
+    """
+    if manifest is None:
+        return None, "no manifest"
+    if manifest.get("schema_fingerprint") != schema_fp:
+        return None, "schema or mapping changed"
+
+    size = os.path.getsize(raw_path)
+    offset = int(manifest.get("processed_bytes", 0))
+    if size < offset:
+        return None, "file shrank"
+    if prefix_fingerprint(raw_path, offset) != manifest.get("prefix_fingerprint"):
+        return None, "previously processed bytes changed"
+    if size > offset and not _last_byte_is_newline(raw_path, offset):
+        return None, "last processed line was extended"
+    return offset, "appended rows only" if size > offset else "unchanged"
+
+
+# ----------------------------------------------------------------------
+# Persisted per-key aggregate state
+# ----------------------------------------------------------------------
+class AggregateStore:
+    """
+    Durable per-key aggregates behind the manifest. Implements the same
+    read interface as the in-memory aggregators (keys / count / median /
+    quantile) so etl_main.summarize works on it directly.
+    """
+
+    def __init__(
+        self,
+        state_dir: Path,
+        mode: str,
+        entries: List[Dict[str, Any]],
+        sketch_file: str | None = None,
+    ) -> None:
+        self.state_dir = Path(state_dir)
+        self.mode = mode
+        self.sketch_file = sketch_file
+        self._entries: Dict[Hashable, Dict[str, Any]] = {
+            (e["state"], e["contaminant"]): e for e in entries
+        }
+        self._sketch: SketchQuantiles | None = None
+        if mode == "sketch":
+            if sketch_file:
+                with open(self.state_dir / sketch_file, "rb") as f:
+                    self._sketch = pickle.load(f)
+            else:
+                self._sketch = SketchQuantiles()
+
+    @classmethod
+    def from_manifest(cls, state_dir: Path, manifest: Dict[str, Any]) -> "AggregateStore":
+        return cls(state_dir, manifest["mode"], manifest["keys"], manifest.get("sketch_file"))
+
+    @classmethod
+    def reset(cls, state_dir: Path, mode: str) -> "AggregateStore":
+        state_dir = Path(state_dir)
+        # forget the old manifest first: it would point at deleted values
+        (state_dir / "manifest.json").unlink(missing_ok=True)
+        shutil.rmtree(state_dir / "values", ignore_errors=True)
+        for old in state_dir.glob("sketch-*.pkl"):
+            old.unlink()
+        state_dir.mkdir(parents=True, exist_ok=True)
+        return cls(state_dir, mode, [])
+
+    def cleanup(self) -> None:
+        """After the manifest is committed, drop sketch files it no longer names."""
+        for old in self.state_dir.glob("sketch-*.pkl"):
+            if old.name != self.sketch_file:
+                old.unlink()
+
+    # -- write ----------------------------------------------------------
+    def apply(self, delta: ExactQuantiles | SketchQuantiles) -> List[Key]:
+        """Fold a delta aggregator into the store; returns affected keys."""
+        affected = list(delta.keys())
+        if self.mode == "sketch":
+            # a new file per commit: the manifest keeps naming the old one
+            # until it is rewritten, so a crash here never double-counts
+            self._sketch.merge(delta)
+            self.sketch_file = f"sketch-{uuid.uuid4().hex[:12]}.pkl"
+            with open(self.state_dir / self.sketch_file, "wb") as f:
+                pickle.dump(self._sketch, f)
+            for key in affected:
+                entry = self._entry(key)
+                entry["count"] = self._sketch.count(key)
+            return affected
+
+        values_dir = self.state_dir / "values"
+        values_dir.mkdir(parents=True, exist_ok=True)
+        for key in affected:
+            entry = self._entry(key)
+            path = values_dir / entry["file"]
+            committed = entry["count"] * 8
+            with open(path, "ab") as f:
+                # drop bytes appended by a run that never committed
+                if f.tell() != committed:
+                    f.truncate(committed)
+                    f.seek(committed)
+                delta.values(key).tofile(f)
+            entry["count"] += delta.count(key)
+        return affected
+
+    def _entry(self, key: Key) -> Dict[str, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = {
+                "state": key[0],
+                "contaminant": key[1],
+                "file": f"{len(self._entries):05d}.f64",
+                "count": 0,
+                "summary": None,
+            }
+        return entry
+
+    def set_summary(self, key: Key, summary: Dict[str, float]) -> None:
+        self._entry(key)["summary"] = summary
+
+    def summaries(self) -> Dict[Key, Dict[str, float]]:
+        return {k: e["summary"] for k, e in self._entries.items() if e["summary"] is not None}
+
+    def entries(self) -> List[Dict[str, Any]]:
+        return list(self._entries.values())
+
+    # -- read -----------------------------------------------------------
+    def keys(self) -> List[Hashable]:
+        return list(self._entries)
+
+    def count(self, key: Hashable) -> int:
+        entry = self._entries.get(key)
+        return entry["count"] if entry else 0
+
+    def values(self, key: Hashable) -> np.ndarray:
+        entry = self._entries.get(key)
+        if entry is None or entry["count"] == 0:
+            return np.empty(0, dtype=np.float64)
+        return np.fromfile(
+            self.state_dir / "values" / entry["file"], dtype=np.float64, count=entry["count"]
+        )
+
+    def quantile(self, key: Hashable, q: float | Sequence[float]):
+        if self.mode == "sketch":
+            return self._sketch.quantile(key, q)
+        values = self.values(key)
+        if values.size == 0:
+            return np.nan if np.isscalar(q) else np.full(len(q), np.nan)
+        return np.quantile(values, q)
+
+    def median(self, key: Hashable) -> float:
+        if self.mode == "sketch":
+            return self._sketch.median(key)
+        values = self.values(key)
+        return float(np.median(values)) if values.size else float("nan")
+
+    def close(self) -> None:
+        """Nothing to release; the store lives on disk between runs."""
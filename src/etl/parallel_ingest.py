@@ -0,0 +1,168 @@
+# src/etl/parallel_ingest.py
+
+"""
+Multi-process UCMR5 ingestion.
+
+The raw file is split into newline-aligned byte-range shards. Each worker
+process streams its shard, normalizes contaminants to canonical PFAS names
+(pfas_mapping.PFAS_CHEM_INFO via ucmr5_reader.normalize_chunk) and builds a
+partial quantile aggregator. The parent merges partials as they complete.
+
+Exact-mode workers spill everything to disk before returning, so only file
+paths and counters cross the process boundary; the merge then appends the
+spill files without loading them.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from src.config.state_codes import NATIONAL_FIPS
+from src.etl.median_aggregator import (
+    DEFAULT_MAX_BUFFERED_VALUES,
+    ExactQuantiles,
+    SketchQuantiles,
+    make_aggregator,
+)
+from src.etl.ucmr5_reader import (
+    DEFAULT_BLOCK_BYTES,
+    ReaderStats,
+    compute_shards,
+    iter_raw_chunks,
+    normalize_chunk,
+    read_header,
+)
+
+SHARDS_PER_WORKER = 4  # smaller shards → better load balance at the tail
+
+
+def default_workers() -> int:
+    return max(1, (os.cpu_count() or 1))
+
+
+def ingest_shard(
+    raw_path: Path,
+    byte_range: Tuple[int, int],
+    column_names: List[str],
+    engine: str,
+    block_bytes: int,
+    include_nondetects: bool,
+    mode: str,
+    agg_kwargs: Dict[str, Any],
+) -> Tuple[ExactQuantiles | SketchQuantiles, ReaderStats, int]:
+    """
+    Worker entry point: aggregate one shard. engine="auto" retries the
+    shard with the python engine if pyarrow fails on it.
+    """
+    engines = ["pyarrow", "python"] if engine == "auto" else [engine]
+
+    for name in engines:
+        stats = ReaderStats()
+        aggregator = make_aggregator(mode, **agg_kwargs)
+        kept = 0
+        try:
+            for chunk in iter_raw_chunks(
+                raw_path,
+                engine=name,
+                block_bytes=block_bytes,
+                stats=stats,
+                byte_range=byte_range,
+                column_names=column_names,
+                use_threads=False,  # one core per worker, no oversubscription
+            ):
+                pfas = normalize_chunk(chunk, include_nondetects=include_nondetects)
+                kept += len(pfas)
+                for (state, chem), values in pfas.groupby(["state", "contaminant"])["ppt"]:
+                    values = values.to_numpy()
+                    aggregator.add((state, chem), values)
+                    aggregator.add((NATIONAL_FIPS, chem), values)
+            break
+        except Exception:
+            aggregator.close()
+            if name == engines[-1]:
+                raise
+
+    if isinstance(aggregator, ExactQuantiles):
+        aggregator.spill()
+    return aggregator, stats, kept
+
+
+def collect_parallel(
+    raw_path: Path,
+    workers: int,
+    engine: str = "auto",
+    block_bytes: int = DEFAULT_BLOCK_BYTES,
+    include_nondetects: bool = False,
+    mode: str = "exact",
+    spill_dir: Path | None = None,
+    max_buffered_values: int = DEFAULT_MAX_BUFFERED_VALUES,
+    start: int | None = None,
+) -> Tuple[ExactQuantiles | SketchQuantiles, ReaderStats, int]:
+    """
+    Aggregate the file across a process pool. Returns the merged
+    aggregator, merged reader stats and the number of PFAS samples kept.
+
+    start (a line-aligned byte offset) limits parsing to bytes appended
+    after it; by default everything after the header is parsed.
+    """
+    raw_path = Path(raw_path)
+    column_names, header_end = read_header(raw_path)
+    shards = compute_shards(
+        raw_path,
+        workers * SHARDS_PER_WORKER,
+        start=header_end if start is None else max(start, header_end),
+    )
+
+    if mode == "exact":
+        # per-worker budget keeps total buffered memory ≈ max_buffered_values
+        agg_kwargs = {
+            "spill_dir": spill_dir,
+            "max_buffered_values": max(1, max_buffered_values // workers),
+        }
+        merged_kwargs = {"spill_dir": spill_dir, "max_buffered_values": max_buffered_values}
+    else:
+        agg_kwargs = merged_kwargs = {}
+
+    merged = make_aggregator(mode, **merged_kwargs)
+    stats = ReaderStats()
+    kept = 0
+
+    # each worker reads with one thread; cap block size so shards still stream
+    shard_block = max(1 << 20, min(block_bytes, DEFAULT_BLOCK_BYTES // 4))
+
+    futures = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    ingest_shard,
+                    raw_path,
+                    shard,
+                    column_names,
+                    engine,
+                    shard_block,
+                    include_nondetects,
+                    mode,
+                    agg_kwargs,
+                )
+                for shard in shards
+            ]
+            for future in as_completed(futures):
+                partial, shard_stats, shard_kept = future.result()
+                try:
+                    merged.merge(partial)
+                finally:
+                    partial.close()
+                stats.merge(shard_stats)
+                kept += shard_kept
+    except Exception:
+        merged.close()
+        # drop spill files of partials that finished but were never merged
+        for future in futures:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                future.result()[0].close()
+        raise
+
+    stats.engine = stats.engine or engine
+    return merged, stats, kept
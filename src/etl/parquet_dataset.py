@@ -0,0 +1,275 @@
+# src/etl/parquet_dataset.py
+
+"""
+UCMR5 raw text → partitioned Parquet dataset.
+
+The raw file is parsed once, streamed chunk by chunk into a hive-partitioned
+dataset:
+
+    data/processed/ucmr5_parquet/state=51/contaminant=PFOA/part-0.parquet
+
+with typed columns (float64 values in ppt, date32 collection dates, a
+boolean detect flag) and dictionary-encoded categoricals (PWSID, method,
+size, sign). The dataset schema is cached in `_common_metadata`, so readers
+open the dataset without inferring anything from the data files.
+
+Readers ask for partitions and columns only; pyarrow prunes directories by
+state/contaminant and pushes the remaining predicates down to row groups.
+
+Usage:
+    python -m src.etl.parquet_dataset [--raw PATH] [--out DIR]
+"""
+
+import argparse
+import shutil
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.config.state_codes import to_state_fips
+from src.etl.ucmr5_reader import (
+    CANONICAL_NAMES,
+    DEFAULT_BLOCK_BYTES,
+    UCMR5_RAW_FILE,
+    UNIT_TO_PPT,
+    ReaderStats,
+    iter_raw_chunks,
+)
+
+UCMR5_DATASET_DIR = Path("data/processed/ucmr5_parquet")
+SCHEMA_FILE_NAME = "_common_metadata"
+
+# Raw UCMR5 column -> dataset column
+DATASET_RAW_COLUMNS: Dict[str, str] = {
+    "PWSID": "pwsid",
+    "Size": "size",
+    "FacilityID": "facility_id",
+    "SamplePointID": "sample_point_id",
+    "CollectionDate": "collection_date",
+    "SampleID": "sample_id",
+    "Contaminant": "contaminant",
+    "MRL": "mrl",
+    "Units": "units",
+    "MethodID": "method",
+    "AnalyticalResultsSign": "sign",
+    "AnalyticalResultValue": "value",
+    "State": "state",
+}
+
+DICT_STRING = pa.dictionary(pa.int32(), pa.string())
+
+PARTITION_SCHEMA = pa.schema(
+    [
+        pa.field("state", pa.string()),
+        pa.field("contaminant", pa.string()),
+    ]
+)
+
+UCMR5_SCHEMA = pa.schema(
+    [
+        pa.field("pwsid", DICT_STRING),
+        pa.field("size", DICT_STRING),
+        pa.field("facility_id", pa.string()),
+        pa.field("sample_point_id", pa.string()),
+        pa.field("sample_id", pa.string()),
+        pa.field("collection_date", pa.date32()),
+        pa.field("method", DICT_STRING),
+        pa.field("sign", DICT_STRING),
+        pa.field("mrl_ppt", pa.float64()),
+        pa.field("value_ppt", pa.float64()),
+        pa.field("detect", pa.bool_()),
+        pa.field("is_pfas", pa.bool_()),
+        *PARTITION_SCHEMA,
+    ]
+)
+
+UCMR5_DATE_FORMAT = "%m/%d/%Y"
+
+
+# ----------------------------------------------------------------------
+# Write
+# ----------------------------------------------------------------------
+def _to_record_batch(chunk: pd.DataFrame) -> pa.RecordBatch:
+    raw_contaminant = chunk["contaminant"].fillna("").str.strip()
+    canonical = raw_contaminant.str.upper().map(CANONICAL_NAMES)
+    state = chunk["state"].fillna("").str.strip()
+    factor = chunk["units"].str.strip().str.lower().map(UNIT_TO_PPT)
+    sign = chunk["sign"].str.strip()
+
+    columns = {
+        "pwsid": chunk["pwsid"],
+        "size": chunk["size"],
+        "facility_id": chunk["facility_id"],
+        "sample_point_id": chunk["sample_point_id"],
+        "sample_id": chunk["sample_id"],
+        "collection_date": pd.to_datetime(
+            chunk["collection_date"], format=UCMR5_DATE_FORMAT, errors="coerce"
+        ).dt.date,
+        "method": chunk["method"],
+        "sign": sign,
+        "mrl_ppt": pd.to_numeric(chunk["mrl"], errors="coerce") * factor,
+        "value_ppt": pd.to_numeric(chunk["value"], errors="coerce") * factor,
+        "detect": (sign != "<").to_numpy(),
+        "is_pfas": canonical.notna().to_numpy(),
+        # non-PFAS contaminants keep their reported name; unknown states
+        # (tribal regions) keep their reported code
+        "state": state.map(lambda s: to_state_fips(s) or s.upper()),
+        "contaminant": canonical.fillna(raw_contaminant),
+    }
+
+    arrays = []
+    for field in UCMR5_SCHEMA:
+        values = columns[field.name]
+        if isinstance(values, pd.Series):
+            values = values.to_numpy(dtype=object)
+            values = np.where(pd.isna(values), None, values)
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, type=field.type, from_pandas=True))
+    return pa.RecordBatch.from_arrays(arrays, schema=UCMR5_SCHEMA)
+
+
+def _iter_batches(
+    raw_path: Path, engine: str, block_bytes: int, stats: ReaderStats
+) -> Iterator[pa.RecordBatch]:
+    for chunk in iter_raw_chunks(
+        raw_path,
+        engine=engine,
+        block_bytes=block_bytes,
+        stats=stats,
+        columns=DATASET_RAW_COLUMNS,
+    ):
+        yield _to_record_batch(chunk)
+
+
+def write_ucmr5_dataset(
+    raw_path: Path = UCMR5_RAW_FILE,
+    out_dir: Path = UCMR5_DATASET_DIR,
+    engine: str = "pyarrow",
+    block_bytes: int = DEFAULT_BLOCK_BYTES,
+) -> Dict[str, object]:
+    """
+    Convert the raw text file into a state/contaminant partitioned Parquet
+    dataset. The output directory is rebuilt from scratch on every run.
+    """
+    raw_path, out_dir = Path(raw_path), Path(out_dir)
+    if not raw_path.exists():
+        raise FileNotFoundError(f"UCMR5 raw file not found at: {raw_path}")
+
+    # write next to the target, then swap, so readers never see a partial dataset
+    tmp_dir = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    stats = ReaderStats()
+
+    ds.write_dataset(
+        _iter_batches(raw_path, engine, block_bytes, stats),
+        tmp_dir,
+        schema=UCMR5_SCHEMA,
+        format="parquet",
+        partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"),
+        existing_data_behavior="overwrite_or_ignore",
+        max_rows_per_group=256 * 1024,
+        basename_template="part-{i}.parquet",
+    )
+    pq.write_metadata(UCMR5_SCHEMA, tmp_dir / SCHEMA_FILE_NAME)
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    tmp_dir.rename(out_dir)
+
+    return {"dataset_dir": str(out_dir), **stats.as_dict()}
+
+
+# ----------------------------------------------------------------------
+# Read
+# ----------------------------------------------------------------------
+_SCHEMA_CACHE: Dict[Path, pa.Schema] = {}
+
+
+def load_schema(dataset_dir: Path = UCMR5_DATASET_DIR) -> pa.Schema:
+    """Cached dataset schema (read once from _common_metadata)."""
+    dataset_dir = Path(dataset_dir).resolve()
+    schema = _SCHEMA_CACHE.get(dataset_dir)
+    if schema is None:
+        meta = dataset_dir / SCHEMA_FILE_NAME
+        schema = pq.read_schema(meta) if meta.exists() else UCMR5_SCHEMA
+        _SCHEMA_CACHE[dataset_dir] = schema
+    return schema
+
+
+def open_ucmr5_dataset(dataset_dir: Path = UCMR5_DATASET_DIR) -> ds.Dataset:
+    dataset_dir = Path(dataset_dir)
+    if not dataset_dir.exists():
+        raise FileNotFoundError(f"UCMR5 Parquet dataset not found at: {dataset_dir}")
+    return ds.dataset(
+        dataset_dir,
+        schema=load_schema(dataset_dir),
+        format="parquet",
+        partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"),
+        exclude_invalid_files=False,
+        ignore_prefixes=["_", "."],
+    )
+
+
+def ucmr5_filter(
+    states: Sequence[str] | None = None,
+    contaminants: Sequence[str] | None = None,
+    detects_only: bool = False,
+    pfas_only: bool = False,
+) -> ds.Expression | None:
+    """Build a pushdown filter; state/contaminant terms prune partitions."""
+    terms = []
+    if states:
+        terms.append(ds.field("state").isin([to_state_fips(s) or s for s in states]))
+    if contaminants:
+        terms.append(ds.field("contaminant").isin(list(contaminants)))
+    if detects_only:
+        terms.append(ds.field("detect"))
+    if pfas_only:
+        terms.append(ds.field("is_pfas"))
+    if not terms:
+        return None
+    expr = terms[0]
+    for term in terms[1:]:
+        expr = expr & term
+    return expr
+
+
+def read_ucmr5_dataset(
+    states: Sequence[str] | None = None,
+    contaminants: Sequence[str] | None = None,
+    columns: List[str] | None = None,
+    detects_only: bool = False,
+    pfas_only: bool = False,
+    dataset_dir: Path = UCMR5_DATASET_DIR,
+) -> pd.DataFrame:
+    """
+    Read only the requested partitions and columns as a DataFrame.
+
+    states accepts FIPS ("51") or USPS ("VA") codes.
+    """
+    dataset = open_ucmr5_dataset(dataset_dir)
+    table = dataset.to_table(
+        columns=columns,
+        filter=ucmr5_filter(states, contaminants, detects_only, pfas_only),
+    )
+    return table.to_pandas()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="UCMR5 raw text → Parquet dataset")
+    parser.add_argument("--raw", type=Path, default=UCMR5_RAW_FILE)
+    parser.add_argument("--out", type=Path, default=UCMR5_DATASET_DIR)
+    parser.add_argument("--engine", choices=["pyarrow", "python"], default="pyarrow")
+    args = parser.parse_args()
+
+    print(write_ucmr5_dataset(args.raw, args.out, engine=args.engine))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,19 @@
 # src/etl/ucmr5_ingest.py
-import csv
 from pathlib import Path
 
+from src.etl.background_table import open_background_table
+
 PROCESSED_FILE = Path("data/processed/ucmr5_state_medians.csv")
 
 def load_ucmr5_background():
     """
     Loads precomputed PFAS medians (ppt) per state.
     No pandas, no ETL, no large data processing.
-    Returns:
+
+    The CSV is compiled once into a float32 state × chemical matrix
+    (data/processed/ucmr5_state_medians.bin) that is memory-mapped
+    read-only, so every worker shares the same pages. The returned table
+    reads like a dict:
       {
          "51": {"PFOA":4.2, "PFOS":3.8},
          "24": {...}
@@ -18,19 +23,24 @@ def load_ucmr5_background():
         print("WARNING: Missing PFAS processed file.")
         return {}
 
-    state_map = {}
-
-    with open(PROCESSED_FILE, "r") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            state = row["State"].zfill(2)
-            chem = row["Contaminant"]
-            ppt = float(row["ppt"])
-
-            if state not in state_map:
-                state_map[state] = {}
+    return open_background_table(PROCESSED_FILE)
 
-            state_map[state][chem] = ppt
-
-    return state_map
+def load_ucmr5_samples(states=None, contaminants=None, columns=None, detects_only=True):
+    """
+    Loads individual PFAS samples from the partitioned UCMR5 Parquet dataset
+    (built by src/etl/parquet_dataset.py), reading only the requested
+    state/contaminant partitions and columns.
 
+    Example:
+      load_ucmr5_samples(states=["VA"], contaminants=["PFOA"], columns=["pwsid", "value_ppt"])
+    """
+    # imported lazily: the API only needs the medians CSV above
+    from src.etl.parquet_dataset import read_ucmr5_dataset
+
+    return read_ucmr5_dataset(
+        states=states,
+        contaminants=contaminants,
+        columns=columns,
+        detects_only=detects_only,
+        pfas_only=True,
+    )
@@ -0,0 +1,313 @@
+# src/etl/ucmr5_reader.py
+
+"""
+Chunked readers for the raw EPA UCMR5 text file (data/raw/UCMR5_All.txt).
+
+The raw file is tab-separated, latin1-encoded (the Units column contains
+"µg/L"), one sample per line, and several million lines long. Nothing here
+ever materializes the whole file: callers iterate over bounded-size chunks
+holding only the columns the ETL needs.
+
+Two engines are available:
+- "pyarrow": pyarrow.csv streaming reader (fast, multithreaded per block)
+- "python":  pandas python engine, slower but tolerant of malformed lines
+
+Because every sample is exactly one line, the file can also be split into
+byte-range shards aligned on newlines (compute_shards) and each shard read
+independently, e.g. by separate worker processes.
+"""
+
+import io
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config.state_codes import to_state_fips
+from src.simulation.pfas_mapping import PFAS_CHEM_INFO
+
+UCMR5_RAW_FILE = Path("data/raw/UCMR5_All.txt")
+UCMR5_ENCODING = "latin1"
+
+# Raw UCMR5 column -> ETL column
+UCMR5_COLUMNS: Dict[str, str] = {
+    "State": "state",
+    "Contaminant": "contaminant",
+    "AnalyticalResultsSign": "sign",
+    "AnalyticalResultValue": "value",
+    "Units": "units",
+}
+
+# Multiplier from reported units to ppt (ng/L)
+UNIT_TO_PPT: Dict[str, float] = {
+    "µg/l": 1000.0,
+    "ug/l": 1000.0,
+    "ng/l": 1.0,
+    "ppt": 1.0,
+    "mg/l": 1_000_000.0,
+}
+
+# UCMR5 contaminant name (uppercase) -> canonical name, medians set only
+CANONICAL_NAMES: Dict[str, str] = {
+    raw: info["canonical_name"]
+    for raw, info in PFAS_CHEM_INFO.items()
+    if info["include_in_medians"]
+}
+
+DEFAULT_BLOCK_BYTES = 16 * 1024 * 1024
+DEFAULT_CHUNK_ROWS = 250_000
+
+
+class ReaderStats:
+    """Counters shared between a reader and the ETL run report."""
+
+    def __init__(self) -> None:
+        self.engine = ""
+        self.chunks = 0
+        self.rows_read = 0
+        self.bad_lines = 0
+
+    def merge(self, other: "ReaderStats") -> None:
+        if not self.engine:
+            self.engine = other.engine
+        elif other.engine and other.engine != self.engine:
+            self.engine = "mixed"
+        self.chunks += other.chunks
+        self.rows_read += other.rows_read
+        self.bad_lines += other.bad_lines
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "engine": self.engine,
+            "chunks": self.chunks,
+            "rows_read": self.rows_read,
+            "bad_lines": self.bad_lines,
+        }
+
+
+# ----------------------------------------------------------------------
+# Byte-range shards
+# ----------------------------------------------------------------------
+class ByteRangeFile(io.RawIOBase):
+    """Read-only view of bytes [start, end) of a file."""
+
+    def __init__(self, path: Path, start: int, end: int) -> None:
+        self._f = open(path, "rb")
+        self._f.seek(start)
+        self._remaining = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if self._remaining <= 0:
+            return 0
+        view = memoryview(b)[: self._remaining]
+        n = self._f.readinto(view)
+        self._remaining -= n
+        return n
+
+    def close(self) -> None:
+        self._f.close()
+        super().close()
+
+
+def read_header(path: Path = UCMR5_RAW_FILE) -> Tuple[List[str], int]:
+    """Return (column names, byte offset of the first data line)."""
+    with open(path, "rb") as f:
+        line = f.readline()
+    names = line.decode(UCMR5_ENCODING).rstrip("\r\n").split("\t")
+    return names, len(line)
+
+
+def compute_shards(path: Path, n_shards: int, start: int | None = None) -> List[Tuple[int, int]]:
+    """
+    Split the data portion of the file into ~equal byte ranges that all
+    begin at the start of a line and end just after a newline.
+    """
+    path = Path(path)
+    size = os.path.getsize(path)
+    if start is None:
+        _, start = read_header(path)
+    if start >= size:
+        return []
+
+    step = max(1, (size - start) // max(1, n_shards))
+    bounds = [start]
+    with open(path, "rb") as f:
+        for i in range(1, n_shards):
+            guess = start + i * step
+            if guess <= bounds[-1]:
+                continue
+            f.seek(guess - 1)
+            f.readline()  # advance to the first full line at/after guess
+            pos = f.tell()
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+# ----------------------------------------------------------------------
+# Engines
+# ----------------------------------------------------------------------
+def _iter_pyarrow(
+    source,
+    columns: List[str],
+    block_bytes: int,
+    stats: ReaderStats,
+    column_names: List[str] | None = None,
+    use_threads: bool = True,
+) -> Iterator[pd.DataFrame]:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    def skip_bad_line(row) -> str:
+        stats.bad_lines += 1
+        return "skip"
+
+    reader = pacsv.open_csv(
+        source,
+        read_options=pacsv.ReadOptions(
+            block_size=block_bytes,
+            encoding=UCMR5_ENCODING,
+            column_names=column_names,
+            use_threads=use_threads,
+        ),
+        parse_options=pacsv.ParseOptions(
+            delimiter="\t",
+            quote_char=False,
+            invalid_row_handler=skip_bad_line,
+        ),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=columns,
+            column_types={c: pa.string() for c in columns},
+            strings_can_be_null=True,
+            include_missing_columns=True,
+        ),
+    )
+    for batch in reader:
+        yield batch.to_pandas()
+
+
+def _iter_python(
+    source,
+    columns: List[str],
+    chunk_rows: int,
+    stats: ReaderStats,
+    column_names: List[str] | None = None,
+) -> Iterator[pd.DataFrame]:
+    def skip_bad_line(line: List[str]) -> None:
+        stats.bad_lines += 1
+        return None
+
+    reader = pd.read_csv(
+        source,
+        sep="\t",
+        engine="python",
+        dtype=str,
+        encoding=UCMR5_ENCODING,
+        header=None if column_names else "infer",
+        names=column_names,
+        usecols=lambda c: c in columns,
+        on_bad_lines=skip_bad_line,
+        chunksize=chunk_rows,
+    )
+    with reader:
+        for chunk in reader:
+            yield chunk
+
+
+def iter_raw_chunks(
+    path: Path = UCMR5_RAW_FILE,
+    engine: str = "pyarrow",
+    block_bytes: int = DEFAULT_BLOCK_BYTES,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    stats: ReaderStats | None = None,
+    byte_range: Tuple[int, int] | None = None,
+    column_names: List[str] | None = None,
+    use_threads: bool = True,
+    columns: Dict[str, str] = UCMR5_COLUMNS,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield raw UCMR5 chunks restricted to `columns` (raw name -> ETL name,
+    UCMR5_COLUMNS by default), all values as str. Columns missing from the
+    file come back as all-null.
+
+    Memory is bounded by block_bytes (pyarrow) or chunk_rows (python),
+    never by the size of the file.
+
+    With byte_range=(start, end) only that shard is read; it has no header
+    line, so column_names (from read_header) are required.
+    """
+    stats = stats if stats is not None else ReaderStats()
+    stats.engine = engine
+    rename = columns
+    columns = list(rename)
+
+    if byte_range is not None:
+        if column_names is None:
+            column_names, _ = read_header(path)
+        source = io.BufferedReader(ByteRangeFile(Path(path), *byte_range))
+    else:
+        column_names = None
+        source = str(path)
+
+    try:
+        if engine == "pyarrow":
+            chunks = _iter_pyarrow(
+                source, columns, block_bytes, stats, column_names, use_threads
+            )
+        elif engine == "python":
+            chunks = _iter_python(source, columns, chunk_rows, stats, column_names)
+        else:
+            raise ValueError(f"Unknown UCMR5 reader engine: {engine}")
+
+        for chunk in chunks:
+            stats.chunks += 1
+            stats.rows_read += len(chunk)
+            yield chunk.reindex(columns=columns).rename(columns=rename)
+    finally:
+        if not isinstance(source, str):
+            source.close()
+
+
+# ----------------------------------------------------------------------
+# Normalization
+# ----------------------------------------------------------------------
+def normalize_chunk(chunk: pd.DataFrame, include_nondetects: bool = False) -> pd.DataFrame:
+    """
+    Reduce a raw chunk to PFAS samples in ppt:
+
+        state (FIPS str) | contaminant (canonical str) | ppt (float64) | detect (bool)
+
+    Non-PFAS contaminants (e.g. lithium), unknown states, unknown units and
+    unparseable values are dropped. Non-detects ("<" sign) are dropped unless
+    include_nondetects is set, in which case they count as 0.0 ppt.
+    """
+    contaminant = chunk["contaminant"].str.strip().str.upper().map(CANONICAL_NAMES)
+    state = chunk["state"].map(to_state_fips, na_action="ignore")
+    factor = chunk["units"].str.strip().str.lower().map(UNIT_TO_PPT)
+    value = pd.to_numeric(chunk["value"], errors="coerce")
+    detect = chunk["sign"].str.strip() != "<"
+
+    ppt = (value * factor).to_numpy(dtype=np.float64, na_value=np.nan)
+    if include_nondetects:
+        ppt = np.where(detect.to_numpy(), ppt, 0.0)
+
+    out = pd.DataFrame(
+        {
+            "state": state,
+            "contaminant": contaminant,
+            "ppt": ppt,
+            "detect": detect,
+        }
+    )
+    keep = out["state"].notna() & out["contaminant"].notna() & out["ppt"].notna()
+    if not include_nondetects:
+        keep &= out["detect"]
+    return out[keep]
@@ -0,0 +1,292 @@
+# src/simulation/batch.py
+
+"""
+Vectorized batch engine for PFASRiskSimulator.
+
+N scenarios are held column-wise in NumPy arrays:
+
+- chemical arrays are (n_chemicals, n_scenarios), rows in PFAS_CHEMICALS order
+- per-scenario inputs (flows, withdrawal, indices) are (n_scenarios,)
+- categorical inputs are small int codes (cooling type, water stress)
+
+and mixing, Hazard Index, MCL flags, risk score, category and pathway are
+computed with whole-array operations. Every arithmetic step mirrors
+PFASRiskSimulator.simulate() operation for operation, in the same order,
+so results are bit-for-bit identical to the scalar path.
+
+Batches are built from the schema-driven ScenarioColumns of
+src.simulation.scenario_codec (from_payloads encodes first).
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+
+from src.simulation.model_schema import PFAS_CHEMICALS
+from src.simulation.scenario_codec import COLUMN_BY_NAME, ScenarioColumns, encode_scenarios
+from src.simulation.simulator import (
+    COOLING_ENRICHMENT,
+    DEFAULT_ENRICHMENT,
+    DEFAULT_STRESS_MULTIPLIER,
+    MGD_TO_CFS,
+    STRESS_MULTIPLIER,
+)
+
+CHEM_INDEX: Dict[str, int] = {chem: i for i, chem in enumerate(PFAS_CHEMICALS)}
+
+# Categorical codes. Code -1 (unknown value) indexes the trailing default.
+COOLING_TYPES: List[str] = list(COOLING_ENRICHMENT)
+ENRICHMENT_BY_CODE = np.array(
+    [COOLING_ENRICHMENT[c] for c in COOLING_TYPES] + [DEFAULT_ENRICHMENT]
+)
+STRESS_CATEGORIES: List[str] = list(STRESS_MULTIPLIER)
+STRESS_MULT_BY_CODE = np.array(
+    [STRESS_MULTIPLIER[s] for s in STRESS_CATEGORIES] + [DEFAULT_STRESS_MULTIPLIER]
+)
+
+RISK_CATEGORIES = np.array(["low", "moderate", "high", "severe"], dtype=object)
+RISK_CATEGORY_EDGES = np.array([25.0, 50.0, 75.0])
+PATHWAYS = np.array(["groundwater", "surface_water", "mixed"], dtype=object)
+
+# Scalar-path defaults for missing payload keys (the codec fills schema defaults)
+DEFAULT_RIVER_FLOW_CFS = 100.0
+DEFAULT_GW_VULNERABILITY = 0.5
+DEFAULT_SURFACE_WATER_KM = 5.0
+
+
+def schema_code_map(name: str, categories: List[str], default: str) -> np.ndarray:
+    """
+    Lookup from scenario_codec codes of `name` to codes into `categories`.
+    Indexed by the codec code, so its last two entries are hit by INVALID
+    (-2, → -1 unknown) and MISSING (-1, → default).
+    """
+    lookup = {c: i for i, c in enumerate(categories)}
+    allowed = COLUMN_BY_NAME[name].categories
+    return np.array([lookup.get(v, -1) for v in allowed] + [-1, lookup[default]], dtype=np.int8)
+
+
+COOLING_BY_SCHEMA_CODE = schema_code_map("data_center.cooling_type", COOLING_TYPES, "closed_loop")
+STRESS_BY_SCHEMA_CODE = schema_code_map("environmental_factors.water_stress_category", STRESS_CATEGORIES, "low")
+
+
+@dataclass
+class ScenarioBatch:
+    upstream_ppt: np.ndarray  # (n_chem, n) background per scenario
+    discharge_ppt: np.ndarray  # (n_chem, n) NaN → discharge equals upstream
+    river_flow_cfs: np.ndarray  # (n,)
+    withdrawal_mgd: np.ndarray  # (n,)
+    cooling_code: np.ndarray  # (n,) int8 into COOLING_TYPES
+    stress_code: np.ndarray  # (n,) int8 into STRESS_CATEGORIES
+    gw_vulnerability: np.ndarray  # (n,)
+    surface_water_distance_km: np.ndarray  # (n,)
+    states: List[Any] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return self.river_flow_cfs.shape[0]
+
+    @classmethod
+    def from_payloads(
+        cls,
+        payloads: Sequence[Dict[str, Any]],
+        get_background: Callable[[str | None], Dict[str, float]],
+    ) -> "ScenarioBatch":
+        """
+        Build a batch from /simulate-style payload dicts, leniently (as
+        simulate() does: unknown categories fall back to the defaults).
+        """
+        return cls.from_columns(encode_scenarios(payloads, validate=False), get_background)
+
+    @classmethod
+    def from_columns(
+        cls,
+        columns: ScenarioColumns,
+        get_background: Callable[[str | None], Dict[str, float]],
+    ) -> "ScenarioBatch":
+        """
+        Build a batch from encoded scenario columns. Backgrounds are
+        resolved once per distinct state.
+        """
+        n = len(columns)
+        index: Dict[Any, int] = {}
+        rows = np.fromiter((index.setdefault(s, len(index)) for s in columns.states), dtype=np.intp, count=n)
+        backgrounds = [get_background(state) for state in index]
+        table = np.array(
+            [[chem_map[c] for c in PFAS_CHEMICALS] for chem_map in backgrounds], dtype=np.float64
+        ).reshape(len(index), len(PFAS_CHEMICALS))
+
+        return cls(
+            upstream_ppt=table.T[:, rows],
+            discharge_ppt=columns.stack("chemicals", "concentrations_ppt"),
+            river_flow_cfs=_filled(columns["environmental_factors.receiving_water_flow_cfs"], DEFAULT_RIVER_FLOW_CFS),
+            withdrawal_mgd=_filled(columns["data_center.max_daily_water_withdrawal_mgd"], 0.0),
+            cooling_code=COOLING_BY_SCHEMA_CODE[columns["data_center.cooling_type"]],
+            stress_code=STRESS_BY_SCHEMA_CODE[columns["environmental_factors.water_stress_category"]],
+            gw_vulnerability=_filled(
+                columns["environmental_factors.groundwater_vulnerability_index"], DEFAULT_GW_VULNERABILITY
+            ),
+            surface_water_distance_km=_filled(
+                columns["environmental_factors.surface_water_distance_km"], DEFAULT_SURFACE_WATER_KM
+            ),
+            states=list(columns.states),
+        )
+
+
+def _filled(values: np.ndarray, default: float) -> np.ndarray:
+    return np.where(np.isnan(values), default, values)
+
+
+@dataclass
+class BatchResult:
+    states: List[Any]
+    upstream_ppt: np.ndarray  # (n_chem, n)
+    downstream_ppt: np.ndarray  # (n_chem, n)
+    hazard_index: np.ndarray  # (n,)
+    hazard_index_exceeds_1: np.ndarray  # (n,) bool
+    mcl_violation: np.ndarray  # (n,) bool
+    combined_mcl_violation: np.ndarray  # (n,) bool
+    risk_score: np.ndarray  # (n,)
+    category_code: np.ndarray  # (n,) int8 into RISK_CATEGORIES
+    pathway_code: np.ndarray  # (n,) int8 into PATHWAYS
+
+    def __len__(self) -> int:
+        return self.risk_score.shape[0]
+
+    @property
+    def risk_category(self) -> np.ndarray:
+        return RISK_CATEGORIES[self.category_code]
+
+    @property
+    def dominant_pathway(self) -> np.ndarray:
+        return PATHWAYS[self.pathway_code]
+
+    def slice(self, start: int, stop: int) -> "BatchResult":
+        """Scenarios [start, stop) as a BatchResult of views."""
+        return BatchResult(
+            states=self.states[start:stop],
+            upstream_ppt=self.upstream_ppt[:, start:stop],
+            downstream_ppt=self.downstream_ppt[:, start:stop],
+            hazard_index=self.hazard_index[start:stop],
+            hazard_index_exceeds_1=self.hazard_index_exceeds_1[start:stop],
+            mcl_violation=self.mcl_violation[start:stop],
+            combined_mcl_violation=self.combined_mcl_violation[start:stop],
+            risk_score=self.risk_score[start:stop],
+            category_code=self.category_code[start:stop],
+            pathway_code=self.pathway_code[start:stop],
+        )
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Per-scenario dicts in exactly the shape simulate() returns."""
+        up = self.upstream_ppt.T.tolist()
+        down = self.downstream_ppt.T.tolist()
+        columns = zip(
+            self.states,
+            up,
+            down,
+            self.hazard_index.tolist(),
+            self.hazard_index_exceeds_1.tolist(),
+            self.mcl_violation.tolist(),
+            self.combined_mcl_violation.tolist(),
+            self.risk_score.tolist(),
+            self.risk_category.tolist(),
+            self.dominant_pathway.tolist(),
+        )
+        return [
+            {
+                "state": state,
+                "upstream_background_pfas_ppt": dict(zip(PFAS_CHEMICALS, u)),
+                "modeled_downstream_concentrations_ppt": dict(zip(PFAS_CHEMICALS, d)),
+                "hazard_index_value": hi,
+                "hazard_index_exceeds_1": hi_flag,
+                "mcl_violation_flag": mcl_flag,
+                "combined_mcl_violation": combined_flag,
+                "overall_risk_score_0_100": risk,
+                "risk_category": category,
+                "dominant_pathway": pathway,
+            }
+            for state, u, d, hi, hi_flag, mcl_flag, combined_flag, risk, category, pathway in columns
+        ]
+
+
+# ----------------------------------------------------------------------
+# Kernels (each mirrors the matching PFASRiskSimulator method)
+# ----------------------------------------------------------------------
+def mix_batch(batch: ScenarioBatch) -> np.ndarray:
+    """compute_mixed_concentrations over all scenarios at once."""
+    upstream = batch.upstream_ppt
+    river = batch.river_flow_cfs
+    discharge_cfs = batch.withdrawal_mgd * MGD_TO_CFS
+
+    enrichment = ENRICHMENT_BY_CODE[batch.cooling_code]
+    c_eff_base = np.where(np.isnan(batch.discharge_ppt), upstream, batch.discharge_ppt)
+    c_eff = c_eff_base * enrichment
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mixed = (upstream * river + c_eff * discharge_cfs) / (river + discharge_cfs)
+
+    # no discharge → downstream is the upstream background, untouched
+    return np.where(discharge_cfs > 0.0, mixed, upstream)
+
+
+def hazard_index_batch(downstream: np.ndarray, hazard_rfd: Dict[str, float]) -> np.ndarray:
+    hi = np.zeros(downstream.shape[1])
+    for chem, rfd in hazard_rfd.items():
+        i = CHEM_INDEX.get(chem)
+        if i is not None:
+            hi = hi + downstream[i] / (rfd + 1e-9)
+    return hi
+
+
+def run_batch(
+    batch: ScenarioBatch,
+    mcl: Dict[str, float],
+    hazard_rfd: Dict[str, float],
+    combined_mcl: float,
+) -> BatchResult:
+    downstream = mix_batch(batch)
+    n = downstream.shape[1]
+
+    def conc(chem: str) -> np.ndarray:
+        i = CHEM_INDEX.get(chem)
+        return downstream[i] if i is not None else np.zeros(n)
+
+    hi = hazard_index_batch(downstream, hazard_rfd)
+    hi_flag = hi > 1.0
+
+    mcl_flag = np.zeros(n, dtype=bool)
+    for chem, limit in mcl.items():
+        mcl_flag |= conc(chem) > limit
+    combined_flag = conc("PFOA") + conc("PFOS") > combined_mcl
+
+    # Risk scoring
+    risk = np.zeros(n)
+    for chem, mcl_val in mcl.items():
+        if mcl_val > 0:
+            ratio = np.minimum(conc(chem) / mcl_val, 3.0)  # cap at 3x
+            risk = risk + ratio * 12.0
+
+    risk = np.where(hi_flag, risk + 20.0, risk)
+    risk = np.where(combined_flag, risk + 15.0, risk)
+    risk = risk * STRESS_MULT_BY_CODE[batch.stress_code]
+    risk = np.maximum(0.0, np.minimum(risk, 100.0))
+
+    category = np.searchsorted(RISK_CATEGORY_EDGES, risk, side="right").astype(np.int8)
+
+    pathway = np.where(
+        batch.gw_vulnerability > 0.7,
+        0,
+        np.where(batch.surface_water_distance_km < 1.0, 1, 2),
+    ).astype(np.int8)
+
+    return BatchResult(
+        states=list(batch.states),
+        upstream_ppt=batch.upstream_ppt,
+        downstream_ppt=downstream,
+        hazard_index=hi,
+        hazard_index_exceeds_1=hi_flag,
+        mcl_violation=mcl_flag,
+        combined_mcl_violation=combined_flag,
+        risk_score=risk,
+        category_code=category,
+        pathway_code=pathway,
+    )
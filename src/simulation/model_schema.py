@@ -43,6 +43,7 @@ PFAS_RISK_MODEL_SCHEMA: Dict[str, Dict[str, Any]] = {
                 "type": "dict[str, float]",
                 "required": True,
                 "allowed_keys": PFAS_CHEMICALS,
+                "range": [0.0, None],
                 "units": "parts per trillion (ppt)",
                 "example": {
                     "PFOA": 3.5,
@@ -64,14 +65,24 @@ PFAS_RISK_MODEL_SCHEMA: Dict[str, Dict[str, Any]] = {
             },
             "surface_water_distance_km": {
                 "type": "float",
+                "range": [0.0, None],
                 "required": True,
                 "description": "Distance from site to nearest surface water body.",
             },
             "drinking_water_intake_distance_km": {
                 "type": "float",
+                "range": [0.0, None],
                 "required": False,
                 "description": "Distance to nearest downstream drinking-water intake.",
             },
+            "receiving_water_flow_cfs": {
+                "type": "float",
+                "range": [0.0, None],
+                "required": False,
+                "default": 100.0,
+                "units": "cubic feet per second",
+                "description": "Flow of the receiving river or stream the discharge mixes into.",
+            },
             "water_stress_category": {
                 "type": "str",
                 "required": True,
@@ -103,12 +114,14 @@ PFAS_RISK_MODEL_SCHEMA: Dict[str, Dict[str, Any]] = {
             },
             "max_daily_water_withdrawal_mgd": {
                 "type": "float",
+                "range": [0.0, None],
                 "required": True,
                 "units": "million gallons per day",
                 "description": "Peak daily water withdrawal for cooling.",
             },
             "average_daily_water_withdrawal_mgd": {
                 "type": "float",
+                "range": [0.0, None],
                 "required": False,
                 "units": "million gallons per day",
             },
@@ -149,6 +162,7 @@ PFAS_RISK_MODEL_SCHEMA: Dict[str, Dict[str, Any]] = {
             },
             "uncertainty_factor": {
                 "type": "float",
+                "range": [0.0, None],
                 "required": False,
                 "description": "Generic uncertainty margin applied to concentration or risk.",
             },
@@ -160,18 +174,21 @@ PFAS_RISK_MODEL_SCHEMA: Dict[str, Dict[str, Any]] = {
         "fields": {
             "time_horizon_years": {
                 "type": "int",
+                "range": [0, 200],
                 "required": True,
                 "default": 10,
                 "description": "Number of years to simulate PFAS behavior around the site.",
             },
             "pfas_decay_rate_per_year": {
                 "type": "float",
+                "range": [0.0, None],
                 "required": False,
                 "default": 0.0,
                 "description": "Modeled annual decay/removal rate of PFAS (often near zero).",
             },
             "climate_change_factor": {
                 "type": "float",
+                "range": [0.0, None],
                 "required": False,
                 "default": 1.0,
                 "description": "Multiplier for extreme events / runoff potential.",
@@ -0,0 +1,182 @@
+# src/simulation/monte_carlo.py
+
+"""
+Monte Carlo uncertainty mode for PFASRiskSimulator.
+
+Background concentrations, discharge concentrations and river flow are
+perturbed by multiplicative factors drawn from configurable distributions,
+and every draw is pushed through the vectorized batch kernel
+(src.simulation.batch.run_batch), so a draw is exactly one scenario of the
+deterministic model.
+
+Spread defaults to regulatory.uncertainty_factor from the payload, then to
+uncertainty.confidence_interval in regulatory_limits.yaml (0.10).
+
+Draws are processed in fixed-size chunks to bound temporaries. Each
+uncertain input has its own RNG stream spawned from one SeedSequence, so
+results are reproducible for a given seed, do not depend on the chunk size,
+and changing one input's distribution leaves the other inputs' draws alone.
+"""
+
+from dataclasses import replace
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+from src.simulation.batch import ScenarioBatch, run_batch
+from src.simulation.model_schema import PFAS_CHEMICALS
+
+DEFAULT_N_DRAWS = 100_000
+DEFAULT_CHUNK_SIZE = 16_384
+DEFAULT_PERCENTILES = (5.0, 50.0, 95.0)
+DEFAULT_UNCERTAINTY = 0.10
+MAX_N_DRAWS = 1_000_000
+
+UNCERTAIN_INPUTS = ("background", "discharge", "river_flow")
+DISTRIBUTIONS = ("lognormal", "normal", "uniform", "fixed")
+
+_DEFAULT_SPREAD: float | None = None
+
+
+def default_spread() -> float:
+    """uncertainty.confidence_interval from regulatory_limits.yaml (cached)."""
+    global _DEFAULT_SPREAD
+    if _DEFAULT_SPREAD is None:
+        try:
+            from src.config.regulatory_limits import RegulatoryLimits
+
+            ci = RegulatoryLimits().get_uncertainty().get("confidence_interval")
+            _DEFAULT_SPREAD = float(ci) if ci is not None else DEFAULT_UNCERTAINTY
+        except (FileNotFoundError, ImportError):
+            _DEFAULT_SPREAD = DEFAULT_UNCERTAINTY
+    return _DEFAULT_SPREAD
+
+
+def resolve_distributions(
+    payload: Dict[str, Any],
+    distributions: Dict[str, Dict[str, Any]] | None = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Per-input {"distribution": ..., "spread": ...}. `spread` is the relative
+    1-sigma (lognormal / normal) or half-width (uniform) of the factor.
+    """
+    factor = (payload.get("regulatory") or {}).get("uncertainty_factor")
+    spread = float(factor) if factor is not None else default_spread()
+
+    resolved = {}
+    for name in UNCERTAIN_INPUTS:
+        spec = {"distribution": "lognormal", "spread": spread}
+        spec.update((distributions or {}).get(name) or {})
+        if spec["distribution"] not in DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown distribution for '{name}': {spec['distribution']!r} "
+                f"(expected one of {', '.join(DISTRIBUTIONS)})"
+            )
+        spec["spread"] = float(spec["spread"])
+        if spec["spread"] < 0:
+            raise ValueError(f"Negative spread for '{name}': {spec['spread']}")
+        resolved[name] = spec
+    return resolved
+
+
+def sample_factors(rng: np.random.Generator, spec: Dict[str, Any], shape) -> np.ndarray:
+    """Non-negative multiplicative factors with mean ~1."""
+    dist, spread = spec["distribution"], spec["spread"]
+    if dist == "fixed" or spread == 0.0:
+        return np.ones(shape)
+    if dist == "lognormal":
+        # mean 1, coefficient of variation = spread
+        sigma = np.sqrt(np.log1p(spread * spread))
+        return np.exp(sigma * rng.standard_normal(shape) - 0.5 * sigma * sigma)
+    if dist == "normal":
+        return np.maximum(1.0 + spread * rng.standard_normal(shape), 0.0)
+    return np.maximum(1.0 + spread * rng.uniform(-1.0, 1.0, shape), 0.0)
+
+
+def _bands(values: np.ndarray, percentiles: Sequence[float]) -> Dict[str, float]:
+    points = np.percentile(values, percentiles, axis=-1)
+    return {_label(p): float(v) for p, v in zip(percentiles, points)}
+
+
+def _label(p: float) -> str:
+    return f"p{p:g}".replace(".", "_")
+
+
+def run_monte_carlo(
+    simulator,
+    payload: Dict[str, Any],
+    n_draws: int = DEFAULT_N_DRAWS,
+    seed: int = 0,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    distributions: Dict[str, Dict[str, Any]] | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    return_draws: bool = False,
+) -> Dict[str, Any]:
+    """
+    Percentile bands and exceedance probabilities. With return_draws=True
+    the per-draw arrays are included under "draws" (NumPy, not lists).
+    """
+    n_draws = int(n_draws)
+    if not 1 <= n_draws <= MAX_N_DRAWS:
+        raise ValueError(f"n_draws must be between 1 and {MAX_N_DRAWS}")
+    percentiles = [float(p) for p in percentiles]
+    specs = resolve_distributions(payload, distributions)
+
+    base = ScenarioBatch.from_payloads([payload], simulator.get_background)
+    streams = dict(
+        zip(UNCERTAIN_INPUTS, map(np.random.default_rng, np.random.SeedSequence(seed).spawn(3)))
+    )
+    n_chem = len(PFAS_CHEMICALS)
+
+    downstream = np.empty((n_chem, n_draws))
+    hi = np.empty(n_draws)
+    risk = np.empty(n_draws)
+    hi_hits = mcl_hits = combined_hits = 0
+
+    for start in range(0, n_draws, chunk_size):
+        n = min(chunk_size, n_draws - start)
+        # draw-major, so the stream is consumed identically for any chunk size
+        bg = sample_factors(streams["background"], specs["background"], (n, n_chem)).T
+        eff = sample_factors(streams["discharge"], specs["discharge"], (n, n_chem)).T
+        flow = sample_factors(streams["river_flow"], specs["river_flow"], n)
+
+        chunk = replace(
+            base,
+            upstream_ppt=base.upstream_ppt * bg,
+            discharge_ppt=base.discharge_ppt * eff,
+            river_flow_cfs=base.river_flow_cfs * flow,
+            withdrawal_mgd=np.repeat(base.withdrawal_mgd, n),
+            cooling_code=np.repeat(base.cooling_code, n),
+            stress_code=np.repeat(base.stress_code, n),
+            gw_vulnerability=np.repeat(base.gw_vulnerability, n),
+            surface_water_distance_km=np.repeat(base.surface_water_distance_km, n),
+            states=[],
+        )
+        result = run_batch(chunk, simulator.MCL, simulator.HAZARD_RFD, simulator.COMBINED_MCL)
+
+        downstream[:, start:start + n] = result.downstream_ppt
+        hi[start:start + n] = result.hazard_index
+        risk[start:start + n] = result.risk_score
+        hi_hits += int(result.hazard_index_exceeds_1.sum())
+        mcl_hits += int(result.mcl_violation.sum())
+        combined_hits += int(result.combined_mcl_violation.sum())
+
+    chem_points = np.percentile(downstream, percentiles, axis=1)  # (n_pct, n_chem)
+    result = {
+        "n_draws": n_draws,
+        "seed": seed,
+        "percentiles": percentiles,
+        "distributions": specs,
+        "modeled_downstream_concentrations_ppt": {
+            chem: {_label(p): float(v) for p, v in zip(percentiles, chem_points[:, i])}
+            for i, chem in enumerate(PFAS_CHEMICALS)
+        },
+        "hazard_index_value": _bands(hi, percentiles),
+        "overall_risk_score_0_100": _bands(risk, percentiles),
+        "probability_hazard_index_exceeds_1": hi_hits / n_draws,
+        "probability_mcl_violation": mcl_hits / n_draws,
+        "probability_combined_mcl_violation": combined_hits / n_draws,
+    }
+    if return_draws:
+        result["draws"] = {"downstream_ppt": downstream, "hazard_index": hi, "risk_score": risk}
+    return result
@@ -1,16 +1,33 @@
 import pandas as pd
 from pathlib import Path
 
+from src.etl.parquet_dataset import UCMR5_DATASET_DIR, read_ucmr5_dataset
+from src.etl.ucmr5_reader import CANONICAL_NAMES
+
 UCMR5_PATH = Path("data/processed/ucmr5_state_medians.csv")
 
 def load_ucmr5_background():
-    if not UCMR5_PATH.exists():
-        raise FileNotFoundError(f"UCMR5 file not found at: {UCMR5_PATH}")
+    """
+    Median of all measured PFAS chemicals per state (ppt), keyed by FIPS.
+
+    Reads only the state/value columns of PFAS detections from the Parquet
+    dataset when it exists; otherwise summarizes the processed medians CSV.
+    """
+    if UCMR5_DATASET_DIR.exists():
+        df = read_ucmr5_dataset(
+            contaminants=sorted(set(CANONICAL_NAMES.values())),
+            columns=["state", "value_ppt"],
+            detects_only=True,
+        )
+        bg = df.groupby("state")["value_ppt"].median().to_dict()
+    else:
+        if not UCMR5_PATH.exists():
+            raise FileNotFoundError(f"UCMR5 file not found at: {UCMR5_PATH}")
 
-    df = pd.read_csv(UCMR5_PATH)
+        df = pd.read_csv(UCMR5_PATH, dtype={"State": str})
 
-    # compute median of all measured PFAS chemicals per state
-    bg = df.groupby("STATE")["MEDIAN_PPT"].median().to_dict()
+        # compute median of all measured PFAS chemicals per state
+        bg = df.groupby("State")["ppt"].median().to_dict()
 
     # Convert any NaN to 0.0
     bg = {str(k).zfill(2): float(v) if pd.notna(v) else 0.0 for k, v in bg.items()}
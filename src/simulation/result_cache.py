@@ -0,0 +1,112 @@
+# src/simulation/result_cache.py
+
+"""
+Memoization of PFASRiskSimulator.simulate() results.
+
+Key: SHA-256 over
+
+- the canonical form of the payload fields simulate() reads (state,
+  chemicals, environmental_factors, data_center): keys sorted, every
+  number normalized to a float repr (4 == 4.0, -0.0 == 0.0)
+- the background data version (mtime, inode, size of the medians file)
+- the regulatory limits in effect (MCL, Hazard Index RfDs, combined MCL)
+
+so a reload of either changes every key. Entries are evicted LRU once their
+estimated size (length of the JSON encoding) exceeds `max_bytes`. The
+cache is also cleared when the background repository swaps in new data,
+so stale results do not hold memory.
+
+Results are returned as fresh dicts, since callers attach lat/lon and
+other fields to what simulate() returns.
+"""
+
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# payload fields that affect simulate(); lat/lon, scenario_parameters etc. do not
+SIMULATION_INPUT_KEYS = ("state", "chemicals", "environmental_factors", "data_center")
+
+
+def canonicalize(value: Any) -> Any:
+    """JSON-ready canonical form: sorted keys, normalized numbers."""
+    if isinstance(value, dict):
+        return {str(k): canonicalize(value[k]) for k in sorted(value, key=str)}
+    if isinstance(value, (list, tuple)):
+        return [canonicalize(v) for v in value]
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        f = float(value)
+        if math.isnan(f):
+            return "nan"
+        return repr(f + 0.0)  # -0.0 + 0.0 == 0.0
+    return str(value)
+
+
+def payload_key(payload: Dict[str, Any], data_version: Any, limits: Any) -> str:
+    body = {
+        "payload": canonicalize({k: payload.get(k) for k in SIMULATION_INPUT_KEYS}),
+        "data_version": canonicalize(list(data_version)),
+        "limits": canonicalize(limits),
+    }
+    encoded = json.dumps(body, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _fresh(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy deep enough that callers cannot mutate the cached entry."""
+    return {k: dict(v) if isinstance(v, dict) else v for k, v in result.items()}
+
+
+class ResultCache:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key: str) -> Dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return _fresh(entry[0])
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        size = len(json.dumps(result, default=str))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._entries[key] = (_fresh(result), size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.counters["evictions"] += 1
+
+    def clear(self, *_: Any) -> None:
+        """Drop every entry (also usable as a repository reload listener)."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            self.counters["invalidations"] += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counters, "entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes}
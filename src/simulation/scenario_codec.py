@@ -0,0 +1,313 @@
+# src/simulation/scenario_codec.py
+
+"""
+Column-oriented encoding of scenario payloads, driven by the model schema.
+
+encode_scenarios() walks a list of /simulate-style payloads once and
+returns ScenarioColumns: a NumPy structured array with one column per
+input field of list_all_fields() (output_fields and free-text strings are
+skipped), named "section.field":
+
+- float fields are float64; NaN marks a missing value
+- int fields are float64 too (so they can be missing) and checked for
+  integrality
+- dict fields with allowed_keys get one float64 column per key,
+  "section.field.KEY" (concentrations_ppt → one column per chemical)
+- categorical fields (allowed_values) and bools are int8 codes: the index
+  into allowed_values (bools 0/1), MISSING for an absent value and INVALID
+  for one the schema does not allow
+
+Schema defaults are filled in while encoding. column_errors() then checks
+every column in one vectorized pass (required, range, finite, integer,
+category) and reports offending rows with pydantic-style locations, so a
+bulk input can be rejected without validating N payload dicts.
+
+ScenarioBatch.from_columns() builds the simulation batch from these
+columns; every bulk simulation path goes through it.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from src.simulation.model_schema import list_all_fields
+
+MISSING = -1  # code of an absent categorical / bool value
+INVALID = -2  # code of a value outside allowed_values
+
+SKIPPED_SECTIONS = ("output_fields",)
+
+Error = Dict[str, Any]
+
+# one shared NaN object, so list.count() finds untouched slots by identity
+_NAN = float("nan")
+
+
+@dataclass
+class Column:
+    name: str
+    section: str
+    field: str
+    kind: str  # float | int | bool | category
+    meta: Dict[str, Any]
+    key: str | None = None  # dict fields: one column per allowed key
+    categories: List[Any] = field(default_factory=list)
+
+    @property
+    def dtype(self) -> str:
+        return "i1" if self.kind in ("bool", "category") else "f8"
+
+    @property
+    def fill(self) -> Any:
+        """Placeholder for absent values while collecting raw values."""
+        return None if self.kind in ("bool", "category") else _NAN
+
+    @property
+    def loc(self) -> Tuple[str, ...]:
+        return (self.section, self.field) if self.key is None else (self.section, self.field, self.key)
+
+    @property
+    def required(self) -> bool:
+        # a dict field's requiredness is about the dict, not each key
+        return self.key is None and bool(self.meta.get("required")) and "default" not in self.meta
+
+    def encode(self, raw: List[Any], errors: List[Error]) -> np.ndarray:
+        if self.kind in ("bool", "category"):
+            return self._encode_codes(raw)
+        if raw.count(_NAN) == len(raw):
+            values = np.full(len(raw), np.nan)  # nobody supplied it: skip the conversion
+        else:
+            try:
+                values = np.array(raw, dtype=np.float64)
+            except (TypeError, ValueError):
+                values = np.array([self._float(j, v, errors) for j, v in enumerate(raw)], dtype=np.float64)
+        if "default" in self.meta:
+            values[np.isnan(values)] = float(self.meta["default"])
+        return values
+
+    def _float(self, row: int, value: Any, errors: List[Error]) -> float:
+        try:
+            return float(value) if value is not None else np.nan
+        except (TypeError, ValueError):
+            errors.append(_error(row, self.loc, "float_parsing", "Input should be a valid number"))
+            return np.nan
+
+    def _encode_codes(self, raw: List[Any]) -> np.ndarray:
+        if self.kind == "bool":
+            lookup = {True: 1, False: 0}
+            default = self.meta.get("default")
+            default_code = MISSING if default is None else int(bool(default))
+        else:
+            lookup = {value: i for i, value in enumerate(self.categories)}
+            default = self.meta.get("default")
+            default_code = lookup.get(default, MISSING)
+        if raw.count(None) == len(raw):
+            return np.full(len(raw), default_code, dtype=np.int8)
+        accepted = bool if self.kind == "bool" else str
+        return np.array(
+            [
+                default_code if v is None else lookup.get(v, INVALID) if type(v) is accepted else INVALID
+                for v in raw
+            ],
+            dtype=np.int8,
+        )
+
+
+def _error(row: int, loc: Tuple[str, ...], kind: str, msg: str) -> Error:
+    return {"loc": (row, *loc), "type": kind, "msg": msg}
+
+
+def _kind(meta: Dict[str, Any]) -> str | None:
+    if "allowed_values" in meta:
+        return "category"
+    return {"float": "float", "int": "int", "bool": "bool"}.get(meta.get("type"))
+
+
+def schema_columns() -> List[Column]:
+    columns: List[Column] = []
+    for name, meta in list_all_fields().items():
+        section, field_name = name.split(".", 1)
+        if section in SKIPPED_SECTIONS:
+            continue
+        if meta.get("type", "").startswith("dict") and "allowed_keys" in meta:
+            for key in meta["allowed_keys"]:
+                columns.append(Column(f"{name}.{key}", section, field_name, "float", meta, key=key))
+            continue
+        kind = _kind(meta)
+        if kind is not None:
+            columns.append(
+                Column(name, section, field_name, kind, meta, categories=list(meta.get("allowed_values", [])))
+            )
+    return columns
+
+
+COLUMNS: List[Column] = schema_columns()
+COLUMN_BY_NAME: Dict[str, Column] = {c.name: c for c in COLUMNS}
+SCENARIO_DTYPE = np.dtype([(c.name, c.dtype) for c in COLUMNS])
+
+
+def _layout(columns: List[Column]) -> Dict[str, Dict[str, Any]]:
+    """section → field → Column (scalar fields) or {key: Column} (dict fields)."""
+    layout: Dict[str, Dict[str, Any]] = {}
+    for column in columns:
+        fields = layout.setdefault(column.section, {})
+        if column.key is None:
+            fields[column.field] = column
+        else:
+            fields.setdefault(column.field, {})[column.key] = column
+    return layout
+
+
+_LAYOUT = _layout(COLUMNS)
+_REQUIRED_DICTS = sorted(
+    {(c.section, c.field) for c in COLUMNS if c.key is not None and c.meta.get("required")}
+)
+
+
+class ScenarioValidationError(ValueError):
+    """Raised with every offending (row, field) found in a batch."""
+
+    def __init__(self, errors: List[Error]) -> None:
+        self.errors = errors
+        first = errors[0]
+        more = f" (and {len(errors) - 1} more)" if len(errors) > 1 else ""
+        super().__init__(f"{'.'.join(map(str, first['loc']))}: {first['msg']}{more}")
+
+
+@dataclass
+class ScenarioColumns:
+    data: np.ndarray  # (n,) structured, SCENARIO_DTYPE
+    states: List[Any]
+    errors: List[Error] = field(default_factory=list)  # found while encoding
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.data[name]
+
+    def stack(self, section: str, field_name: str) -> np.ndarray:
+        """A dict field as a (n_keys, n) float array, rows in allowed_keys order."""
+        keys = _LAYOUT[section][field_name]
+        return np.array([self.data[column.name] for column in keys.values()], dtype=np.float64).reshape(
+            len(keys), len(self)
+        )
+
+    def labels(self, name: str) -> np.ndarray:
+        """Categorical codes decoded back to values (None for missing/invalid)."""
+        column = COLUMN_BY_NAME[name]
+        table = np.array(column.categories + [None, None], dtype=object)
+        return table[self.data[name]]
+
+
+def encode_scenarios(payloads: Sequence[Dict[str, Any]], validate: bool = True) -> ScenarioColumns:
+    """
+    Encode payloads into ScenarioColumns. With validate=True, raises
+    ScenarioValidationError listing every invalid value in the batch.
+    """
+    n = len(payloads)
+    raw: Dict[str, List[Any]] = {c.name: [c.fill] * n for c in COLUMNS}
+    states: List[Any] = [None] * n
+    errors: List[Error] = []
+    # rows that supplied each dict field (their requiredness is checked here)
+    supplied = {loc: np.zeros(n, dtype=bool) for loc in _REQUIRED_DICTS}
+
+    # section → (field → raw list, dict field → ({key → raw list}, supplied mask))
+    sections = {
+        section: (
+            {name: raw[c.name] for name, c in fields.items() if isinstance(c, Column)},
+            {
+                name: ({k: raw[c.name] for k, c in keyed.items()}, supplied.get((section, name)))
+                for name, keyed in fields.items()
+                if isinstance(keyed, dict)
+            },
+        )
+        for section, fields in _LAYOUT.items()
+    }
+
+    for j, payload in enumerate(payloads):
+        for section, values in payload.items():
+            spec = sections.get(section)
+            if spec is None:
+                if section == "state":
+                    states[j] = values
+                continue  # extra keys pass through, as in the API models
+            if not values:
+                continue
+            scalars, dicts = spec
+            try:
+                items = values.items()
+            except AttributeError:
+                errors.append(_error(j, (section,), "dict_type", "Input should be a valid dictionary"))
+                continue
+            for name, value in items:
+                target = scalars.get(name)
+                if target is not None:
+                    target[j] = value
+                elif name in dicts and value is not None:
+                    keyed, mask = dicts[name]
+                    try:
+                        pairs = value.items()
+                    except AttributeError:
+                        errors.append(_error(j, (section, name), "dict_type", "Input should be a valid dictionary"))
+                        continue
+                    if mask is not None:
+                        mask[j] = True
+                    for key, item in pairs:
+                        target = keyed.get(key)
+                        if target is None:
+                            errors.append(_error(j, (section, name, key), "literal_error", "Unknown key for this field"))
+                        else:
+                            target[j] = item
+
+    for loc, mask in supplied.items():
+        errors.extend(_error(int(j), loc, "missing", "Field required") for j in np.flatnonzero(~mask))
+
+    data = np.empty(n, dtype=SCENARIO_DTYPE)
+    for column in COLUMNS:
+        data[column.name] = column.encode(raw[column.name], errors)
+
+    columns = ScenarioColumns(data=data, states=states, errors=errors)
+    if validate:
+        validate_columns(columns)
+    return columns
+
+
+def column_errors(columns: ScenarioColumns) -> List[Error]:
+    """Every schema violation in the batch, one vectorized check per column."""
+    errors = list(columns.errors)
+
+    def report(mask: np.ndarray, column: Column, kind: str, msg: str) -> None:
+        errors.extend(_error(int(j), column.loc, kind, msg) for j in np.flatnonzero(mask))
+
+    for column in COLUMNS:
+        values = columns.data[column.name]
+        if column.kind in ("bool", "category"):
+            report(values == INVALID, column, "literal_error", f"Input should be one of {column.categories or [True, False]}")
+            if column.required:
+                report(values == MISSING, column, "missing", "Field required")
+            continue
+
+        missing = np.isnan(values)
+        if column.required:
+            report(missing, column, "missing", "Field required")
+        report(np.isinf(values), column, "finite_number", "Input should be a finite number")
+        lo, hi = column.meta.get("range", (None, None))
+        if lo is not None:
+            report(values < lo, column, "greater_than_equal", f"Input should be greater than or equal to {lo}")
+        if hi is not None:
+            report(values > hi, column, "less_than_equal", f"Input should be less than or equal to {hi}")
+        if column.kind == "int":
+            with np.errstate(invalid="ignore"):
+                fractional = np.isfinite(values) & (values != np.floor(values))
+            report(fractional, column, "int_from_float", "Input should be a valid integer")
+
+    errors.sort(key=lambda e: e["loc"][0])
+    return errors
+
+
+def validate_columns(columns: ScenarioColumns) -> None:
+    errors = column_errors(columns)
+    if errors:
+        raise ScenarioValidationError(errors)
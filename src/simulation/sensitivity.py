@@ -0,0 +1,348 @@
+# src/simulation/sensitivity.py
+
+"""
+Sensitivity analysis for PFASRiskSimulator: which input drives the risk?
+
+Factors perturb one scenario:
+
+- background     multiplier on the upstream background (all chemicals)
+- discharge      multiplier on the discharge concentrations the payload gives
+- river_flow     multiplier on receiving_water_flow_cfs
+- withdrawal     multiplier on max_daily_water_withdrawal_mgd
+- cooling_type   categorical, one of `values` (default: every cooling type)
+
+Continuous factors range uniformly over [low, high] (default 0.5-1.5x the
+payload's value).
+
+method="oat" moves one factor at a time to its extremes with the others at
+the payload's values and reports a tornado: output at low and high, and
+the swing, sorted by swing.
+
+method="sobol" estimates variance-based first-order and total Sobol
+indices with Saltelli's scheme: two quasi-random matrices A and B from one
+2d-dimensional Sobol sequence, plus d matrices AB_i (A with column i from
+B), so N base points cost N·(d+2) evaluations. First order uses the
+Saltelli (2010) estimator, total order Jansen's.
+
+Every design row is one scenario of the vectorized batch kernel
+(src.simulation.batch.run_batch), evaluated in chunks. The rows are
+independent, so chunks can be fanned out over an Executor (a process pool
+for large designs); evaluate_rows() is module-level and takes only
+picklable arguments for that reason.
+"""
+
+from concurrent.futures import Executor
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from src.simulation.batch import COOLING_TYPES, ScenarioBatch, run_batch
+
+METHODS = ("oat", "sobol")
+FACTORS = ("background", "discharge", "river_flow", "withdrawal", "cooling_type")
+OUTPUTS = ("overall_risk_score_0_100", "hazard_index_value")
+
+DEFAULT_RANGE = (0.5, 1.5)
+DEFAULT_N_BASE = 1024
+MAX_N_BASE = 65_536
+DEFAULT_CHUNK_SIZE = 16_384
+
+Limits = Tuple[Dict[str, float], Dict[str, float], float]  # (MCL, HAZARD_RFD, COMBINED_MCL)
+
+
+# ----------------------------------------------------------------------
+# Sobol sequence (Joe & Kuo direction numbers, new-joe-kuo-6.21201)
+# ----------------------------------------------------------------------
+# (s, a, m_1..m_s) for dimensions 2..16; dimension 1 is van der Corput
+_JOE_KUO = [
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+    (5, 14, (1, 3, 5, 5, 31)),
+    (6, 1, (1, 3, 3, 9, 7, 49)),
+    (6, 13, (1, 1, 1, 15, 21, 21)),
+    (6, 16, (1, 3, 1, 13, 27, 49)),
+]
+MAX_SOBOL_DIMENSIONS = len(_JOE_KUO) + 1
+SOBOL_BITS = 30
+
+
+def direction_numbers(d: int) -> np.ndarray:
+    """(d, SOBOL_BITS) direction numbers V[j, k], scaled to SOBOL_BITS bits."""
+    if not 1 <= d <= MAX_SOBOL_DIMENSIONS:
+        raise ValueError(f"Sobol sequence supports 1 to {MAX_SOBOL_DIMENSIONS} dimensions, got {d}")
+    v = np.zeros((d, SOBOL_BITS), dtype=np.uint64)
+    v[0] = [1 << (SOBOL_BITS - 1 - k) for k in range(SOBOL_BITS)]
+    for j in range(1, d):
+        s, a, m = _JOE_KUO[j - 1]
+        row = [m[k] << (SOBOL_BITS - 1 - k) for k in range(s)]
+        for k in range(s, SOBOL_BITS):
+            x = row[k - s] ^ (row[k - s] >> s)
+            for i in range(1, s):
+                if (a >> (s - 1 - i)) & 1:
+                    x ^= row[k - i]
+            row.append(x)
+        v[j] = row
+    return v
+
+
+def sobol_points(n: int, d: int, skip: int = 1) -> np.ndarray:
+    """
+    Points skip..skip+n-1 of the d-dimensional Sobol sequence, (n, d) in
+    [0, 1). Gray-code order, so any power-of-two run is balanced; the
+    all-zero first point is skipped by default.
+    """
+    v = direction_numbers(d)
+    index = np.arange(skip, skip + n, dtype=np.uint64)
+    gray = index ^ (index >> np.uint64(1))
+    x = np.zeros((n, d), dtype=np.uint64)
+    for k in range(SOBOL_BITS):
+        bit = ((gray >> np.uint64(k)) & np.uint64(1)).astype(bool)
+        x[bit] ^= v[:, k]
+    return x / float(1 << SOBOL_BITS)
+
+
+# ----------------------------------------------------------------------
+# Factors
+# ----------------------------------------------------------------------
+def resolve_factors(factors: Dict[str, Dict[str, Any]] | Sequence[str] | None = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Per-factor spec, in FACTORS order: {"low", "high"} multipliers for
+    continuous factors, {"values"} for cooling_type. `factors` selects and
+    overrides; None means every factor with its defaults.
+    """
+    if factors is None:
+        factors = {name: {} for name in FACTORS}
+    elif not isinstance(factors, dict):
+        factors = {name: {} for name in factors}
+    unknown = set(factors) - set(FACTORS)
+    if unknown:
+        raise ValueError(f"Unknown sensitivity factor(s) {sorted(unknown)} (expected some of {', '.join(FACTORS)})")
+    if not factors:
+        raise ValueError("At least one sensitivity factor is required")
+
+    resolved = {}
+    for name in FACTORS:
+        if name not in factors:
+            continue
+        overrides = factors[name] or {}
+        if name == "cooling_type":
+            values = list(overrides.get("values", COOLING_TYPES))
+            bad = [v for v in values if v not in COOLING_TYPES]
+            if bad or not values:
+                raise ValueError(f"cooling_type values must be a non-empty subset of {COOLING_TYPES}, got {values}")
+            resolved[name] = {"values": values}
+            continue
+        low = float(overrides.get("low", DEFAULT_RANGE[0]))
+        high = float(overrides.get("high", DEFAULT_RANGE[1]))
+        if not 0.0 <= low <= high:
+            raise ValueError(f"'{name}' needs 0 <= low <= high, got low={low}, high={high}")
+        resolved[name] = {"low": low, "high": high}
+    return resolved
+
+
+def to_values(unit: np.ndarray, specs: Dict[str, Dict[str, Any]]) -> np.ndarray:
+    """Unit-cube points (n, d) → factor values: multipliers, or cooling codes."""
+    values = np.empty_like(unit)
+    for j, (name, spec) in enumerate(specs.items()):
+        if name == "cooling_type":
+            codes = np.array([COOLING_TYPES.index(v) for v in spec["values"]], dtype=np.float64)
+            values[:, j] = codes[np.minimum((unit[:, j] * len(codes)).astype(np.intp), len(codes) - 1)]
+        else:
+            values[:, j] = spec["low"] + unit[:, j] * (spec["high"] - spec["low"])
+    return values
+
+
+def evaluate_rows(base: ScenarioBatch, names: Sequence[str], values: np.ndarray, limits: Limits) -> np.ndarray:
+    """
+    Outputs (len(OUTPUTS), n) for n design rows applied to the one-scenario
+    `base`. values[:, j] is the value of factor names[j]; NaN keeps the
+    payload's own value.
+    """
+    n = values.shape[0]
+    column = dict(zip(names, values.T))
+
+    def scale(name: str, array: np.ndarray) -> np.ndarray:
+        repeated = np.repeat(array, n, axis=-1)
+        factor = column.get(name)
+        return repeated if factor is None else repeated * np.where(np.isnan(factor), 1.0, factor)
+
+    cooling = np.repeat(base.cooling_code, n)
+    if "cooling_type" in column:
+        code = column["cooling_type"]
+        cooling = np.where(np.isnan(code), cooling, code).astype(np.int8)
+
+    batch = replace(
+        base,
+        upstream_ppt=scale("background", base.upstream_ppt),
+        discharge_ppt=scale("discharge", base.discharge_ppt),
+        river_flow_cfs=scale("river_flow", base.river_flow_cfs),
+        withdrawal_mgd=scale("withdrawal", base.withdrawal_mgd),
+        cooling_code=cooling,
+        stress_code=np.repeat(base.stress_code, n),
+        gw_vulnerability=np.repeat(base.gw_vulnerability, n),
+        surface_water_distance_km=np.repeat(base.surface_water_distance_km, n),
+        states=[],
+    )
+    result = run_batch(batch, *limits)
+    return np.stack([result.risk_score, result.hazard_index])
+
+
+# ----------------------------------------------------------------------
+# Plans
+# ----------------------------------------------------------------------
+@dataclass
+class SensitivityPlan:
+    method: str
+    base: ScenarioBatch  # the payload as a one-scenario batch
+    specs: Dict[str, Dict[str, Any]]
+    values: np.ndarray  # (n_rows, d) design, see evaluate_rows()
+    limits: Limits
+    n_base: int = 0  # Sobol N
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.specs)
+
+    def chunks(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[np.ndarray]:
+        return [self.values[i:i + chunk_size] for i in range(0, len(self.values), chunk_size)]
+
+
+def plan_sensitivity(
+    simulator,
+    payload: Dict[str, Any],
+    method: str = "sobol",
+    factors: Dict[str, Dict[str, Any]] | Sequence[str] | None = None,
+    n_base: int = DEFAULT_N_BASE,
+) -> SensitivityPlan:
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {', '.join(METHODS)}")
+    specs = resolve_factors(factors)
+    base = ScenarioBatch.from_payloads([payload], simulator.get_background)
+    limits = (simulator.MCL, simulator.HAZARD_RFD, simulator.COMBINED_MCL)
+    d = len(specs)
+
+    if method == "oat":
+        rows = [np.full(d, np.nan)]  # baseline
+        for j, (name, spec) in enumerate(specs.items()):
+            points = (
+                [COOLING_TYPES.index(v) for v in spec["values"]]
+                if name == "cooling_type"
+                else [spec["low"], spec["high"]]
+            )
+            for point in points:
+                row = np.full(d, np.nan)
+                row[j] = point
+                rows.append(row)
+        return SensitivityPlan("oat", base, specs, np.array(rows), limits)
+
+    n_base = int(n_base)
+    if not 2 <= n_base <= MAX_N_BASE or n_base & (n_base - 1):
+        raise ValueError(f"n_base must be a power of two between 2 and {MAX_N_BASE}")
+    points = sobol_points(n_base, 2 * d)
+    a, b = points[:, :d], points[:, d:]
+    ab = np.repeat(a[None], d, axis=0)  # (d, N, d)
+    for i in range(d):
+        ab[i, :, i] = b[:, i]
+    unit = np.concatenate([a, b, ab.reshape(d * n_base, d)])
+    return SensitivityPlan("sobol", base, specs, to_values(unit, specs), limits, n_base=n_base)
+
+
+def evaluate_plan(
+    plan: SensitivityPlan,
+    executor: Executor | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> np.ndarray:
+    """All design rows → (len(OUTPUTS), n_rows), fanned out over `executor` if given."""
+    chunks = plan.chunks(chunk_size)
+    args = (plan.base, plan.names)
+    if executor is None or len(chunks) == 1:
+        outputs = [evaluate_rows(*args, rows, plan.limits) for rows in chunks]
+    else:
+        futures = [executor.submit(evaluate_rows, *args, rows, plan.limits) for rows in chunks]
+        outputs = [future.result() for future in futures]
+    return np.concatenate(outputs, axis=1)
+
+
+# ----------------------------------------------------------------------
+# Summaries
+# ----------------------------------------------------------------------
+def sobol_indices(y: np.ndarray, n_base: int, d: int) -> Tuple[np.ndarray, np.ndarray, float]:
+    """(first order, total order, variance) from y laid out as [A, B, AB_1..AB_d]."""
+    f_a, f_b = y[:n_base], y[n_base:2 * n_base]
+    f_ab = y[2 * n_base:].reshape(d, n_base)
+    variance = float(np.var(np.concatenate([f_a, f_b])))
+    if variance == 0.0:
+        return np.zeros(d), np.zeros(d), 0.0
+    first = np.mean(f_b * (f_ab - f_a), axis=1) / variance
+    total = 0.5 * np.mean((f_a - f_ab) ** 2, axis=1) / variance
+    return first, total, variance
+
+
+def _label(name: str, value: float) -> Any:
+    return COOLING_TYPES[int(value)] if name == "cooling_type" else float(value)
+
+
+def summarize(plan: SensitivityPlan, y: np.ndarray) -> Dict[str, Any]:
+    result: Dict[str, Any] = {
+        "method": plan.method,
+        "factors": plan.specs,
+        "n_evaluations": int(y.shape[1]),
+    }
+    names = plan.names
+
+    if plan.method == "sobol":
+        result["n_base"] = plan.n_base
+        result["outputs"] = {}
+        for output, values in zip(OUTPUTS, y):
+            first, total, variance = sobol_indices(values, plan.n_base, len(names))
+            result["outputs"][output] = {
+                "mean": float(np.mean(values[:2 * plan.n_base])),
+                "variance": variance,
+                "first_order": dict(zip(names, first.tolist())),
+                "total_order": dict(zip(names, total.tolist())),
+            }
+        return result
+
+    # OAT: row 0 is the baseline, then each factor's points in order
+    result["baseline"] = dict(zip(OUTPUTS, y[:, 0].tolist()))
+    result["tornado"] = {}
+    for k, output in enumerate(OUTPUTS):
+        bars = []
+        for j, name in enumerate(names):
+            rows = np.flatnonzero(~np.isnan(plan.values[:, j]))
+            outs = y[k, rows]
+            if name == "cooling_type":
+                lo, hi = rows[np.argmin(outs)], rows[np.argmax(outs)]
+            else:
+                lo, hi = rows  # the low and high ends of the range
+            bars.append({
+                "factor": name,
+                "low": {"value": _label(name, plan.values[lo, j]), "output": float(y[k, lo])},
+                "high": {"value": _label(name, plan.values[hi, j]), "output": float(y[k, hi])},
+                "swing": float(outs.max() - outs.min()),
+            })
+        result["tornado"][output] = sorted(bars, key=lambda bar: bar["swing"], reverse=True)
+    return result
+
+
+def run_sensitivity(
+    simulator,
+    payload: Dict[str, Any],
+    method: str = "sobol",
+    factors: Dict[str, Dict[str, Any]] | Sequence[str] | None = None,
+    n_base: int = DEFAULT_N_BASE,
+    executor: Executor | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    plan = plan_sensitivity(simulator, payload, method, factors, n_base)
+    return summarize(plan, evaluate_plan(plan, executor, chunk_size))
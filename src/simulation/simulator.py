@@ -5,24 +5,47 @@ PFASRiskSimulator
 
 Intermediate PFAS risk simulation for PFAS DC RiskScope.
 
-- Uses UCMR5 state-level medians as background PFAS (ppt)
+- Uses UCMR5 state-level medians as background PFAS (ppt), served by the
+  process-wide background repository shared with the location service
 - Simple river mixing model for data-center discharge
 - EPA-style MCL checks and PFAS Hazard Index
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 
-from src.etl.ucmr5_ingest import load_ucmr5_background
+from src.etl.background_repository import BackgroundRepository, get_background_repository
 from src.simulation.model_schema import PFAS_CHEMICALS
+from src.simulation.result_cache import ResultCache, payload_key
 
 MGD_TO_CFS = 1.547  # million gallons/day → cubic feet/second
 
+# Effluent enrichment by cooling type (evaporation concentrates PFAS)
+COOLING_ENRICHMENT: Dict[str, float] = {
+    "evaporative": 1.5,
+    "hybrid": 1.3,
+    "closed_loop": 1.1,
+    "air_cooled": 1.0,
+}
+DEFAULT_ENRICHMENT = 1.1
+
+# Risk multiplier by regional water stress
+STRESS_MULTIPLIER: Dict[str, float] = {"low": 1.0, "moderate": 1.2, "high": 1.4}
+DEFAULT_STRESS_MULTIPLIER = 1.0
+
 
 class PFASRiskSimulator:
-    def __init__(self) -> None:
-        # Background PFAS medians per state (ppt)
-        # keys: FIPS "51", "42", and "US" fallback
-        self.background_by_state: Dict[str, Dict[str, float]] = load_ucmr5_background()
+    def __init__(
+        self,
+        background: BackgroundRepository | None = None,
+        cache: ResultCache | None = None,
+    ) -> None:
+        # Background PFAS medians per state (ppt), shared process-wide
+        # keys: FIPS "51", "42", and "00" national fallback
+        self.background = background or get_background_repository()
+
+        # Memoized simulate() results, dropped whenever background data reloads
+        self.cache = cache if cache is not None else ResultCache()
+        self.background.add_listener(self.cache.clear)
 
         # Very simplified MCLs (ppt)
         self.MCL = {
@@ -44,20 +67,19 @@ class PFASRiskSimulator:
     # ------------------------------------------------------------------
     # Background by state
     # ------------------------------------------------------------------
+    @property
+    def background_by_state(self):
+        """Current background table ({region: {chem: ppt}} mapping)."""
+        return self.background.snapshot().table
+
     def get_background(self, state: str | None) -> Dict[str, float]:
         """
         Returns per-chemical background PFAS medians (ppt) for a given state.
-        If state medians are all 0 or missing, falls back to 'US' (if present).
+        If state medians are all 0 or missing, falls back to the national
+        row (see BackgroundSnapshot.resolve).
         """
-        state_key = (state or "US").upper()
-
-        chem_map = self.background_by_state.get(state_key, {})
-        # if empty or all zeros, try national fallback
-        if not chem_map or all(v == 0.0 for v in chem_map.values()):
-            chem_map = self.background_by_state.get("US", chem_map)
-
-        # Fill every PFAS chemical, default 0 if still missing
-        return {chem: float(chem_map.get(chem, 0.0)) for chem in PFAS_CHEMICALS}
+        # resolved once per snapshot (every PFAS chemical, default 0 if missing)
+        return dict(zip(PFAS_CHEMICALS, self.background.lookup().row(state)))
 
     # ------------------------------------------------------------------
     # Mixing model
@@ -85,12 +107,7 @@ class PFASRiskSimulator:
             return upstream.copy()
 
         cooling_type = dc.get("cooling_type", "closed_loop")
-        enrichment = {
-            "evaporative": 1.5,
-            "hybrid": 1.3,
-            "closed_loop": 1.1,
-            "air_cooled": 1.0,
-        }.get(cooling_type, 1.1)
+        enrichment = COOLING_ENRICHMENT.get(cooling_type, DEFAULT_ENRICHMENT)
 
         mixed: Dict[str, float] = {}
 
@@ -175,7 +192,7 @@ class PFASRiskSimulator:
             risk += 15.0
 
         stress = env.get("water_stress_category", "low")
-        stress_mult = {"low": 1.0, "moderate": 1.2, "high": 1.4}.get(stress, 1.0)
+        stress_mult = STRESS_MULTIPLIER.get(stress, DEFAULT_STRESS_MULTIPLIER)
         risk *= stress_mult
 
         risk = max(0.0, min(risk, 100.0))
@@ -211,3 +228,100 @@ class PFASRiskSimulator:
             "risk_category": category,
             "dominant_pathway": pathway,
         }
+
+    # ------------------------------------------------------------------
+    # Memoized simulate()
+    # ------------------------------------------------------------------
+    def simulate_cached(self, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """
+        simulate() through the result cache. Returns (result, cache_hit).
+        The key covers the payload inputs, the background data version and
+        the regulatory limits (see src.simulation.result_cache).
+        """
+        limits = {"mcl": self.MCL, "hazard_rfd": self.HAZARD_RFD, "combined_mcl": self.COMBINED_MCL}
+        key = payload_key(payload, self.background.version, limits)
+        result = self.cache.get(key)
+        if result is not None:
+            return result, True
+        result = self.simulate(payload)
+        self.cache.put(key, result)
+        return result, False
+
+    # ------------------------------------------------------------------
+    # Vectorized batch
+    # ------------------------------------------------------------------
+    def simulate_batch(self, payloads):
+        """
+        Run many scenarios at once. Accepts a list of simulate()-style
+        payloads, encoded ScenarioColumns or a prebuilt ScenarioBatch;
+        returns a BatchResult whose to_dicts() is bit-for-bit identical to
+        calling simulate() per payload.
+        """
+        from src.simulation.batch import ScenarioBatch, run_batch
+        from src.simulation.scenario_codec import ScenarioColumns
+
+        batch = payloads
+        if isinstance(batch, ScenarioColumns):
+            batch = ScenarioBatch.from_columns(batch, self.get_background)
+        elif not isinstance(batch, ScenarioBatch):
+            batch = ScenarioBatch.from_payloads(payloads, self.get_background)
+        return run_batch(batch, self.MCL, self.HAZARD_RFD, self.COMBINED_MCL)
+
+    # ------------------------------------------------------------------
+    # Monte Carlo uncertainty
+    # ------------------------------------------------------------------
+    def simulate_uncertainty(
+        self,
+        payload: Dict[str, Any],
+        n_draws: int = 100_000,
+        seed: int = 0,
+        percentiles=(5.0, 50.0, 95.0),
+        distributions: Dict[str, Dict[str, Any]] | None = None,
+        return_draws: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Percentile bands for downstream concentrations, HI and risk score
+        under sampled background, discharge and river-flow uncertainty.
+        See src.simulation.monte_carlo.
+        """
+        from src.simulation.monte_carlo import run_monte_carlo
+
+        return run_monte_carlo(
+            self, payload, n_draws, seed, percentiles, distributions, return_draws=return_draws
+        )
+
+    # ------------------------------------------------------------------
+    # Sensitivity analysis
+    # ------------------------------------------------------------------
+    def simulate_sensitivity(
+        self,
+        payload: Dict[str, Any],
+        method: str = "sobol",
+        factors=None,
+        n_base: int = 1024,
+        executor=None,
+    ) -> Dict[str, Any]:
+        """
+        One-at-a-time tornado (method="oat") or Sobol first/total indices
+        (method="sobol") of the risk score and Hazard Index with respect to
+        background, discharge, river flow, withdrawal and cooling type.
+        See src.simulation.sensitivity.
+        """
+        from src.simulation.sensitivity import run_sensitivity
+
+        return run_sensitivity(self, payload, method, factors, n_base, executor=executor)
+
+    # ------------------------------------------------------------------
+    # Time-horizon trajectories
+    # ------------------------------------------------------------------
+    def simulate_trajectory(self, payloads, step: str = "year"):
+        """
+        Year-by-year (step="year") or monthly (step="month") trajectories
+        driven by scenario_parameters. Accepts one payload or a list and
+        returns a Trajectory of typed arrays (see src.simulation.trajectory).
+        """
+        from src.simulation.trajectory import run_trajectory
+
+        if isinstance(payloads, dict):
+            payloads = [payloads]
+        return run_trajectory(self, payloads, step)
@@ -4,6 +4,8 @@ map_renderer.py
 Simple static map rendering for PFAS siting results.
 
 - Plots PWS locations from data/metadata/pws_locations.csv
+- Optionally restricts them to systems with UCMR5 PFAS samples, read from
+  the state partition of the UCMR5 Parquet dataset (pwsid column only)
 - Highlights the selected PWS / location
 """
 
@@ -15,10 +17,23 @@ from typing import Optional
 import matplotlib.pyplot as plt
 import pandas as pd
 
+from src.etl.parquet_dataset import UCMR5_DATASET_DIR, read_ucmr5_dataset
+
 
 PWS_CSV = Path("data/metadata/pws_locations.csv")
 
 
+def sampled_pwsids(state: str, contaminants: Optional[list] = None) -> set:
+    """PWSIDs with UCMR5 PFAS samples in one state (single partition read)."""
+    df = read_ucmr5_dataset(
+        states=[state],
+        contaminants=contaminants,
+        columns=["pwsid"],
+        pfas_only=True,
+    )
+    return set(df["pwsid"].astype(str))
+
+
 def render_hotspot_map(
     *,
     selected_lat: float,
@@ -26,6 +41,7 @@ def render_hotspot_map(
     selected_label: str,
     output_path: Path,
     state_filter: Optional[str] = None,
+    sampled_only: bool = False,
 ) -> Path:
     """
     Render a simple scatter map of PWS locations and highlight the selected point.
@@ -35,6 +51,8 @@ def render_hotspot_map(
         selected_label: text label to show near the selected point
         output_path: path to save PNG
         state_filter: if provided, only show PWS in this state
+        sampled_only: with state_filter, only show PWS that have UCMR5 PFAS
+            samples (requires the UCMR5 Parquet dataset)
     """
     if not PWS_CSV.exists():
         raise FileNotFoundError(f"PWS metadata not found at {PWS_CSV}")
@@ -45,6 +63,9 @@ def render_hotspot_map(
     if state_filter:
         df = df[df["state"].str.upper() == state_filter.upper()]
 
+        if sampled_only and UCMR5_DATASET_DIR.exists() and "pwsid" in df.columns:
+            df = df[df["pwsid"].astype(str).isin(sampled_pwsids(state_filter))]
+
     if df.empty:
         # Fallback: just plot the selected point
         fig, ax = plt.subplots(figsize=(6, 4))
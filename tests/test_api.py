@@ -1,14 +1,578 @@
- from fastapi.testclient import TestClient
+from fastapi.testclient import TestClient
 from src.api.main import app
 
 client = TestClient(app)
 
+# required environmental_factors fields of the payload schema
+ENVIRONMENT = {"groundwater_vulnerability_index": 0.4, "surface_water_distance_km": 2.0, "water_stress_category": "low"}
+
 def test_root():
     r = client.get("/")
     assert r.status_code == 200
 
-def test_simulate_location():
+def test_simulate_location(monkeypatch):
+    import httpx
+
+    from src.api import geocoding_client, location_service
+
+    # local stand-in for Nominatim, used if the offline index is not built
+    stub = geocoding_client.GeocodingClient(
+        base_url="http://nominatim.stub/reverse", rate_per_second=1000.0,
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, json={"address": {"state": "Maryland"}})
+        ),
+    )
+    monkeypatch.setattr(geocoding_client, "_CLIENT", stub)
+    location_service.GEOCODE_CACHE.clear()
+
     r = client.post("/simulate-location", json={"lat": 39.0, "lon": -77.0})
     assert r.status_code == 200
-    assert "state" in r.json()
+    assert r.json()["state"] == "24"
+
+
+def test_geocoding_client_coalesces_rate_limits_and_breaks():
+    import asyncio
+    import time
+
+    import httpx
+
+    from src.api.geocoding_client import GeocodingClient
+
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.params["lat"])
+        await asyncio.sleep(0.01)
+        if request.url.params["lat"] == "1.0":
+            return httpx.Response(503)
+        return httpx.Response(200, json={"address": {"state": "Virginia"}})
+
+    client = GeocodingClient(
+        base_url="http://geocoder.test/reverse", rate_per_second=20.0,
+        failure_threshold=2, reset_timeout=60.0, transport=httpx.MockTransport(handler),
+    )
+
+    async def run():
+        # ten clicks within ~10 m share one upstream call
+        same = await asyncio.gather(*[client.reverse(38.80001 + i * 1e-6, -77.3) for i in range(10)])
+        assert {place["state_fips"] for place, _ in same} == {"51"}
+        assert len(calls) == 1 and client.stats["coalesced"] == 9
+
+        assert (await client.reverse(38.8, -77.3))[1] == "cache"
+
+        start = time.monotonic()
+        await asyncio.gather(client.reverse(39.0, -77.0), client.reverse(40.0, -77.0))
+        assert time.monotonic() - start >= 0.09  # 20 req/s → 50 ms spacing
+
+        # two failures open the circuit; the next lookup never goes upstream
+        assert await client.reverse(1.0, 1.0) == (None, "none")
+        assert await client.reverse(1.0, 1.0) == (None, "none")
+        before = len(calls)
+        assert await client.reverse(1.0, 1.0) == (None, "none")
+        assert len(calls) == before and client.breaker.state == "open"
+        assert (await client.reverse(39.0, -77.0))[1] == "cache"  # cached answers still served
+
+        # a cancelled half-open probe frees the slot for the next one
+        client.breaker.opened_at -= 60.0
+        probe = asyncio.create_task(client.reverse(2.0, 2.0))
+        await asyncio.sleep(0)
+        assert client.breaker._probing
+        probe.cancel()
+        await asyncio.gather(probe, return_exceptions=True)
+        assert not client.breaker._probing and client.breaker.state == "half_open"
+        assert (await client.reverse(3.0, 3.0))[1] == "nominatim"
+        assert client.breaker.state == "closed"
+        await client.aclose()
+
+    asyncio.run(run())
+
+def test_geohash_cache_lru_ttl_and_sqlite_tier(tmp_path):
+    import asyncio
+    import threading
+
+    from src.api.geocode_cache import GeocodeCache, geohash_encode
+
+    assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+    db = tmp_path / "geocode.sqlite"
+    cache = GeocodeCache(precision=6, max_entries=2, ttl_seconds=60, sqlite_path=db)
+    place = {"state_fips": "51", "county_fips": "51107"}
+    cache.put(39.08, -77.64, place, "offline")
+
+    assert cache.get(39.0801, -77.6401) == (place, "offline")  # same cell
+    assert cache.get(38.75, -77.47) is None
+
+    cache.put(38.75, -77.47, {"state_fips": "51"}, "offline")
+    cache.put(0.0, 0.0, {"state_fips": "00"}, "offline")
+    assert cache.counters["evictions"] == 1
+
+    # a new process finds the evicted entry in the SQLite tier
+    cache.close()
+    restarted = GeocodeCache(precision=6, max_entries=2, ttl_seconds=60, sqlite_path=db)
+    assert restarted.get(39.08, -77.64) == (place, "offline")
+    stats = restarted.stats()
+    assert stats["disk_hits"] == 1 and stats["misses"] == 0
+
+    # async callers: memory hits stay on the loop, SQLite runs in the thread pool
+    loop_thread = threading.get_ident()
+    db_threads = []
+    db_put = restarted._db_put
+    restarted._db_put = lambda *args: (db_threads.append(threading.get_ident()), db_put(*args))
+
+    async def lookups():
+        await restarted.aput(10.0, 10.0, {"state_fips": "00"}, "offline")
+        assert await restarted.aget(10.0, 10.0) == ({"state_fips": "00"}, "offline")
+        assert await restarted.aget(-10.0, -10.0) is None
+
+    asyncio.run(lookups())
+    assert db_threads and loop_thread not in db_threads
+    assert restarted.stats()["memory_hits"] == 1 and restarted.stats()["misses"] == 1
+
+    expired = GeocodeCache(precision=6, ttl_seconds=0)
+    expired.put(39.08, -77.64, place, "offline")
+    assert expired.get(39.08, -77.64) is None
+    assert expired.counters["expirations"] == 1
+
+
+def test_geocoder_stats():
+    r = client.get("/geocoder-stats")
+    assert r.status_code == 200
+    assert {"hits", "misses", "hit_rate"} <= set(r.json()["cache"])
+    assert r.json()["upstream"]["circuit"] == "closed"
+
+def test_simulate_locations_streams_ndjson():
+    import json
+
+    points = [
+        {"lat": 39.0, "lon": -77.0, "data_center": {"max_daily_water_withdrawal_mgd": 2.0}},
+        {"lat": 38.7, "lon": -77.5},
+    ]
+    r = client.post("/simulate-locations", json=points)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert [row["index"] for row in rows] == [0, 1]
+    assert "overall_risk_score_0_100" in rows[0] and "state" in rows[1]
+
+    body = "\n".join(json.dumps(p) for p in points)
+    r = client.post("/simulate-locations", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert [json.loads(line)["index"] for line in r.text.splitlines()] == [0, 1]
+
+    assert client.post("/simulate-locations", json=[{"lat": "x"}]).status_code == 400
+
+    bad = [
+        {"lat": 39.0, "lon": -77.0, "data_center": {"max_daily_water_withdrawal_mgd": -1.0}},
+        {"lat": 39.0, "lon": -77.0, "data_center": {"cooling_type": "bogus"}},
+        {"lat": 39.0, "lon": -77.0, "environmental_factors": {"receiving_water_flow_cfs": -5.0}},
+        {"lat": 39.0, "lon": -77.0, "chemicals": {"concentrations_ppt": {"PFOA": "abc"}}},
+        {"lat": 39.0, "lon": -77.0, "chemicals": [1, 2]},
+        {"lat": 91.0, "lon": -77.0},
+    ]
+    body = "\n".join(json.dumps(p) for p in [points[0], *bad, {"lat": "NaN", "lon": 0.0}])
+    r = client.post("/simulate-locations", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert r.status_code == 422
+    assert sorted({error["loc"][1] for error in r.json()["detail"]}) == list(range(1, len(bad) + 2))
+
+def test_simulation_content_negotiation():
+    import io
+    import json
+
+    import pyarrow as pa
+
+    payload = {
+        "state": "51",
+        "chemicals": {"concentrations_ppt": {"PFOA": 6.0, "PFOS": 2.0}},
+        "environmental_factors": {**ENVIRONMENT, "water_stress_category": "high"},
+        "data_center": {"cooling_type": "evaporative", "max_daily_water_withdrawal_mgd": 3.0},
+        "scenario_parameters": {"time_horizon_years": 3},
+    }
+    batch = [payload, {**payload, "state": "24", "lat": 39.0}]
+
+    default = client.post("/simulate-batch", json=batch)
+    assert default.headers["content-type"].startswith("application/json")
+    expected = default.json()
+
+    nd = client.post("/simulate-batch", json=batch, headers={"Accept": "application/x-ndjson"})
+    assert [json.loads(line) for line in nd.text.splitlines()] == expected
+
+    arrow = client.post("/simulate-batch", json=batch, headers={"Accept": "application/vnd.apache.arrow.stream"})
+    table = pa.ipc.open_stream(io.BytesIO(arrow.content)).read_all()
+    assert table.column("overall_risk_score_0_100").to_pylist() == [r["overall_risk_score_0_100"] for r in expected]
+    assert table.column("risk_category").to_pylist() == [r["risk_category"] for r in expected]
+    assert table.column("lat").to_pylist() == [None, 39.0]
+
+    mc = {**payload, "monte_carlo": {"n_draws": 500, "return_draws": True}}
+    arrow = client.post("/simulate-uncertainty", json=mc, headers={"Accept": "application/vnd.apache.arrow.stream"})
+    table = pa.ipc.open_stream(io.BytesIO(arrow.content)).read_all()
+    assert table.num_rows == 500
+    summary = json.loads(table.schema.metadata[b"summary"])
+    assert summary["uncertainty"]["n_draws"] == 500
+
+    traj = client.post("/simulate-trajectory", json=payload, headers={"Accept": "application/vnd.apache.arrow.stream"})
+    assert pa.ipc.open_stream(io.BytesIO(traj.content)).read_all().num_rows == 4
+    assert client.post("/simulate-trajectory", params={"step": "week"}, json=payload).status_code == 422
+
+def test_simulate_sets_x_cache():
+    payload = {
+        "state": "51",
+        "chemicals": {"concentrations_ppt": {"PFOA": 3.25}},
+        "environmental_factors": ENVIRONMENT,
+        "data_center": {"cooling_type": "closed_loop", "max_daily_water_withdrawal_mgd": 0.75},
+        "scenario_parameters": {},
+    }
+    first = client.post("/simulate", json=payload)
+    second = client.post("/simulate", json={**payload, "lat": 38.0})
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json()["lat"] == 38.0
+
+
+def _blocking_render(result, pdf_path):
+    import time
+
+    started = time.time()
+    result["release"].wait(5)
+    return started, time.time(), None
+
+
+def test_pdf_job_queue_backpressure_and_timings(tmp_path):
+    import asyncio
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    from src.api.pdf_jobs import PdfJobQueue, QueueFull
+
+    release = threading.Event()
+    queue = PdfJobQueue(max_pending=2, output_dir=tmp_path,
+                        executor=ThreadPoolExecutor(1), render=_blocking_render)
+    first = queue.submit({"release": release})
+    second = queue.submit({"release": release})
+    assert first.filename != second.filename
+    try:
+        queue.submit({"release": release})
+        assert False, "third job should be rejected"
+    except QueueFull:
+        pass
+
+    assert asyncio.run(queue.wait(second, 0.05)).status == "queued"
+    release.set()
+    assert asyncio.run(queue.wait(second, 5)).status == "done"
+    timings = second.to_dict()["timings"]
+    assert timings["queue_seconds"] >= 0 and timings["render_seconds"] >= 0
+    stats = queue.stats()
+    assert (stats["completed"], stats["rejected"], stats["pending"]) == (2, 1, 0)
+    queue.submit({"release": release})  # capacity is back
+    queue.shutdown()
+
+
+def test_export_pdf_jobs(tmp_path, monkeypatch):
+    from src.api import pdf_jobs
+
+    queue = pdf_jobs.PdfJobQueue(max_workers=1, output_dir=tmp_path)
+    monkeypatch.setattr(pdf_jobs, "_QUEUE", queue)
+    payload = {
+        "state": "51",
+        "chemicals": {"concentrations_ppt": {"PFOA": 4.0}},
+        "environmental_factors": ENVIRONMENT,
+        "data_center": {"cooling_type": "closed_loop", "max_daily_water_withdrawal_mgd": 1.0},
+        "scenario_parameters": {},
+    }
+    try:
+        r = client.post("/export-pdf/jobs", json=payload)
+        assert r.status_code == 202
+        job = r.json()
+        status = client.get(job["status_url"], params={"wait": 30}).json()
+        assert status["status"] == "done", status
+        pdf = client.get(job["download_url"])
+        assert pdf.headers["content-type"] == "application/pdf"
+        assert pdf.content.startswith(b"%PDF")
+
+        direct = client.post("/export-pdf", json=payload)
+        assert direct.status_code == 200 and direct.headers["X-Cache"] == "HIT"
+        assert direct.content == pdf.content  # same result → cached bytes
+        stats = client.get("/export-pdf/stats").json()
+        assert (stats["completed"], stats["cache_hits"]) == (1, 1)
+        assert not any(tmp_path.iterdir())  # nothing written to disk
+        assert client.get("/export-pdf/jobs/nope").status_code == 404
+    finally:
+        queue.shutdown()
+
+
+def test_pdf_cache_and_disk_storage(tmp_path):
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+    from src.api.pdf_exporter import PdfCache, render_pdf_bytes, report_key
+    from src.api.pdf_jobs import PdfJobQueue
+
+    assert report_key({"a": 1, "b": {"c": 2}}) == report_key({"b": {"c": 2.0}, "a": 1.0})
+    assert report_key({"a": 1}) != report_key({"a": 2})
+
+    content = render_pdf_bytes({"state": "51"})
+    cache = PdfCache(max_bytes=2 * len(content) + 1)
+    for key in "abc":
+        cache.put(key, content)
+    assert cache.get("a") is None and cache.get("c") == content
+    assert cache.stats()["evictions"] == 1
+
+    queue = PdfJobQueue(storage="disk", output_dir=tmp_path, executor=ThreadPoolExecutor(1))
+    job = asyncio.run(queue.wait(queue.submit({"state": "51"}), 30))
+    assert job.status == "done" and job.content is None
+    assert job.path.read_bytes().startswith(b"%PDF")
+    queue.shutdown()
+
+
+def test_export_pdf_bulk(tmp_path, monkeypatch):
+    import asyncio
+    import io
+    import zipfile
+
+    from fastapi import HTTPException
+
+    from src.api import pdf_jobs, routes
+    from src.api.middleware.payload_validator import SimulationPayload
+    from src.api.pdf_bulk import entry_name
+
+    queue = pdf_jobs.PdfJobQueue(max_workers=2, output_dir=tmp_path)
+    monkeypatch.setattr(pdf_jobs, "_QUEUE", queue)
+    payloads = [
+        {
+            "state": state,
+            "chemicals": {"concentrations_ppt": {"PFOA": 1.0 + i}},
+            "environmental_factors": ENVIRONMENT,
+            "data_center": {"cooling_type": "closed_loop", "max_daily_water_withdrawal_mgd": 1.0},
+            "scenario_parameters": {},
+        }
+        for i, state in enumerate(["51", "24", "06"] * 12)
+    ]
+    try:
+        r = client.post("/export-pdf/bulk", json=payloads)
+        assert r.headers["content-type"] == "application/zip"
+        archive = zipfile.ZipFile(io.BytesIO(r.content))
+        names = sorted(archive.namelist())
+        assert len(names) == 36 and names[0] == "site_0001_51.pdf"
+        assert all(archive.read(name).startswith(b"%PDF") for name in names)
+
+        pdf = client.post("/export-pdf/bulk", params={"format": "pdf"}, json=payloads)
+        assert pdf.headers["content-type"] == "application/pdf"
+        assert pdf.content.count(b"/Type /Page\n") == 36
+        assert client.post("/export-pdf/bulk", params={"format": "doc"}, json=payloads).status_code == 400
+        assert queue.stats()["pending"] == 0
+
+        # the slot is taken in the handler (one locked check-and-take) and
+        # given back even when the client is gone before the body starts
+        queue.max_pending = 1
+
+        async def disconnect_early():
+            response = await routes.export_pdf_bulk([SimulationPayload(**payloads[0])])
+            assert queue.stats()["pending"] == 1
+            try:
+                await routes.export_pdf_bulk([SimulationPayload(**payloads[0])])
+                raise AssertionError("expected 429")
+            except HTTPException as e:
+                assert e.status_code == 429
+
+            async def gone(message):
+                raise OSError("client disconnected")
+
+            try:
+                await response({"type": "http", "asgi": {"spec_version": "2.4"}}, None, gone)
+            except Exception:
+                pass
+
+        asyncio.run(disconnect_early())
+        assert queue.stats()["pending"] == 0
+
+        assert entry_name(0, {"state": "../../etc/x"}) == "site_0001_etcx.pdf"
+        assert entry_name(1, {"state": None}) == "site_0002_NA.pdf"
+    finally:
+        queue.shutdown()
+
+
+def test_compute_executor_process_mode_and_backpressure(monkeypatch):
+    import asyncio
+    import threading
+    import time
+
+    from src.api import compute
+    from src.api.backpressure import QueueFull
+
+    payloads = [
+        {
+            "state": "51",
+            "chemicals": {"concentrations_ppt": {"PFOA": 2.0 + i}},
+            "environmental_factors": ENVIRONMENT,
+            "data_center": {"cooling_type": "closed_loop", "max_daily_water_withdrawal_mgd": 1.0},
+        }
+        for i in range(3)
+    ]
+    expected = client.post("/simulate-batch", json=payloads).json()
+
+    executor = compute.ComputeExecutor(kind="process", max_workers=1)
+    try:
+        result = asyncio.run(executor.run(compute.batch_dicts_task, payloads))
+    finally:
+        executor.shutdown()
+    assert [{**r, "lat": None, "lon": None} for r in result] == expected
+    assert executor.stats()["completed"] == 1
+
+    # a cancelled await keeps its slot until the running task really ends
+    gate = threading.Event()
+    bounded = compute.ComputeExecutor(max_workers=1, max_pending=1)
+
+    async def cancel_running():
+        task = asyncio.create_task(bounded.run(gate.wait, 5.0))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert bounded.stats()["pending"] == 1
+        try:
+            await bounded.run(sum, [1])
+            raise AssertionError("expected QueueFull")
+        except QueueFull:
+            pass
+
+    try:
+        asyncio.run(cancel_running())
+        gate.set()
+        deadline = time.monotonic() + 5.0
+        while bounded.stats()["pending"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert bounded.stats()["pending"] == 0 and bounded.stats()["completed"] == 1
+    finally:
+        bounded.shutdown()
+
+    full = compute.ComputeExecutor(max_pending=0)
+    monkeypatch.setattr(compute, "_EXECUTOR", full)
+    r = client.post("/simulate-batch", json=payloads)
+    assert r.status_code == 429 and r.headers["Retry-After"] == "5"
+    assert client.post("/simulate-locations", json=[{"lat": 39.0, "lon": -77.0}]).status_code == 429
+    assert client.post("/simulate", json=payloads[0]).status_code == 200  # light path unaffected
+    assert client.get("/compute-stats").json()["compute"]["rejected"] == 2
+
+
+def test_malformed_payloads_rejected_with_422():
+    from src.api.middleware.payload_validator import validate_simulation_payload
+
+    payload = {
+        "chemicals": {"concentrations_ppt": {"PFOA": "2.5"}},
+        "environmental_factors": {**ENVIRONMENT, "receiving_water_flow_cfs": 40},
+        "data_center": {"cooling_type": "hybrid", "max_daily_water_withdrawal_mgd": 1},
+        "monte_carlo": {"n_draws": 10},
+    }
+    clean = validate_simulation_payload(payload)
+    assert clean["chemicals"]["concentrations_ppt"]["PFOA"] == 2.5
+    assert clean["monte_carlo"] == {"n_draws": 10} and "scenario_parameters" not in clean
+
+    bad = [
+        {k: v for k, v in payload.items() if k != "data_center"},
+        {**payload, "chemicals": {"concentrations_ppt": {"PFOX": 1.0}}},
+        {**payload, "environmental_factors": {**ENVIRONMENT, "groundwater_vulnerability_index": 1.5}},
+        {**payload, "environmental_factors": {**ENVIRONMENT, "water_stress_category": "severe"}},
+        {**payload, "data_center": {"cooling_type": "hybrid", "max_daily_water_withdrawal_mgd": -1}},
+        {**payload, "scenario_parameters": {"time_horizon_years": 500}},
+        {**payload, "lat": 123.0},
+    ]
+    for body in bad:
+        r = client.post("/simulate", json=body)
+        assert r.status_code == 422, body
+    assert client.post("/simulate", json=payload).status_code == 200
+
+    r = client.post("/simulate-batch", json=[payload, bad[1]])
+    assert r.status_code == 422
+    assert r.json()["detail"][0]["loc"][:2] == ["body", 1]
+
+    # endpoint options are typed too: client errors never reach a worker
+    bad_options = {
+        "/simulate-uncertainty": ("monte_carlo", [
+            {"n_draws": 0}, {"n_draws": 5_000_000}, {"n_draws": "abc"}, {"seed": -1},
+            {"percentiles": [150]}, {"distributions": {"background": {"distribution": "cauchy"}}},
+            {"distributions": {"river_flow": {"spread": -0.1}}},
+        ]),
+        "/simulate-sensitivity": ("sensitivity", [
+            {"method": "foo"}, {"n_base": 1000}, {"n_base": -4}, {"factors": ["rainfall"]}, {"factors": []},
+            {"factors": {"river_flow": {"low": 2.0}}}, {"factors": {"cooling_type": {"values": ["air"]}}},
+        ]),
+    }
+    for path, (key, cases) in bad_options.items():
+        for options in cases:
+            r = client.post(path, json={**payload, key: options})
+            assert r.status_code == 422, (path, options)
+            assert r.json()["detail"][0]["loc"][:2] == ["body", key]
+
+
+def test_option_errors_raised_in_workers_answer_422(monkeypatch):
+    from src.api import routes
+
+    def reject(*args):
+        raise ValueError("n_draws must be between 1 and 1000000")
+
+    monkeypatch.setattr(routes, "uncertainty_task", reject)
+    payload = {
+        "chemicals": {"concentrations_ppt": {"PFOA": 3.0}},
+        "environmental_factors": ENVIRONMENT,
+        "data_center": {"cooling_type": "hybrid", "max_daily_water_withdrawal_mgd": 4.0},
+    }
+    r = client.post("/simulate-uncertainty", json=payload)
+    assert r.status_code == 422 and "n_draws" in r.json()["detail"]
+
+    monkeypatch.setattr(routes, "sensitivity_plan_task", reject)
+    assert client.post("/simulate-sensitivity", json=payload).status_code == 422
+
+
+def test_simulate_sensitivity():
+    payload = {
+        "state": "51",
+        "chemicals": {"concentrations_ppt": {"PFOA": 3.0, "PFHxS": 5.0}},
+        "environmental_factors": {**ENVIRONMENT, "receiving_water_flow_cfs": 20.0},
+        "data_center": {"cooling_type": "hybrid", "max_daily_water_withdrawal_mgd": 4.0},
+    }
+    r = client.post("/simulate-sensitivity", json={**payload, "sensitivity": {"n_base": 256}})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["method"] == "sobol" and body["n_evaluations"] == 256 * 7
+    assert set(body["outputs"]["overall_risk_score_0_100"]["total_order"]) == {
+        "background", "discharge", "river_flow", "withdrawal", "cooling_type"
+    }
+
+    r = client.post("/simulate-sensitivity", json={
+        **payload, "sensitivity": {"method": "oat", "factors": ["river_flow", "cooling_type"]},
+    })
+    tornado = r.json()["tornado"]["hazard_index_value"]
+    assert [bar["swing"] for bar in tornado] == sorted((bar["swing"] for bar in tornado), reverse=True)
+
+
+def test_simulate_sensitivity_admits_chunks_together(monkeypatch):
+    import asyncio
+
+    from src.api import compute
+    from src.api.backpressure import QueueFull
+
+    # 4096 * 7 design rows are two default chunks; with room for one task
+    # they are evaluated as one bigger chunk instead of being rejected
+    small = compute.ComputeExecutor(max_pending=1)
+    monkeypatch.setattr(compute, "_EXECUTOR", small)
+    payload = {
+        "state": "51",
+        "chemicals": {"concentrations_ppt": {"PFOA": 3.0}},
+        "environmental_factors": ENVIRONMENT,
+        "data_center": {"cooling_type": "hybrid", "max_daily_water_withdrawal_mgd": 4.0},
+        "sensitivity": {"n_base": 4096},
+    }
+    try:
+        assert client.post("/simulate-sensitivity", json=payload).status_code == 200
+        stats = small.stats()
+        assert (stats["pending"], stats["submitted"], stats["rejected"]) == (0, 2, 0)
+
+        async def over_limit():
+            try:
+                await small.run_many(sum, [([1],), ([2],)])
+                raise AssertionError("expected QueueFull")
+            except QueueFull:
+                pass
+            assert await small.run_many(sum, [([2, 3],)]) == [5]
 
+        asyncio.run(over_limit())
+        assert small.stats()["rejected"] == 1 and small.stats()["pending"] == 0
+    finally:
+        small.shutdown()
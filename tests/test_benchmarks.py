@@ -0,0 +1,30 @@
+from benchmarks.harness import compare, percentile, summarize
+
+
+def run(values, thresholds=None):
+    thresholds = thresholds or {}
+    return {
+        "meta": {},
+        "results": {
+            name: {**summarize([value]), "threshold": thresholds.get(name, 1.25)}
+            for name, value in values.items()
+        },
+    }
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 100) == 100
+    assert percentile([3.0], 99) == 3.0
+
+
+def test_compare_flags_regressions_past_threshold():
+    baseline = run({"fast": 1.0, "noisy": 1.0, "gone": 1.0}, {"noisy": 1.5})
+    current = run({"fast": 1.3, "noisy": 1.3, "new": 5.0})
+
+    rows = {row["case"]: row for row in compare(baseline, current)}
+    assert set(rows) == {"fast", "noisy"}
+    assert rows["fast"]["regressed"] and not rows["noisy"]["regressed"]
+    assert abs(rows["fast"]["ratio"] - 1.3) < 1e-12
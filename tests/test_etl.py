@@ -0,0 +1,297 @@
+import csv
+
+from src.etl.etl_main import run_etl
+
+HEADER = [
+    "PWSID", "PWSName", "Size", "FacilityID", "CollectionDate", "SampleID",
+    "Contaminant", "MRL", "Units", "MethodID", "AnalyticalResultsSign",
+    "AnalyticalResultValue", "Region", "State",
+]
+
+
+def write_raw(path, rows, bad_lines=0):
+    lines = ["\t".join(HEADER)]
+    for i, (state, chem, sign, value) in enumerate(rows):
+        lines.append("\t".join([
+            f"{state}000{i}", "Test PWS", "L", "1", "03/01/2023", f"S{i}",
+            chem, "0.004", "µg/L", "533", sign, value, "3", state,
+        ]))
+    for _ in range(bad_lines):
+        lines.append("too\tfew\tcolumns")
+    path.write_text("\n".join(lines) + "\n", encoding="latin1")
+
+
+def read_medians(path):
+    with open(path) as f:
+        return {(r["State"], r["Contaminant"]): float(r["ppt"]) for r in csv.DictReader(f)}
+
+
+def test_etl_state_medians(tmp_path):
+    raw = tmp_path / "UCMR5_All.txt"
+    write_raw(raw, [
+        ("VA", "PFOA", "=", "0.004"),
+        ("VA", "PFOA", "=", "0.006"),
+        ("VA", "PFOA", "<", ""),
+        ("VA", "PFHxS", "=", "0.003"),
+        ("MD", "PFOA", "=", "0.010"),
+        ("VA", "lithium", "=", "12.0"),
+    ], bad_lines=2)
+
+    out = tmp_path / "medians.csv"
+    report = run_etl(raw, out, report_path=tmp_path / "report.json")
+    medians = read_medians(out)
+
+    assert medians[("51", "PFOA")] == 5.0
+    assert medians[("51", "PFHxS")] == 3.0
+    assert medians[("24", "PFOA")] == 10.0
+    assert medians[("00", "PFOA")] == 6.0
+    assert not any(chem.upper() == "LITHIUM" for _, chem in medians)
+    assert report["pfas_samples"] == 4
+    assert report["bad_lines"] == 2
+
+
+def test_etl_python_engine_matches_pyarrow(tmp_path):
+    raw = tmp_path / "UCMR5_All.txt"
+    write_raw(raw, [("PA", "PFOS", "=", str(0.001 * i)) for i in range(1, 8)], bad_lines=1)
+
+    run_etl(raw, tmp_path / "a.csv", report_path=None, engine="pyarrow")
+    run_etl(raw, tmp_path / "b.csv", report_path=None, engine="python")
+
+    assert read_medians(tmp_path / "a.csv") == read_medians(tmp_path / "b.csv")
+
+
+def test_exact_quantiles_spill_matches_numpy(tmp_path):
+    import numpy as np
+    from src.etl.median_aggregator import ExactQuantiles
+
+    rng = np.random.default_rng(0)
+    data = rng.lognormal(1.0, 0.8, size=5001)
+
+    agg = ExactQuantiles(spill_dir=tmp_path, max_buffered_values=700)
+    for piece in np.array_split(data, 37):
+        agg.add(("51", "PFOA"), piece)
+
+    assert agg.spilled
+    assert agg.count(("51", "PFOA")) == data.size
+    assert agg.median(("51", "PFOA")) == np.median(data)
+    assert np.array_equal(agg.quantile(("51", "PFOA"), [0.1, 0.9]), np.quantile(data, [0.1, 0.9]))
+    agg.close()
+
+
+def test_sketch_quantiles_bounded_error():
+    import numpy as np
+    from src.etl.median_aggregator import SketchQuantiles
+
+    rng = np.random.default_rng(1)
+    a, b = rng.normal(size=60_000), rng.normal(size=40_000)
+
+    left, right = SketchQuantiles(k=200, seed=1), SketchQuantiles(k=200, seed=2)
+    left.add("k", a)
+    right.add("k", b)
+    left.merge(right)
+
+    data = np.sort(np.concatenate([a, b]))
+    for q in (0.1, 0.5, 0.95):
+        rank = np.searchsorted(data, left.quantile("k", q)) / data.size
+        assert abs(rank - q) < 0.02
+
+
+def test_parallel_shards_match_sequential(tmp_path):
+    from src.etl.ucmr5_reader import compute_shards, read_header
+
+    raw = tmp_path / "UCMR5_All.txt"
+    states = ["VA", "MD", "PA", "CA"]
+    chems = ["PFOA", "PFOS", "PFHXS", "pfbs"]
+    write_raw(raw, [
+        (states[i % 4], chems[(i // 4) % 4], "=", str(0.0001 * ((i * 37) % 101)))
+        for i in range(3000)
+    ], bad_lines=3)
+
+    _, header_end = read_header(raw)
+    shards = compute_shards(raw, 7)
+    assert shards[0][0] == header_end and shards[-1][1] == raw.stat().st_size
+    assert all(a[1] == b[0] for a, b in zip(shards, shards[1:]))
+
+    seq = run_etl(raw, tmp_path / "seq.csv", report_path=None)
+    par = run_etl(raw, tmp_path / "par.csv", report_path=None, workers=3, max_buffered_values=500)
+
+    assert read_medians(tmp_path / "seq.csv") == read_medians(tmp_path / "par.csv")
+    assert par["pfas_samples"] == seq["pfas_samples"] == 3000
+    assert par["bad_lines"] == 3
+
+
+def test_parquet_dataset_partition_pushdown(tmp_path):
+    import pyarrow as pa
+    from src.etl.parquet_dataset import open_ucmr5_dataset, read_ucmr5_dataset, write_ucmr5_dataset
+
+    raw = tmp_path / "UCMR5_All.txt"
+    write_raw(raw, [
+        ("VA", "PFOA", "=", "0.004"),
+        ("VA", "PFOA", "<", ""),
+        ("VA", "lithium", "=", "12.0"),
+        ("MD", "PFOS", "=", "0.002"),
+    ], bad_lines=1)
+
+    out = tmp_path / "ucmr5_parquet"
+    write_ucmr5_dataset(raw, out)
+
+    assert (out / "state=51" / "contaminant=PFOA").is_dir()
+    schema = open_ucmr5_dataset(out).schema
+    assert pa.types.is_dictionary(schema.field("pwsid").type)
+    assert schema.field("collection_date").type == pa.date32()
+
+    df = read_ucmr5_dataset(
+        states=["VA"], contaminants=["PFOA"], columns=["value_ppt", "detect"], dataset_dir=out
+    )
+    assert list(df.columns) == ["value_ppt", "detect"]
+    assert len(df) == 2
+
+    detects = read_ucmr5_dataset(states=["51"], detects_only=True, pfas_only=True, dataset_dir=out)
+    assert detects["value_ppt"].tolist() == [4.0]
+
+
+def test_incremental_reingest_parses_only_appended_rows(tmp_path):
+    raw = tmp_path / "UCMR5_All.txt"
+    out = tmp_path / "medians.csv"
+    state = tmp_path / "state"
+    first = [("VA", "PFOA", "=", "0.004"), ("MD", "PFOS", "=", "0.002")]
+    appended = [("VA", "PFOA", "=", "0.010"), ("VA", "PFOA", "=", "0.012")]
+
+    write_raw(raw, first)
+    full = run_etl(raw, out, report_path=None, incremental=True, state_dir=state)
+    assert full["incremental_reason"] == "no manifest"
+
+    write_raw(raw, first + appended)
+    delta = run_etl(raw, out, report_path=None, incremental=True, state_dir=state)
+    assert delta["incremental_reason"] == "appended rows only"
+    assert delta["pfas_samples"] == 2
+    assert delta["bytes_parsed"] < raw.stat().st_size
+
+    run_etl(raw, tmp_path / "rebuild.csv", report_path=None)
+    assert read_medians(out) == read_medians(tmp_path / "rebuild.csv")
+    assert read_medians(out)[("51", "PFOA")] == 10.0
+
+    unchanged = run_etl(raw, out, report_path=None, incremental=True, state_dir=state)
+    assert unchanged["incremental_reason"] == "unchanged"
+    assert unchanged["bytes_parsed"] == 0
+
+    write_raw(raw, [("VA", "PFOA", "=", "0.001")] + appended + [("MD", "PFBS", "=", "0.003")] * 3)
+    rewritten = run_etl(raw, out, report_path=None, incremental=True, state_dir=state)
+    assert rewritten["incremental_reason"] == "previously processed bytes changed"
+    assert read_medians(out)[("51", "PFOA")] == 10.0
+    assert ("24", "PFOS") not in read_medians(out)
+
+
+def test_compiled_background_table_matches_csv(tmp_path):
+    import numpy as np
+    from src.etl.background_table import BackgroundTable, compile_background
+
+    csv_path = tmp_path / "medians.csv"
+    csv_path.write_text("State,Contaminant,ppt\n51,PFOA,4.2\n51,PFOS,3.8\n00,PFOA,4.0\n51001,PFOA,6.1\n")
+
+    table = BackgroundTable(compile_background(csv_path))
+
+    assert isinstance(table.matrix, np.memmap)
+    assert table.matrix.dtype == np.float32
+    assert table["51"] == {"PFOA": 4.2, "PFOS": 3.8}
+    assert table.get("00") == {"PFOA": 4.0}
+    assert table.get("51001") == {"PFOA": 6.1}
+    assert table.get("24") is None
+    assert table.value("00", "PFOS") is None
+
+
+def test_background_repository_fallback_and_hot_reload(tmp_path):
+    import os
+    from src.etl.background_repository import BackgroundRepository
+
+    csv_path = tmp_path / "medians.csv"
+    csv_path.write_text("State,Contaminant,ppt\n51,PFOA,4.2\n24,PFOA,0.0\n00,PFOA,4.0\n")
+    repo = BackgroundRepository(csv_path, check_interval=0.0)
+
+    assert repo.resolve("VA") == ("51", {"PFOA": 4.2})
+    assert repo.resolve("24") == ("00", {"PFOA": 4.0})  # all zeros → national
+    assert repo.resolve("US") == repo.resolve(None) == ("00", {"PFOA": 4.0})
+
+    old = repo.snapshot()
+    csv_path.write_text("State,Contaminant,ppt\n51,PFOA,9.9\n00,PFOA,4.0\n")
+    os.utime(csv_path, ns=(old.version[0] + 10**9, old.version[0] + 10**9))
+
+    assert repo.get_background("51") == {"PFOA": 9.9}
+    assert repo.snapshot() is not old
+    assert old.resolve("51") == ("51", {"PFOA": 4.2})  # readers of the old snapshot unaffected
+
+
+def test_background_lookup_precomputes_fallback_chain(tmp_path):
+    from src.etl.background_repository import BackgroundRepository
+    from src.simulation.model_schema import PFAS_CHEMICALS
+
+    csv_path = tmp_path / "medians.csv"
+    csv_path.write_text("State,Contaminant,ppt\n51,PFOA,4.2\n06,PFOS,1.5\n24,PFOA,0.0\n00,PFOA,4.0\n")
+    repo = BackgroundRepository(csv_path)
+    lookup = repo.lookup()
+
+    pfoa = PFAS_CHEMICALS.index("PFOA")
+    assert lookup.vectors.shape == (len(lookup.keys), len(PFAS_CHEMICALS))
+    assert lookup.vectors.flags.c_contiguous
+    # every spelling of a region shares one code; all-zero and unknown regions share the national row
+    assert lookup.codes["51"] == lookup.codes["VA"] == lookup.codes["va"]
+    assert lookup.codes["6"] == lookup.codes["06"] == lookup.codes["CA"]
+    assert lookup.codes["24"] == lookup.codes["MD"] == lookup.codes[None] == lookup.codes["TX"]
+    assert lookup.keys[lookup.codes["24"]] == "00"
+    assert lookup.vectors[lookup.codes["VA"], pfoa] == 4.2
+    for region in ("51", "06", "24", "US", None, " va ", "99"):
+        _, chem_map = repo.resolve(region)
+        assert lookup.row(region) == [chem_map.get(c, 0.0) for c in PFAS_CHEMICALS]
+
+
+def test_offline_reverse_geocoder(tmp_path):
+    import json
+
+    from src.etl.boundary_index import LAYER_PROPERTIES, ReverseGeocoder, compile_boundaries, read_features
+
+    def square(x0, y0, x1, y1):
+        return [[x0, y0], [x1, y0], [x1, y1], [x0, y1], [x0, y0]]
+
+    def write_geojson(path, features):
+        path.write_text(json.dumps({"type": "FeatureCollection", "features": [
+            {"type": "Feature", "properties": props, "geometry": geom} for props, geom in features
+        ]}))
+
+    # "Virginia" is a square with a hole; "Maryland" is two islands, one inside the hole
+    states = tmp_path / "states.geojson"
+    write_geojson(states, [
+        ({"STATEFP": "51", "NAME": "Virginia"},
+         {"type": "Polygon", "coordinates": [square(-80, 36, -76, 39), square(-79, 37, -78, 38)]}),
+        ({"STATEFP": "24", "NAME": "Maryland"},
+         {"type": "MultiPolygon", "coordinates": [[square(-79, 39, -76, 40)], [square(-78.8, 37.2, -78.2, 37.8)]]}),
+    ])
+    counties = tmp_path / "counties.geojson"
+    write_geojson(counties, [
+        ({"GEOID": "51059", "NAME": "Fairfax"}, {"type": "Polygon", "coordinates": [square(-78, 38, -76, 39)]}),
+    ])
+
+    out = compile_boundaries({
+        "state": read_features(states, *LAYER_PROPERTIES["state"]),
+        "county": read_features(counties, *LAYER_PROPERTIES["county"]),
+    }, tmp_path / "boundaries.bin")
+    geo = ReverseGeocoder(out)
+
+    fairfax = geo.lookup(38.5, -77.0)
+    assert fairfax["state_fips"] == "51" and fairfax["county_fips"] == "51059"
+    assert fairfax["state_name"] == "Virginia" and fairfax["state_abbrev"] == "VA"
+
+    assert geo.lookup(36.5, -79.5)["county_fips"] is None
+    assert geo.lookup(37.5, -78.5)["state_fips"] == "24"  # island inside the hole
+    assert geo.lookup(37.1, -78.9) is None  # hole, outside the island
+    assert geo.lookup(39.5, -77.0)["state_abbrev"] == "MD"
+    assert geo.lookup(0.0, 0.0) is None
+
+    # vectorized lookup agrees with the scalar one
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    lats, lons = rng.uniform(35.5, 40.5, 2000), rng.uniform(-80.5, -75.5, 2000)
+    states, counties = geo.lookup_many(lats, lons)
+    for lat, lon, state, county in zip(lats, lons, states, counties):
+        place = geo.lookup(lat, lon) or {}
+        assert (place.get("state_fips"), place.get("county_fips")) == (state, county)
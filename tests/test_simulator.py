@@ -0,0 +1,248 @@
+import random
+
+from src.etl.background_repository import BackgroundRepository
+from src.simulation.model_schema import PFAS_CHEMICALS
+from src.simulation.simulator import PFASRiskSimulator
+
+
+def make_simulator(tmp_path):
+    csv_path = tmp_path / "medians.csv"
+    rows = ["State,Contaminant,ppt"]
+    for state, scale in [("00", 1.0), ("51", 2.3), ("24", 0.0)]:
+        rows += [f"{state},{chem},{scale * (i + 1) * 0.7}" for i, chem in enumerate(PFAS_CHEMICALS)]
+    csv_path.write_text("\n".join(rows) + "\n")
+    return PFASRiskSimulator(BackgroundRepository(csv_path))
+
+
+def random_payload(rng):
+    chems = rng.sample(PFAS_CHEMICALS, rng.randint(0, len(PFAS_CHEMICALS)))
+    env = {
+        "receiving_water_flow_cfs": rng.choice([0.5, 10.0, 100.0, 2500.0]),
+        "groundwater_vulnerability_index": rng.random(),
+        "surface_water_distance_km": rng.uniform(0.0, 3.0),
+        "water_stress_category": rng.choice(["low", "moderate", "high", "extreme"]),
+    }
+    dc = {
+        "max_daily_water_withdrawal_mgd": rng.choice([0.0, rng.uniform(0.0, 50.0)]),
+        "cooling_type": rng.choice(["evaporative", "hybrid", "closed_loop", "air_cooled", "other"]),
+    }
+    for section in (env, dc):
+        if rng.random() < 0.2:
+            section.pop(rng.choice(list(section)))
+    return {
+        "state": rng.choice(["51", "VA", "24", "US", None, "99"]),
+        "chemicals": {"concentrations_ppt": {c: rng.uniform(0.0, 40.0) for c in chems}},
+        "environmental_factors": env,
+        "data_center": dc,
+        "scenario_parameters": {},
+    }
+
+
+def test_simulate_batch_matches_scalar_bit_for_bit(tmp_path):
+    sim = make_simulator(tmp_path)
+    rng = random.Random(8)
+    payloads = [random_payload(rng) for _ in range(500)]
+
+    batch = sim.simulate_batch(payloads).to_dicts()
+    scalar = [sim.simulate(p) for p in payloads]
+
+    # == on floats is exact; repr() also catches -0.0 vs 0.0
+    assert batch == scalar
+    assert repr(batch) == repr(scalar)
+
+
+def test_monte_carlo_reproducible_and_chunk_independent(tmp_path):
+    from src.simulation.monte_carlo import run_monte_carlo
+
+    sim = make_simulator(tmp_path)
+    payload = random_payload(random.Random(9))
+    payload["data_center"]["max_daily_water_withdrawal_mgd"] = 5.0
+
+    a = run_monte_carlo(sim, payload, n_draws=20_000, seed=3)
+    b = run_monte_carlo(sim, payload, n_draws=20_000, seed=3, chunk_size=777)
+    c = run_monte_carlo(sim, payload, n_draws=20_000, seed=4)
+
+    assert a == b
+    assert a["hazard_index_value"] != c["hazard_index_value"]
+    bands = a["overall_risk_score_0_100"]
+    assert bands["p5"] <= bands["p50"] <= bands["p95"]
+
+    # zero spread collapses every band onto the deterministic answer
+    fixed = run_monte_carlo(sim, payload, n_draws=100, distributions={
+        name: {"spread": 0.0} for name in ("background", "discharge", "river_flow")
+    })
+    expected = sim.simulate(payload)["hazard_index_value"]
+    assert set(fixed["hazard_index_value"].values()) == {expected}
+
+
+def test_trajectory_matches_snapshot_and_closed_form(tmp_path):
+    import numpy as np
+
+    sim = make_simulator(tmp_path)
+    payloads = [random_payload(random.Random(i)) for i in range(3)]
+    for years, p in zip((5, 20, 0), payloads):
+        p["data_center"]["max_daily_water_withdrawal_mgd"] = 3.0
+        p["scenario_parameters"] = {
+            "time_horizon_years": years,
+            "pfas_decay_rate_per_year": 0.1,
+            "climate_change_factor": 1.5,
+        }
+
+    traj = sim.simulate_trajectory(payloads, step="month")
+    assert traj.downstream_ppt.dtype == np.float32
+    assert traj.times_years.shape == (20 * 12 + 1,)
+
+    # t=0 is the steady-state snapshot
+    for i, p in enumerate(payloads):
+        snap = sim.simulate(p)
+        assert np.isclose(traj.risk_score[i, 0], snap["overall_risk_score_0_100"], rtol=1e-6)
+    assert np.isnan(traj.risk_score[0, 5 * 12 + 1])
+    assert traj.category_code[2, 1] == -1
+    assert len(traj.site(0)["times_years"]) == 5 * 12 + 1
+
+    # accumulation agrees with a fine numerical integral of C(s) e^(-λ(t-s))
+    c = traj.downstream_ppt[1, 0].astype(np.float64)
+    t = traj.times_years.astype(np.float64)
+    integrand = c * np.exp(-0.1 * (t[-1] - t))
+    numeric = np.sum((integrand[1:] + integrand[:-1]) / 2 * np.diff(t))
+    assert np.isclose(traj.accumulated_ppt_years[1, 0, -1], numeric, rtol=1e-4)
+
+
+def test_simulate_cached_keys_evicts_and_invalidates(tmp_path):
+    import os
+
+    from src.simulation.result_cache import ResultCache
+
+    sim = make_simulator(tmp_path)
+    sim.background.check_interval = 0.0
+    payload = {
+        "state": "51",
+        "chemicals": {"concentrations_ppt": {"PFOA": 4, "PFOS": 2.5}},
+        "environmental_factors": {},
+        "data_center": {"max_daily_water_withdrawal_mgd": 1.0},
+    }
+    same = {
+        "data_center": {"max_daily_water_withdrawal_mgd": 1},
+        "environmental_factors": {},
+        "chemicals": {"concentrations_ppt": {"PFOS": 2.5, "PFOA": 4.0}},
+        "state": "51",
+        "lat": 38.9,
+    }
+
+    first, hit = sim.simulate_cached(payload)
+    assert not hit and first == sim.simulate(payload)
+    first["lat"] = 1.0  # callers may mutate their copy
+    second, hit = sim.simulate_cached(same)
+    assert hit and "lat" not in second
+
+    # new background data: cache dropped, and the key changes anyway
+    csv_path = sim.background.csv_path
+    csv_path.write_text(csv_path.read_text().replace("51,PFOA,1.4", "51,PFOA,9.9"))
+    os.utime(csv_path, ns=(1, 1))
+    _, hit = sim.simulate_cached(payload)
+    assert not hit and sim.cache.counters["invalidations"] == 1
+
+    small = ResultCache(max_bytes=1500)
+    for i in range(5):
+        small.put(str(i), sim.simulate(payload))
+    assert small.bytes <= 1500 and small.counters["evictions"] > 0
+    assert small.get("4") is not None and small.get("0") is None
+
+
+def test_scenario_codec_encodes_columns_and_validates_vectorized(tmp_path):
+    import numpy as np
+    import pytest
+
+    from src.simulation.scenario_codec import INVALID, ScenarioValidationError, encode_scenarios
+
+    good = {
+        "state": "51",
+        "chemicals": {"concentrations_ppt": {"PFOA": "2.5", "PFBS": 1}},
+        "environmental_factors": {
+            "groundwater_vulnerability_index": 0.4,
+            "surface_water_distance_km": 2.0,
+            "water_stress_category": "extreme",
+        },
+        "data_center": {"cooling_type": "hybrid", "max_daily_water_withdrawal_mgd": 3.0},
+    }
+    cols = encode_scenarios([good, good])
+    assert cols.data.dtype["data_center.cooling_type"] == np.int8
+    assert cols["chemicals.concentrations_ppt.PFOA"].tolist() == [2.5, 2.5]
+    assert np.isnan(cols["chemicals.concentrations_ppt.PFOS"]).all()
+    assert cols["environmental_factors.receiving_water_flow_cfs"][0] == 100.0  # schema default
+    assert cols["scenario_parameters.time_horizon_years"][0] == 10
+    assert cols.labels("data_center.cooling_type").tolist() == ["hybrid", "hybrid"]
+    assert cols.stack("chemicals", "concentrations_ppt").shape == (len(PFAS_CHEMICALS), 2)
+
+    bad = [
+        good,
+        {**good, "environmental_factors": {**good["environmental_factors"], "groundwater_vulnerability_index": 1.5}},
+        {**good, "data_center": {"cooling_type": "other", "max_daily_water_withdrawal_mgd": -1}},
+        {k: v for k, v in good.items() if k != "chemicals"},
+        {**good, "scenario_parameters": {"time_horizon_years": 2.5}},
+    ]
+    with pytest.raises(ScenarioValidationError) as info:
+        encode_scenarios(bad)
+    assert sorted((e["loc"], e["type"]) for e in info.value.errors) == [
+        ((1, "environmental_factors", "groundwater_vulnerability_index"), "less_than_equal"),
+        ((2, "data_center", "cooling_type"), "literal_error"),
+        ((2, "data_center", "max_daily_water_withdrawal_mgd"), "greater_than_equal"),
+        ((3, "chemicals", "concentrations_ppt"), "missing"),
+        ((4, "scenario_parameters", "time_horizon_years"), "int_from_float"),
+    ]
+
+    # lenient encoding still simulates like simulate(): unknown cooling → default
+    lenient = encode_scenarios(bad[2:3], validate=False)
+    assert lenient["data_center.cooling_type"][0] == INVALID
+    sim = make_simulator(tmp_path)
+    payload = {**bad[2], "data_center": {"cooling_type": "other", "max_daily_water_withdrawal_mgd": 1.0}}
+    assert sim.simulate_batch(encode_scenarios([payload], validate=False)).to_dicts() == [sim.simulate(payload)]
+
+
+def test_sensitivity_oat_and_sobol(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    import numpy as np
+
+    from src.simulation.sensitivity import run_sensitivity, sobol_indices, sobol_points
+
+    # unscrambled Sobol points (Joe-Kuo), and the estimators on Y = x1 + 2·x2
+    assert sobol_points(4, 3, skip=0).tolist() == [
+        [0.0, 0.0, 0.0], [0.5, 0.5, 0.5], [0.75, 0.25, 0.25], [0.25, 0.75, 0.75]
+    ]
+    n, d = 4096, 3
+    points = sobol_points(n, 2 * d)
+    a, b = points[:, :d], points[:, d:]
+    ab = np.repeat(a[None], d, axis=0)
+    for i in range(d):
+        ab[i, :, i] = b[:, i]
+    x = np.concatenate([a, b, ab.reshape(-1, d)])
+    first, total, _ = sobol_indices(x[:, 0] + 2 * x[:, 1], n, d)
+    assert np.allclose(first, [0.2, 0.8, 0.0], atol=0.01)
+    assert np.allclose(total, [0.2, 0.8, 0.0], atol=0.01)
+
+    sim = make_simulator(tmp_path)
+    payload = {
+        "state": "51",
+        "chemicals": {"concentrations_ppt": {"PFOA": 3.0, "PFHxS": 5.0}},
+        "environmental_factors": {"receiving_water_flow_cfs": 20.0, "water_stress_category": "low"},
+        "data_center": {"cooling_type": "hybrid", "max_daily_water_withdrawal_mgd": 4.0},
+    }
+
+    oat = sim.simulate_sensitivity(payload, method="oat", factors={"river_flow": {"low": 0.5, "high": 2.0}})
+    assert oat["baseline"]["hazard_index_value"] == sim.simulate(payload)["hazard_index_value"]
+    bar = oat["tornado"]["hazard_index_value"][0]
+    doubled = {**payload, "environmental_factors": {**payload["environmental_factors"], "receiving_water_flow_cfs": 40.0}}
+    assert bar["high"]["value"] == 2.0
+    assert np.isclose(bar["high"]["output"], sim.simulate(doubled)["hazard_index_value"])
+
+    sobol = sim.simulate_sensitivity(payload, n_base=512)
+    assert sobol["n_evaluations"] == 512 * (5 + 2)
+    hi = sobol["outputs"]["hazard_index_value"]
+    assert hi["first_order"]["background"] > 0 and hi["total_order"]["river_flow"] > 0
+    assert all(hi["first_order"][f] <= hi["total_order"][f] + 0.05 for f in hi["first_order"])
+
+    # chunks fanned out over an executor give the same answer
+    with ThreadPoolExecutor(2) as pool:
+        fanned = run_sensitivity(sim, payload, n_base=512, executor=pool, chunk_size=1000)
+    assert fanned == sobol